@@ -0,0 +1,166 @@
+"""
+Admission Control - Bounded concurrency with crisis-first queueing
+Requests past the in-flight limit wait in a priority queue; those that
+would wait longer than the queue-time budget are shed with a retry hint
+"""
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Callable, Deque, Dict, Optional
+
+PRIORITIES = ('critical', 'normal')
+
+# Weight of the newest request in the running service-time estimate
+_SERVICE_ALPHA = 0.2
+
+
+class Overloaded(Exception):
+    """A request was shed; retry after ``retry_after`` seconds"""
+
+    def __init__(self, retry_after: float, reason: str):
+        super().__init__(f"overloaded ({reason}), retry after {retry_after:.2f}s")
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class AdmissionController:
+    """
+    In-flight limit with a two-level FIFO queue.
+
+    Up to ``max_inflight`` requests run at once. Others queue, crisis
+    requests ahead of every normal one, and each freed slot goes straight
+    to the next waiter. A normal request is shed as soon as its expected
+    wait, from its queue position and the running service time, exceeds
+    ``queue_timeout``, or once it has actually waited that long, or when
+    ``max_queue`` requests are already waiting. Crisis requests are never
+    shed: they queue past ``max_queue`` and wait as long as it takes.
+    """
+
+    def __init__(
+        self,
+        max_inflight: int = 32,
+        max_queue: int = 256,
+        queue_timeout: float = 0.25,
+        metrics=None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_inflight = max_inflight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.metrics = metrics
+        self.clock = clock
+        self.inflight = 0
+        self.admitted = 0
+        self.shed = 0
+        self.service_time = 0.0  # running mean of seconds a slot is held
+        self._queues: Dict[str, Deque[asyncio.Future]] = {p: deque() for p in PRIORITIES}
+        self._waiting: Dict[str, int] = dict.fromkeys(PRIORITIES, 0)
+        if metrics is not None:
+            metrics.track_admission(self)
+
+    @classmethod
+    def from_env(cls, metrics=None) -> 'AdmissionController':
+        return cls(
+            max_inflight=int(os.getenv("ADMISSION_MAX_INFLIGHT", "32")),
+            max_queue=int(os.getenv("ADMISSION_MAX_QUEUE", "256")),
+            queue_timeout=float(os.getenv("ADMISSION_QUEUE_TIMEOUT_MS", "250")) / 1000,
+            metrics=metrics
+        )
+
+    def depth(self, priority: Optional[str] = None) -> int:
+        """Requests waiting, at one priority or in total"""
+        if priority is not None:
+            return self._waiting[priority]
+        return sum(self._waiting.values())
+
+    def expected_wait(self, ahead: int) -> float:
+        """Seconds until a request with ``ahead`` waiters before it gets a slot"""
+        return (ahead + 1) * self.service_time / self.max_inflight
+
+    async def acquire(self, critical: bool = False) -> float:
+        """
+        Wait for a slot; returns the clock time it was granted
+        Raises Overloaded when a normal request is shed
+        """
+        priority = 'critical' if critical else 'normal'
+        start = self.clock()
+        if self.inflight < self.max_inflight and not self.depth():
+            self.inflight += 1
+            return self._granted(priority, start)
+
+        if not critical:
+            ahead = self.depth()
+            wait = self.expected_wait(ahead)
+            if ahead >= self.max_queue:
+                self._shed(priority, 'queue_full', wait)
+            if wait > self.queue_timeout:
+                self._shed(priority, 'expected_wait', wait)
+
+        slot = asyncio.get_running_loop().create_future()
+        self._queues[priority].append(slot)
+        self._waiting[priority] += 1
+        try:
+            await asyncio.wait_for(slot, None if critical else self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._shed(priority, 'queue_timeout', self.expected_wait(self.depth()))
+        except asyncio.CancelledError:
+            if slot.done() and not slot.cancelled():
+                self.release()  # the slot arrived as the caller gave up
+            raise
+        finally:
+            self._waiting[priority] -= 1
+        return self._granted(priority, start)
+
+    def release(self, granted_at: Optional[float] = None):
+        """Free a slot, handing it to the next waiter if there is one"""
+        if granted_at is not None:
+            held = self.clock() - granted_at
+            self.service_time += _SERVICE_ALPHA * (held - self.service_time)
+        for priority in PRIORITIES:
+            queue = self._queues[priority]
+            while queue:
+                slot = queue.popleft()
+                if not slot.done():  # skip waiters that timed out or left
+                    slot.set_result(None)
+                    return
+        self.inflight -= 1
+
+    @asynccontextmanager
+    async def admit(self, critical: bool = False):
+        """Hold a slot for the body of the block"""
+        granted_at = await self.acquire(critical)
+        try:
+            yield
+        finally:
+            self.release(granted_at)
+
+    def _granted(self, priority: str, start: float) -> float:
+        now = self.clock()
+        self.admitted += 1
+        if self.metrics is not None:
+            self.metrics.record_admission(priority, now - start)
+        return now
+
+    def _shed(self, priority: str, reason: str, wait: float):
+        self.shed += 1
+        if self.metrics is not None:
+            self.metrics.record_shed(priority, reason)
+        raise Overloaded(max(wait, self.queue_timeout), reason)
+
+    def stats(self) -> Dict:
+        return {
+            'inflight': self.inflight,
+            'max_inflight': self.max_inflight,
+            'queued': dict(self._waiting),
+            'admitted': self.admitted,
+            'shed': self.shed,
+            'service_time_ms': round(self.service_time * 1000, 1)
+        }
+
+
+def retry_after_header(exc: Overloaded) -> str:
+    """Retry-After value: whole seconds, at least one"""
+    return str(max(math.ceil(exc.retry_after), 1))
@@ -2,35 +2,168 @@
 Inference Service - Real-time AI processing for voice therapy
 """
 import os
+import sys
+import time
 import asyncio
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import StreamingResponse
+import threading
+
+# Cold start is timed from here; see STARTUP_PROFILE below
+_started = time.perf_counter()
+_preloaded = set(sys.modules)
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from opentelemetry import propagate
+from opentelemetry.trace import SpanKind
+from prometheus_client import make_asgi_app
 from pydantic import BaseModel
-import openai
-from typing import Optional, AsyncGenerator
+from starlette.background import BackgroundTask
+from typing import Optional, AsyncGenerator, Tuple
 import logging
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Shared pipeline modules live in the repository's src/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'src'))
+
+from pipeline.emotion import get_lexicon
+from pipeline.http_pool import ClientPool
+from pipeline.metrics import get_metrics
+from pipeline.prompt import Prompt, PromptBuilder
+from pipeline.startup import StartupProfile, import_profile, loaded_since
+from pipeline.tracing import RISK_ATTRIBUTE, configure_tracing, get_tracer
+from admission import AdmissionController, Overloaded, retry_after_header
+from response_cache import ResponseCache
+from session_store import SessionStore
+
+# Initialization time per phase, logged at startup when STARTUP_PROFILE is true
+startup = StartupProfile(start=_started)
+startup.mark('imports')
+
 # Initialize FastAPI
 app = FastAPI(title="Intune-Care Inference Service")
 
-# Configure OpenAI
-openai.api_key = os.getenv("OPENAI_API_KEY")
+# Prometheus scrape endpoint for the stage histograms and counters
+metrics = get_metrics()
+app.mount("/metrics", make_asgi_app())
+
+# Tail-sampled spans, continuing the caller's trace from its traceparent header
+configure_tracing({
+    'enabled': os.getenv("TRACING_ENABLED", "true").lower() == "true",
+    'budget_ms': float(os.getenv("TRACE_BUDGET_MS", "700")),
+    'sample_ratio': float(os.getenv("TRACE_SAMPLE_RATIO", "0.05"))
+})
+tracer = get_tracer(__name__)
+startup.mark('metrics and tracing')
+
+# Emotion lexicon shared with the CLI pipeline, compiled once
+lexicon = get_lexicon()
+
+# Recent exchanges per session_id, so clients only send the new utterance
+sessions = SessionStore.from_env()
+
+# Generated responses, reused for identical prompt and context
+response_cache = ResponseCache.from_env(context_window=sessions.window)
+metrics.track_cache('response', response_cache,
+                    lambda cache: {'hit': cache.hits, 'miss': cache.misses})
+
+# Bounded in-flight requests; crisis requests queue first, the rest are shed
+# with a Retry-After hint once they would wait past the queue budget
+admission = AdmissionController.from_env(metrics=metrics)
+
+# Safety scores below this are treated as crisis turns
+CRITICAL_SAFETY_SCORE = 0.5
+startup.mark('stores')
+
+SYSTEM_PROMPT = """You are a compassionate AI therapist specializing in CBT. 
+    You understand Korean culture deeply, including concepts like 한(han), 정(jeong), and 눈치(nunchi).
+    Respond with empathy, validation, and gentle guidance.
+    Keep responses concise (2-3 sentences) for natural conversation flow."""
+
+# Recent context packed into a prompt token budget, counts memoized per message
+prompt_builder = PromptBuilder(
+    SYSTEM_PROMPT,
+    budget=int(os.getenv("PROMPT_TOKEN_BUDGET", "1500"))
+)
+
+# OpenAI client on a pooled keep-alive connection, built on first use
+http_pool = ClientPool()
+_openai_client = None
+_openai_lock = threading.Lock()
+startup.mark('clients')
+
+def get_openai_client():
+    """Return the shared OpenAI client; the SDK is imported on the first call"""
+    global _openai_client
+    if _openai_client is None:
+        with _openai_lock:
+            if _openai_client is None:
+                from openai import AsyncOpenAI
+                _openai_client = AsyncOpenAI(
+                    api_key=os.getenv("OPENAI_API_KEY"),
+                    http_client=http_pool.client('openai')
+                )
+    return _openai_client
+
+@app.on_event("startup")
+async def prewarm_connections():
+    """
+    Load the OpenAI SDK and open its connection in the background, so the
+    service accepts requests without waiting; an early request finishes
+    loading it itself
+    """
+    async def prewarm():
+        await asyncio.to_thread(get_openai_client)
+        await http_pool.prewarm(['openai'])
+        startup.mark('openai prewarm')
+        if os.getenv("STARTUP_PROFILE", "false").lower() == "true":
+            imports = await asyncio.to_thread(
+                import_profile, loaded_since(_preloaded), sys.path[:1] + [os.path.dirname(__file__)]
+            )
+            logger.info(f"Startup profile: {startup.report(imports)}")
+    
+    startup.mark('ready')
+    app.state.prewarm = asyncio.create_task(prewarm())
+    app.state.prewarm.add_done_callback(log_prewarm_failure)
+
+def log_prewarm_failure(task: asyncio.Task):
+    """Report a failed prewarm when it happens, not when the task is collected"""
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"OpenAI prewarm failed, requests will connect on demand: {task.exception()!r}")
+
+@app.on_event("shutdown")
+async def close_connections():
+    prewarm = getattr(app.state, 'prewarm', None)
+    if prewarm is not None:
+        prewarm.cancel()
+        await asyncio.gather(prewarm, return_exceptions=True)
+    await http_pool.aclose()
 
 class TranscriptRequest(BaseModel):
     text: str
     session_id: str
     emotion: Optional[dict] = None
-    context: Optional[list] = []
+    # Deprecated: history is kept server-side; when sent it replaces the stored context
+    context: Optional[list] = None
 
 class InferenceResponse(BaseModel):
     response: str
     emotion: dict
     safety_score: float
     processing_time_ms: int
+    cached: bool = False
+    prompt_tokens: int = 0
+
+@app.exception_handler(Overloaded)
+async def shed_request(request: Request, exc: Overloaded):
+    """Tell the client when to retry a shed request"""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "overloaded", "retry_after_ms": int(exc.retry_after * 1000)},
+        headers={"Retry-After": retry_after_header(exc)}
+    )
 
 @app.get("/health")
 async def health_check():
@@ -41,75 +174,159 @@ async def health_check():
         "service": "inference"
     }
 
+@app.post("/lexicon/reload")
+async def reload_lexicon():
+    """Recompile the emotion lexicon if its file changed"""
+    return {"reloaded": lexicon.reload()}
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Response cache hit rate"""
+    return response_cache.stats()
+
+@app.get("/admission/stats")
+async def admission_stats():
+    """In-flight requests, queue depth and shed count"""
+    return admission.stats()
+
+@app.get("/sessions/stats")
+async def session_stats():
+    """Session store size and evictions"""
+    return sessions.stats()
+
+@app.delete("/sessions/{session_id}")
+async def end_session(session_id: str):
+    """Forget a session's stored context"""
+    return {"dropped": sessions.drop(session_id)}
+
 @app.post("/process")
-async def process_transcript(request: TranscriptRequest):
+async def process_transcript(request: TranscriptRequest, http_request: Request):
     """Process transcript and generate response"""
     import time
-    start_time = time.time()
+    start_time = time.perf_counter()
     
-    try:
-        # Generate therapeutic response
-        response = await generate_response(
-            request.text,
-            request.context,
-            request.emotion
-        )
-        
-        # Analyze emotion
-        emotion = analyze_emotion(request.text)
-        
-        # Calculate safety score
-        safety_score = calculate_safety_score(request.text, response)
-        
-        processing_time = int((time.time() - start_time) * 1000)
-        
-        return InferenceResponse(
-            response=response,
-            emotion=emotion,
-            safety_score=safety_score,
-            processing_time_ms=processing_time
-        )
-        
-    except Exception as e:
-        logger.error(f"Processing error: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    # Server span continuing the gateway's trace, if it sent a traceparent
+    with tracer.start_as_current_span(
+        "inference.process",
+        context=propagate.extract(http_request.headers),
+        kind=SpanKind.SERVER
+    ) as span:
+        # Crisis turns jump the admission queue; others may be shed with a 503
+        async with admission.admit(is_crisis(request.text)):
+            try:
+                # Generate therapeutic response, reusing an identical earlier one
+                prompt = prompt_builder.build(request.text, session_context(request))
+                llm_start = time.perf_counter()
+                with tracer.start_as_current_span("llm") as llm_span:
+                    response, cached = await cached_response(request.text, prompt, request.emotion)
+                    llm_span.set_attributes({
+                        'intune.cached': cached,
+                        'intune.prompt_tokens': prompt.tokens
+                    })
+                llm_seconds = time.perf_counter() - llm_start
+                sessions.append(request.session_id, request.text, response)
+            
+                # Analyze emotion
+                emotion = analyze_emotion(request.text)
+            
+                # Calculate safety score
+                safety_score = calculate_safety_score(request.text, response)
+                risk_level = "critical" if safety_score < CRITICAL_SAFETY_SCORE else "low"
+                span.set_attribute(RISK_ATTRIBUTE, risk_level)
+            
+                total_seconds = time.perf_counter() - start_time
+                processing_time = int(total_seconds * 1000)
+                metrics.record_turn("live", risk_level, {'llm': llm_seconds, 'total': total_seconds})
+            
+                return InferenceResponse(
+                    response=response,
+                    emotion=emotion,
+                    safety_score=safety_score,
+                    processing_time_ms=processing_time,
+                    cached=cached,
+                    prompt_tokens=prompt.tokens
+                )
+            
+            except Exception as e:
+                logger.error(f"Processing error: {str(e)}")
+                raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/stream")
-async def stream_response(request: TranscriptRequest):
+async def stream_response(request: TranscriptRequest, http_request: Request):
     """Stream response for real-time interaction"""
-    async def generate():
-        async for chunk in stream_therapeutic_response(
-            request.text,
-            request.context,
-            request.emotion
-        ):
-            yield f"data: {chunk}\n\n"
-    
-    return StreamingResponse(generate(), media_type="text/event-stream")
-
-async def generate_response(text: str, context: list, emotion: dict) -> str:
-    """Generate therapeutic response using GPT-4o"""
-    
-    system_prompt = """You are a compassionate AI therapist specializing in CBT. 
-    You understand Korean culture deeply, including concepts like 한(han), 정(jeong), and 눈치(nunchi).
-    Respond with empathy, validation, and gentle guidance.
-    Keep responses concise (2-3 sentences) for natural conversation flow."""
+    # The slot is held until the stream ends, so shedding happens before any
+    # bytes are sent; released by the generator, or after a disconnect
+    critical = is_crisis(request.text)
+    granted_at = await admission.acquire(critical)
+    released = False
     
-    messages = [
-        {"role": "system", "content": system_prompt}
-    ]
+    def release():
+        nonlocal released
+        if not released:
+            released = True
+            admission.release(granted_at)
     
-    # Add context from previous conversation
-    for ctx in context[-5:]:  # Last 5 exchanges
-        messages.append({"role": "user", "content": ctx["user"]})
-        messages.append({"role": "assistant", "content": ctx["assistant"]})
+    async def generate():
+        chunks = []
+        try:
+            prompt = prompt_builder.build(request.text, session_context(request))
+            span.set_attribute('intune.prompt_tokens', prompt.tokens)
+            async for chunk in stream_therapeutic_response(prompt, request.emotion):
+                chunks.append(chunk)
+                yield f"data: {chunk}\n\n"
+            sessions.append(request.session_id, request.text, "".join(chunks))
+        finally:
+            span.set_attribute('intune.chunks', len(chunks))
+            span.end()
+            release()
     
-    # Add current message
-    messages.append({"role": "user", "content": text})
+    # Until the response exists nothing else will release the slot, so a
+    # failure here must, or admission capacity shrinks for good
+    span = None
+    try:
+        # Ended by the generator, which outlives this handler
+        span = tracer.start_span(
+            "inference.stream",
+            context=propagate.extract(http_request.headers),
+            kind=SpanKind.SERVER,
+            attributes={RISK_ATTRIBUTE: "critical" if critical else "low"}
+        )
+        return StreamingResponse(
+            generate(), media_type="text/event-stream", background=BackgroundTask(release)
+        )
+    except BaseException:
+        if span is not None:
+            span.end()
+        release()
+        raise
+
+def session_context(request: TranscriptRequest) -> list:
+    """The session's stored exchanges, replaced first by any context sent with the request"""
+    if request.context is not None:
+        sessions.replace(request.session_id, request.context)
+    return sessions.context(request.session_id)
+
+async def cached_response(text: str, prompt: Prompt, emotion: dict) -> Tuple[str, bool]:
+    """Return (response, cached), calling the model only on a cache miss"""
+    key = response_cache.key(
+        SYSTEM_PROMPT, prompt.context, text,
+        model=os.getenv("MODEL_NAME", "gpt-4o"),
+        max_tokens=int(os.getenv("MAX_TOKENS", "500")),
+        temperature=float(os.getenv("TEMPERATURE", "0.7"))
+    )
+    response = await response_cache.get(key)
+    if response is not None:
+        return response, True
     
-    response = await openai.ChatCompletion.acreate(
+    response = await generate_response(prompt, emotion)
+    await response_cache.set(key, response)
+    return response, False
+
+async def generate_response(prompt: Prompt, emotion: dict) -> str:
+    """Generate therapeutic response using GPT-4o"""
+    response = await get_openai_client().chat.completions.create(
         model=os.getenv("MODEL_NAME", "gpt-4o"),
-        messages=messages,
+        messages=prompt.messages,
         max_tokens=int(os.getenv("MAX_TOKENS", "500")),
         temperature=float(os.getenv("TEMPERATURE", "0.7")),
     )
@@ -117,72 +334,28 @@ async def generate_response(text: str, context: list, emotion: dict) -> str:
     return response.choices[0].message.content
 
 async def stream_therapeutic_response(
-    text: str, 
-    context: list, 
+    prompt: Prompt, 
     emotion: dict
 ) -> AsyncGenerator[str, None]:
     """Stream therapeutic response for low latency"""
-    
-    system_prompt = """You are a compassionate AI therapist. 
-    Respond with empathy and understanding.
-    Keep responses natural and conversational."""
-    
-    messages = [
-        {"role": "system", "content": system_prompt},
-        {"role": "user", "content": text}
-    ]
-    
-    stream = await openai.ChatCompletion.acreate(
+    stream = await get_openai_client().chat.completions.create(
         model=os.getenv("MODEL_NAME", "gpt-4o"),
-        messages=messages,
+        messages=prompt.messages,
         stream=True,
         max_tokens=int(os.getenv("MAX_TOKENS", "500")),
     )
     
     async for chunk in stream:
-        if chunk.choices[0].delta.get("content"):
+        if chunk.choices and chunk.choices[0].delta.content:
             yield chunk.choices[0].delta.content
 
 def analyze_emotion(text: str) -> dict:
     """Analyze emotional content of the text"""
-    # Placeholder - would use Korean emotion model
-    keywords = {
-        "슬퍼": "sadness",
-        "우울": "depression", 
-        "기뻐": "joy",
-        "화나": "anger",
-        "불안": "anxiety",
-        "외로워": "loneliness"
-    }
-    
-    detected = "neutral"
-    confidence = 0.5
-    
-    for korean, emotion in keywords.items():
-        if korean in text:
-            detected = emotion
-            confidence = 0.8
-            break
-    
-    # Check for Korean cultural emotions
-    cultural_emotions = {
-        "한": 0.0,
-        "정": 0.0,
-        "눈치": 0.0
-    }
-    
-    if "그리움" in text or "서러움" in text:
-        cultural_emotions["한"] = 0.7
-    if "고마워" in text or "정들었" in text:
-        cultural_emotions["정"] = 0.7
-    if "미안" in text or "부담" in text:
-        cultural_emotions["눈치"] = 0.6
-    
-    return {
-        "primary": detected,
-        "confidence": confidence,
-        "cultural": cultural_emotions
-    }
+    return lexicon.analyze(text)
+
+def is_crisis(text: str) -> bool:
+    """Cheap pre-check on the request text alone, before any model call"""
+    return calculate_safety_score(text, "") < CRITICAL_SAFETY_SCORE
 
 def calculate_safety_score(user_text: str, ai_response: str) -> float:
     """Calculate safety score for the interaction"""
@@ -0,0 +1,202 @@
+"""
+Response Cache - Reuse model answers for identical prompts
+Keyed on the system prompt, trimmed context window and normalized text
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_text(text: str) -> str:
+    """NFC-normalize and collapse whitespace so retries share a key"""
+    return ' '.join(unicodedata.normalize('NFC', text).split())
+
+
+class MemoryBackend:
+    """In-process LRU with per-entry expiry"""
+
+    def __init__(self, max_items: int = 1024):
+        self.max_items = max_items
+        self.evictions = 0
+        self._entries: 'OrderedDict[str, Tuple[float, str]]' = OrderedDict()
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: str, ttl: float):
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_items:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def close(self):
+        self._entries.clear()
+
+
+class RedisBackend:
+    """
+    Minimal Redis-protocol (RESP) client over one keep-alive connection.
+
+    Only GET and SET ... PX are used, so any RESP server works. Expiry is
+    done by the server; size-bounded eviction is the server's maxmemory
+    policy (allkeys-lru).
+    """
+
+    def __init__(self, url: str = "redis://localhost:6379/0", prefix: str = "inference:response:"):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or 'localhost'
+        self.port = parsed.port or 6379
+        self.db = int(parsed.path.lstrip('/') or 0)
+        self.password = parsed.password
+        self.prefix = prefix
+        self.evictions = 0  # reported by the server, not tracked here
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._lock = asyncio.Lock()
+
+    async def get(self, key: str) -> Optional[str]:
+        value = await self._command('GET', self.prefix + key)
+        return value.decode('utf-8') if value is not None else None
+
+    async def set(self, key: str, value: str, ttl: float):
+        await self._command('SET', self.prefix + key, value, 'PX', str(max(int(ttl * 1000), 1)))
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._reader = self._writer = None
+
+    async def _command(self, *args: str):
+        async with self._lock:
+            if self._writer is None:
+                await self._connect()
+            try:
+                return await self._send(*args)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                # Server closed an idle connection; retry once on a new one
+                await self._connect()
+                return await self._send(*args)
+
+    async def _connect(self):
+        await self.close()
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        if self.password:
+            await self._send('AUTH', self.password)
+        if self.db:
+            await self._send('SELECT', str(self.db))
+
+    async def _send(self, *args: str):
+        parts = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = arg.encode('utf-8')
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        self._writer.write(b"".join(parts))
+        await self._writer.drain()
+        return await self._read_reply()
+
+    async def _read_reply(self):
+        line = await self._reader.readuntil(b"\r\n")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload
+        if kind == b"-":
+            raise RuntimeError(f"Redis error: {payload.decode()}")
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            length = int(payload)
+            if length < 0:
+                return None
+            data = await self._reader.readexactly(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            return [await self._read_reply() for _ in range(int(payload))]
+        raise RuntimeError(f"Unexpected Redis reply: {line!r}")
+
+
+class ResponseCache:
+    """
+    Cache of generated responses with hit-rate counters.
+
+    Backend failures are logged and treated as misses, so the cache can
+    never take the inference path down.
+    """
+
+    def __init__(self, backend=None, ttl: float = 300.0, context_window: int = 5):
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.ttl = ttl
+        self.context_window = context_window
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    @classmethod
+    def from_env(cls, context_window: int = 5) -> 'ResponseCache':
+        """RESPONSE_CACHE_URL=redis://... selects Redis, otherwise in-process"""
+        url = os.getenv("RESPONSE_CACHE_URL")
+        if url:
+            backend = RedisBackend(url)
+        else:
+            backend = MemoryBackend(int(os.getenv("RESPONSE_CACHE_SIZE", "1024")))
+        return cls(
+            backend,
+            ttl=float(os.getenv("RESPONSE_CACHE_TTL", "300")),
+            context_window=context_window
+        )
+
+    def key(self, system_prompt: str, context: List[Dict], text: str, **params) -> str:
+        """Hash of everything that determines the model's answer"""
+        material = json.dumps(
+            [system_prompt, context[-self.context_window:], normalize_text(text), params],
+            ensure_ascii=False, sort_keys=True
+        )
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    async def get(self, key: str) -> Optional[str]:
+        try:
+            value = await self.backend.get(key)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Response cache get failed: {e}")
+            value = None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: str):
+        try:
+            await self.backend.set(key, value, self.ttl)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Response cache set failed: {e}")
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            'backend': type(self.backend).__name__,
+            'hits': self.hits,
+            'misses': self.misses,
+            'errors': self.errors,
+            'evictions': self.backend.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
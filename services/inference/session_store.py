@@ -0,0 +1,139 @@
+"""
+Session Store - Server-side conversation context per session_id
+Clients send only the new utterance; recent exchanges are kept here
+"""
+import os
+import sys
+import time
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+# Approximate cost of a session record, a short key and its dict slot
+# on CPython 3.11, before any exchanges are stored
+_SESSION_OVERHEAD = 200
+
+
+class _Session:
+    """Last exchanges of one conversation as a flat (user, assistant, ...) tuple"""
+    __slots__ = ('turns', 'last_seen', 'size')
+
+    def __init__(self, now: float):
+        self.turns: Tuple[str, ...] = ()
+        self.last_seen = now
+        self.size = _SESSION_OVERHEAD
+
+
+class SessionStore:
+    """
+    Bounded in-process store of recent exchanges keyed by session_id.
+
+    Each session keeps at most ``window`` exchanges; older ones fall off
+    as new ones arrive. Sessions are held in least-recently-used order,
+    so idle sessions and, past ``max_bytes``, the least recently active
+    ones are evicted from the front in amortized constant time.
+    """
+
+    def __init__(
+        self,
+        window: int = 10,
+        idle_ttl: float = 1800.0,
+        max_bytes: int = 256 * 1024 * 1024,
+        clock=time.monotonic
+    ):
+        self.window = window
+        self.idle_ttl = idle_ttl
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self.bytes = 0
+        self.evictions = 0
+        self._sessions: 'OrderedDict[str, _Session]' = OrderedDict()
+
+    @classmethod
+    def from_env(cls) -> 'SessionStore':
+        """SESSION_WINDOW, SESSION_IDLE_TTL and SESSION_MAX_MB tune the bounds"""
+        return cls(
+            window=int(os.getenv("SESSION_WINDOW", "10")),
+            idle_ttl=float(os.getenv("SESSION_IDLE_TTL", "1800")),
+            max_bytes=int(float(os.getenv("SESSION_MAX_MB", "256")) * 1024 * 1024)
+        )
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def context(self, session_id: str) -> List[Dict[str, str]]:
+        """Recent exchanges, oldest first, in the request ``context`` shape"""
+        self._expire()
+        session = self._sessions.get(session_id)
+        if session is None:
+            return []
+        self._touch(session_id, session)
+        turns = session.turns
+        return [{"user": turns[i], "assistant": turns[i + 1]} for i in range(0, len(turns), 2)]
+
+    def append(self, session_id: str, user: str, assistant: str):
+        """Record one exchange, dropping the oldest beyond the window"""
+        session = self._session(session_id)
+        self._store(session, session.turns + (user, assistant))
+
+    def replace(self, session_id: str, context: List[Dict[str, str]]):
+        """Make ``context`` (in the request shape) the session's stored exchanges"""
+        turns = tuple(text for exchange in context
+                      for text in (exchange.get("user", ""), exchange.get("assistant", "")))
+        self._store(self._session(session_id), turns)
+
+    def drop(self, session_id: str) -> bool:
+        """Forget a session; returns True if it existed"""
+        session = self._sessions.pop(session_id, None)
+        if session is None:
+            return False
+        self.bytes -= session.size
+        return True
+
+    def stats(self) -> Dict:
+        self._expire()
+        return {
+            'sessions': len(self._sessions),
+            'bytes': self.bytes,
+            'max_bytes': self.max_bytes,
+            'evictions': self.evictions
+        }
+
+    def _session(self, session_id: str) -> _Session:
+        self._expire()
+        session = self._sessions.get(session_id)
+        if session is None:
+            session = _Session(self.clock())
+            self._sessions[session_id] = session
+            self.bytes += session.size
+        else:
+            self._touch(session_id, session)
+        return session
+
+    def _store(self, session: _Session, turns: Tuple[str, ...]):
+        turns = turns[-2 * self.window:] if self.window else ()
+        size = _SESSION_OVERHEAD + sys.getsizeof(turns) + sum(sys.getsizeof(t) for t in turns)
+        self.bytes += size - session.size
+        session.turns = turns
+        session.size = size
+
+        while self.bytes > self.max_bytes and self._sessions:
+            self._evict()
+
+    def _touch(self, session_id: str, session: _Session):
+        session.last_seen = self.clock()
+        self._sessions.move_to_end(session_id)
+
+    def _expire(self):
+        # Sessions are in last_seen order, so idle ones sit at the front
+        deadline = self.clock() - self.idle_ttl
+        sessions = self._sessions
+        while sessions:
+            oldest = next(iter(sessions.values()))
+            if oldest.last_seen > deadline:
+                break
+            self._evict()
+
+    def _evict(self):
+        _, session = self._sessions.popitem(last=False)
+        self.bytes -= session.size
+        self.evictions += 1
@@ -1,44 +1,214 @@
 """
 Configuration settings loader
+Parsed once, merged over the defaults, and hot-reloaded when the file changes
 """
+import copy
+import logging
 import os
+import threading
 import yaml
 from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping, Optional, Union
 
-def load_settings():
-    """Load settings from YAML file"""
-    config_path = Path(__file__).parent / "settings.yaml"
-    
-    # Default settings
-    settings = {
-        'mode': 'mock',
-        'latency_budget': {
-            'asr': 90,
-            'safety': 50,
-            'llm': 280,
-            'postprocess': 30,
-            'tts': 180,
-            'total_target': 700
-        },
-        'models': {
-            'asr': 'deepgram-korean',
-            'llm': 'gpt-4o',
-            'tts': 'elevenlabs-korean'
-        },
-        'safety': {
-            'escalation_threshold': 0.8,
-            'monitoring_threshold': 0.6
-        }
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = Path(__file__).parent / "settings.yaml"
+
+# libyaml's parser when PyYAML was built with it; several times faster at startup
+_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+# INTUNE__LATENCY_BUDGET__LLM=300 overrides latency_budget.llm; values are YAML
+ENV_PREFIX = 'INTUNE__'
+
+DEFAULTS = {
+    'mode': 'mock',
+    'latency_budget': {
+        'asr': 90,
+        'safety': 50,
+        'llm': 280,
+        'postprocess': 30,
+        'tts': 180,
+        'total_target': 700
+    },
+    'models': {
+        'asr': 'deepgram-korean',
+        'llm': 'gpt-4o',
+        'tts': 'elevenlabs-korean'
+    },
+    'safety': {
+        'escalation_threshold': 0.8,
+        'monitoring_threshold': 0.6
     }
-    
-    # Load from file if exists
-    if config_path.exists():
-        with open(config_path) as f:
-            file_settings = yaml.safe_load(f)
-            settings.update(file_settings)
-    
-    # Override with environment variables
-    if os.getenv('INTUNE_MODE'):
-        settings['mode'] = os.getenv('INTUNE_MODE')
-    
-    return settings
\ No newline at end of file
+}
+
+
+def deep_merge(base: Mapping, override: Mapping) -> Dict:
+    """New dict of ``base`` with ``override`` merged in, section by section"""
+    merged = dict(base)
+    for key, value in override.items():
+        if isinstance(value, Mapping) and isinstance(merged.get(key), Mapping):
+            merged[key] = deep_merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def env_overrides(environ: Optional[Mapping[str, str]] = None) -> Dict:
+    """Nested overrides from INTUNE_MODE and INTUNE__SECTION__KEY variables"""
+    environ = os.environ if environ is None else environ
+    overrides: Dict = {}
+    for name, value in environ.items():
+        if not name.startswith(ENV_PREFIX):
+            continue
+        path = [part.lower() for part in name[len(ENV_PREFIX):].split('__') if part]
+        if not path:
+            continue
+        section = overrides
+        for key in path[:-1]:
+            section = section.setdefault(key, {})
+        section[path[-1]] = yaml.safe_load(value)
+    if environ.get('INTUNE_MODE'):
+        overrides['mode'] = environ['INTUNE_MODE']
+    return overrides
+
+
+class Settings:
+    """
+    Settings file merged over the defaults and environment overrides.
+
+    The merged settings are built once and swapped in as a whole, so a
+    lookup is a dictionary access and readers never see a half-applied
+    reload; treat what ``get`` returns as read-only. ``reload`` re-reads
+    the file when its mtime changed and calls the subscribers of every
+    top-level section whose value changed. A file that fails to parse is
+    logged and the previous settings stay in effect. ``watch`` polls for
+    changes from a daemon thread, so subscribers run on that thread.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Union[str, Path]] = None,
+        environ: Optional[Mapping[str, str]] = None
+    ):
+        self.path = Path(path or DEFAULT_PATH)
+        self._environ = environ
+        self._lock = threading.Lock()
+        self._subscribers: Dict[str, List[Callable[[Any], None]]] = {}
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._mtime = self._stat()
+        self.data = self._merge(self._read())
+        self.reloads = 0
+
+    def get(self, section: str, default: Any = None) -> Any:
+        return self.data.get(section, default)
+
+    def __getitem__(self, section: str) -> Any:
+        return self.data[section]
+
+    def copy(self) -> Dict:
+        """A private, mutable copy of the current settings"""
+        return copy.deepcopy(self.data)
+
+    def subscribe(self, section: str, callback: Callable[[Any], None]) -> Callable[[], None]:
+        """
+        Call ``callback(value)`` with a section's new value after each reload
+        that changes it; returns a function that unsubscribes
+        """
+        with self._lock:
+            self._subscribers.setdefault(section, []).append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                callbacks = self._subscribers.get(section, [])
+                if callback in callbacks:
+                    callbacks.remove(callback)
+        return unsubscribe
+
+    def reload(self, force: bool = False) -> bool:
+        """Re-read the file if it changed; returns True if settings were swapped"""
+        with self._lock:
+            mtime = self._stat()
+            if not force and mtime == self._mtime:
+                return False
+            # Remembered even on failure, so a bad file is reported once per edit
+            self._mtime = mtime
+            try:
+                data = self._merge(self._read())
+            except (OSError, yaml.YAMLError) as e:
+                logger.warning(f"Settings reload from {self.path} failed, keeping previous: {e}")
+                return False
+            previous, self.data = self.data, data
+            self.reloads += 1
+            changed = [
+                (data.get(section), list(callbacks))
+                for section, callbacks in self._subscribers.items()
+                if data.get(section) != previous.get(section)
+            ]
+        for value, callbacks in changed:
+            for callback in callbacks:
+                try:
+                    callback(value)
+                except Exception as e:
+                    logger.warning(f"Settings subscriber {callback!r} failed: {e}")
+        return True
+
+    def watch(self, interval: float = 1.0):
+        """Poll the file's mtime every ``interval`` seconds; idempotent"""
+        with self._lock:
+            if self._watcher is not None:
+                return
+            self._stop.clear()
+            self._watcher = threading.Thread(
+                target=self._poll, args=(interval,), name='settings-watch', daemon=True
+            )
+            self._watcher.start()
+
+    def stop(self):
+        """Stop the watcher thread, if one is running"""
+        with self._lock:
+            watcher, self._watcher = self._watcher, None
+        if watcher is not None:
+            self._stop.set()
+            watcher.join()
+
+    def _poll(self, interval: float):
+        while not self._stop.wait(interval):
+            self.reload()
+
+    def _stat(self) -> Optional[float]:
+        try:
+            return os.stat(self.path).st_mtime
+        except OSError:
+            return None
+
+    def _read(self) -> Dict:
+        if not self.path.exists():
+            return {}
+        with open(self.path, encoding='utf-8') as f:
+            return yaml.load(f, Loader=_LOADER) or {}
+
+    def _merge(self, file_settings: Dict) -> Dict:
+        defaults = copy.deepcopy(DEFAULTS)
+        return deep_merge(deep_merge(defaults, file_settings), env_overrides(self._environ))
+
+
+_default_settings: Optional[Settings] = None
+_default_lock = threading.Lock()
+
+
+def get_settings() -> Settings:
+    """Return the process-wide settings, parsed on first use"""
+    global _default_settings
+    if _default_settings is None:
+        with _default_lock:
+            if _default_settings is None:
+                _default_settings = Settings()
+    return _default_settings
+
+
+def load_settings() -> Dict:
+    """Current settings as a fresh dict the caller may modify"""
+    settings = get_settings()
+    settings.reload()
+    return settings.copy()
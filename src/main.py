@@ -7,84 +7,190 @@ import argparse
 import time
 import json
 import asyncio
-from typing import Dict, Tuple
+from typing import TYPE_CHECKING, Dict, Optional, TextIO, Tuple
 import os
 import sys
 
 # Add src to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from pipeline import (
-    ASRProcessor,
-    SafetyGuard,
-    LLMProcessor,
-    PostProcessor,
-    TTSProcessor
-)
-from config.settings import load_settings
+# Pipeline stages load on first use, so --help and argument errors return
+# without importing them
+if TYPE_CHECKING:
+    from pipeline import VoicePipeline
+
+# One long-lived pipeline per mode, built on first use
+_pipelines: Dict[str, 'VoicePipeline'] = {}
+
+def get_pipeline(mode: str = "mock", auto_warmup: bool = True) -> 'VoicePipeline':
+    """
+    Return the shared pipeline for a mode, building it once
+    It follows settings reloads of the latency budget and safety thresholds;
+    ``auto_warmup`` applies only when this call builds it
+    """
+    pipeline = _pipelines.get(mode)
+    if pipeline is None:
+        from pipeline import VoicePipeline
+        from pipeline.metrics import PipelineMetrics
+        from config.settings import get_settings
+        settings = get_settings()
+        # The CLI serves no /metrics, so prometheus_client is never loaded
+        pipeline = VoicePipeline(
+            settings.copy(), mode=mode, metrics=PipelineMetrics(enabled=False),
+            auto_warmup=auto_warmup
+        )
+        pipeline.watch(settings)
+        _pipelines[mode] = pipeline
+    return pipeline
 
 async def process_voice_pipeline(
     text: str, 
-    mode: str = "mock"
+    mode: str = "mock",
+    speculative: Optional[bool] = None
 ) -> Dict:
     """
     Main pipeline: ASR → Safety → LLM → Post → TTS
     Returns timing breakdown and response
     """
-    settings = load_settings()
-    start_time = time.perf_counter()
-    timings = {}
-    
-    # Initialize processors
-    asr = ASRProcessor(mode=mode)
-    safety = SafetyGuard(mode=mode)
-    llm = LLMProcessor(mode=mode)
-    post = PostProcessor(mode=mode)
-    tts = TTSProcessor(mode=mode)
-    
-    # 1. ASR (Speech-to-Text)
-    asr_start = time.perf_counter()
-    transcript = await asr.process(text)
-    timings['asr'] = int((time.perf_counter() - asr_start) * 1000)
-    
-    # 2. Safety Check (3 layers)
-    safety_start = time.perf_counter()
-    safety_result = await safety.check(transcript)
-    timings['safety'] = int((time.perf_counter() - safety_start) * 1000)
-    
-    if safety_result['risk_level'] == 'critical':
-        # Emergency response
-        response = safety_result['emergency_response']
-        emotion = {'primary': 'crisis', 'confidence': 1.0}
-    else:
-        # 3. LLM Processing
-        llm_start = time.perf_counter()
-        response, emotion = await llm.generate(transcript, safety_result)
-        timings['llm'] = int((time.perf_counter() - llm_start) * 1000)
-        
-        # 4. Post-processing
-        post_start = time.perf_counter()
-        response = await post.process(response)
-        timings['postprocess'] = int((time.perf_counter() - post_start) * 1000)
+    return await get_pipeline(mode).run_turn(text, speculative=speculative)
+
+async def stream_voice_pipeline(
+    text: str,
+    mode: str = "mock",
+    verbose: bool = True
+) -> Dict:
+    """
+    Streaming pipeline: audio segments are produced sentence by sentence
+    Returns the same result as process_voice_pipeline plus audio_segments
+    """
+    stream = get_pipeline(mode).stream_turn(text)
+    async for segment in stream:
+        if verbose:
+            print(f"🔊 [{segment['at_ms']}ms] {segment['audio_url']}")
+    return stream.result
+
+async def run_batch(
+    path: str,
+    output: TextIO,
+    mode: str = "mock",
+    concurrency: int = 8,
+    speculative: Optional[bool] = None
+) -> Dict:
+    """
+    Run every JSONL record of a corpus through one shared pipeline
+    Up to ``concurrency`` turns run at once and each result is written
+    as a JSONL line when it completes, tagged with its input line number.
+    Memory is bounded by the concurrency, not by the corpus size.
+    """
+    from pipeline.latency import LatencyHistogram
+    pipeline = get_pipeline(mode)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    latency = LatencyHistogram()
+    counts = {'turns': 0, 'errors': 0}
+    
+    async def worker():
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            line_no, line = item
+            try:
+                record = json.loads(line)
+                result = await pipeline.run_turn(record['text'], speculative=speculative)
+                latency.record(result['timings']['total'])
+                counts['turns'] += 1
+                row = {'line': line_no, **result}
+            except Exception as e:  # one bad record must not end a corpus run
+                counts['errors'] += 1
+                row = {'line': line_no, 'error': f"{type(e).__name__}: {e}"}
+            output.write(json.dumps(row, ensure_ascii=False) + "\n")
     
-    # 5. TTS (Text-to-Speech)
-    tts_start = time.perf_counter()
-    audio_url = await tts.synthesize(response, emotion)
-    timings['tts'] = int((time.perf_counter() - tts_start) * 1000)
+    async def produce():
+        for line_no, line in enumerate(source, 1):
+            if line.strip():
+                await queue.put((line_no, line))
+        for _ in workers:
+            await queue.put(None)
     
-    # Total time
-    timings['total'] = int((time.perf_counter() - start_time) * 1000)
+    # Opened before any task starts, so a bad path fails with nothing running
+    source = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    start = time.perf_counter()
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    tasks = [asyncio.create_task(produce()), *workers]
+    try:
+        # A worker that raises (say, output.write failing) ends the run;
+        # otherwise the producer would wait forever on a full queue
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    finally:
+        if source is not sys.stdin:
+            source.close()
+    output.flush()
     
+    wall = time.perf_counter() - start
     return {
-        'input': text,
-        'transcript': transcript,
-        'response': response,
-        'emotion': emotion,
-        'safety': safety_result,
-        'audio_url': audio_url,
-        'timings': timings
+        'turns': counts['turns'],
+        'errors': counts['errors'],
+        'concurrency': concurrency,
+        'wall_s': round(wall, 3),
+        'throughput_per_s': round(counts['turns'] / wall, 2) if wall else 0.0,
+        'latency_ms': latency.summary()
     }
 
+async def profile_startup(mode: str = "mock", text: str = "안녕하세요") -> Dict:
+    """
+    Time each startup phase of a long-running pipeline in this process,
+    warmup included, then the import time of every module it loaded, in a
+    fresh interpreter
+    """
+    from pipeline.startup import StartupProfile, import_profile, loaded_since
+    before = set(sys.modules)
+    profile = StartupProfile()
+    from config.settings import get_settings
+    settings = get_settings()
+    profile.mark('settings')
+    from pipeline.tracing import configure_tracing
+    configure_tracing(settings.get('tracing'))
+    profile.mark('tracing')
+    from pipeline import engine
+    profile.mark('import stages')
+    pipeline = get_pipeline(mode)
+    profile.mark('build pipeline')
+    await pipeline.warmup()
+    profile.mark('warmup')
+    await pipeline.run_turn(text)
+    profile.mark('first turn')
+    
+    imports = import_profile(loaded_since(before), path=[os.path.dirname(os.path.abspath(__file__))])
+    return profile.report(imports)
+
+def print_startup_profile(report: Dict):
+    """Pretty print a startup profile"""
+    print("\n🚀 Startup Profile:")
+    for phase, ms in report['phases_ms'].items():
+        print(f"├─ {phase}: {ms}ms")
+    print(f"└─ Total: {report['total_ms']}ms")
+    print("\n📦 Slowest imports (cumulative, fresh interpreter):")
+    for module, ms in report['imports_ms'].items():
+        print(f"- {module}: {ms}ms")
+    print("\n🔍 Slowest single modules (self time):")
+    for module, ms in report['slowest_self_ms'].items():
+        print(f"- {module}: {ms}ms")
+
+def print_batch_summary(summary: Dict, out: TextIO = sys.stderr):
+    """Pretty print a batch run's throughput and latency percentiles"""
+    latency = summary['latency_ms']
+    print(f"\n📦 Batch: {summary['turns']} turns, {summary['errors']} errors "
+          f"in {summary['wall_s']}s at concurrency {summary['concurrency']}", file=out)
+    print(f"├─ Throughput: {summary['throughput_per_s']} turns/s", file=out)
+    print(f"├─ Latency mean: {latency['mean']}ms, max: {latency['max']}ms", file=out)
+    print(f"└─ p50 {latency['p50']}ms | p90 {latency['p90']}ms | "
+          f"p95 {latency['p95']}ms | p99 {latency['p99']}ms", file=out)
+
 def print_results(result: Dict):
     """Pretty print the results"""
     print("\n🕒 Processing Timeline:")
@@ -92,7 +198,20 @@ def print_results(result: Dict):
     print(f"├─ Safety Check (3 layers): {result['timings']['safety']}ms")
     print(f"├─ LLM Processing: {result['timings'].get('llm', 0)}ms")
     print(f"├─ Post-processing: {result['timings'].get('postprocess', 0)}ms")
-    print(f"├─ TTS Generation: {result['timings']['tts']}ms")
+    if 'overlap_saved' in result['timings']:
+        print(f"├─ Safety/LLM Overlap Saved: {result['timings']['overlap_saved']}ms")
+    if result['timings'].get('tts_prerendered'):
+        audio = ("crisis audio" if result['safety']['risk_level'] == 'critical'
+                 else "curated reply")
+        print(f"├─ TTS Generation: pre-rendered {audio} (0ms)")
+    else:
+        print(f"├─ TTS Generation: {result['timings']['tts']}ms")
+    if 'first_audio' in result['timings']:
+        print(f"├─ Time to First Audio: {result['timings']['first_audio']}ms")
+    for stage in result['timings'].get('overruns', []):
+        fallback = result['timings'].get('fallbacks', {}).get(stage)
+        print(f"├─ ⚠️  {stage} overran its budget"
+              + (f", fell back to {fallback}" if fallback else ""))
     print(f"└─ Total Round-trip: {result['timings']['total']}ms", end="")
     
     if result['timings']['total'] < 700:
@@ -112,6 +231,8 @@ def print_results(result: Dict):
     
     print(f"\n🤖 AI Response:")
     print(f'"{result["response"]}"')
+    if result.get('fallback_stage'):
+        print(f"(curated reply: {result['fallback_stage']} overran its budget)")
     
     print(f"\n🔒 Safety Assessment:")
     safety = result['safety']
@@ -141,6 +262,43 @@ async def main():
         default="mock",
         help="Run in mock mode (no API keys) or live mode"
     )
+    parser.add_argument(
+        "--speculative", "-s",
+        action="store_true",
+        default=None,
+        help="Start LLM generation while the safety check is still running"
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream audio sentence by sentence (time-to-first-audio mode)"
+    )
+    parser.add_argument(
+        "--batch", "-b",
+        metavar="FILE",
+        help="Run every line of a JSONL corpus ('-' for stdin) and write JSONL results"
+    )
+    parser.add_argument(
+        "--concurrency", "-c",
+        type=int,
+        default=8,
+        help="Turns run at once in --batch mode"
+    )
+    parser.add_argument(
+        "--output", "-o",
+        default="-",
+        help="Where --batch writes JSONL results ('-' for stdout)"
+    )
+    parser.add_argument(
+        "--prewarm-tts",
+        action="store_true",
+        help="Render the configured TTS phrase list into the audio cache and exit"
+    )
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Report initialization time per startup phase and import time per module"
+    )
     parser.add_argument(
         "--json", "-j",
         action="store_true",
@@ -148,6 +306,8 @@ async def main():
     )
     
     args = parser.parse_args()
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
     
     if args.mode == "live":
         # Check for API keys
@@ -158,9 +318,57 @@ async def main():
             print("💡 Tip: Copy .env.example to .env and add your keys")
             sys.exit(1)
     
+    if args.profile_startup:
+        report = await profile_startup(args.mode, args.text)
+        if args.json:
+            print(json.dumps(report, ensure_ascii=False, indent=2))
+        else:
+            print_startup_profile(report)
+        return
+    
+    from config.settings import get_settings
+    from pipeline.tracing import configure_tracing
+    
+    # Spans are exported only when OTEL_EXPORTER_OTLP_ENDPOINT is set
+    settings = get_settings()
+    configure_tracing(settings.get('tracing'))
+    
     try:
-        # Run the pipeline
-        result = await process_voice_pipeline(args.text, args.mode)
+        if args.prewarm_tts:
+            summary = await get_pipeline(args.mode).prewarm_tts()
+            if args.json:
+                print(json.dumps(summary, ensure_ascii=False, indent=2))
+            else:
+                print(f"🔊 TTS cache pre-warmed: {summary['rendered']}/{summary['phrases']} "
+                      f"phrases synthesized, {summary['phrases'] - summary['rendered']} already cached")
+            return
+        
+        if args.batch:
+            # A long corpus run picks up settings.yaml edits; one-shot runs
+            # end before a reload could matter, so they start no watcher
+            settings.watch()
+            # Results go to --output; the summary goes to stderr
+            output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+            try:
+                summary = await run_batch(
+                    args.batch, output, args.mode, args.concurrency, args.speculative
+                )
+            finally:
+                if output is not sys.stdout:
+                    output.close()
+            if args.json:
+                print(json.dumps(summary, ensure_ascii=False), file=sys.stderr)
+            else:
+                print_batch_summary(summary)
+            return
+        
+        # Run the pipeline; a single turn would pay for warmup up front
+        # and never benefit from it
+        get_pipeline(args.mode, auto_warmup=False)
+        if args.stream:
+            result = await stream_voice_pipeline(args.text, args.mode, verbose=not args.json)
+        else:
+            result = await process_voice_pipeline(args.text, args.mode, args.speculative)
         
         if args.json:
             print(json.dumps(result, ensure_ascii=False, indent=2))
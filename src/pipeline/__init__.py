@@ -1,18 +1,65 @@
 """
 Pipeline components for Intune-Care Voice AI Therapist
 Each component supports mock and live modes
+
+Components are imported on first access, so importing one submodule
+(or the package for a single stage) does not load every stage and its
+provider SDKs.
 """
+import importlib
 
-from .asr import ASRProcessor
-from .safety import SafetyGuard
-from .llm import LLMProcessor
-from .postprocess import PostProcessor
-from .tts import TTSProcessor
+# Public name -> submodule that defines it
+_EXPORTS = {
+    'ASRProcessor': 'asr',
+    'TranscriptEvent': 'asr',
+    'TranscriptFanout': 'asr',
+    'Word': 'asr',
+    'SafetyGuard': 'safety',
+    'SafetySession': 'safety',
+    'LLMProcessor': 'llm',
+    'PostProcessor': 'postprocess',
+    'TTSProcessor': 'tts',
+    'VoicePipeline': 'engine',
+    'TurnStream': 'engine',
+    'SentenceSegmenter': 'segmenter',
+    'EmotionLexicon': 'emotion',
+    'get_lexicon': 'emotion',
+    'AudioCache': 'audio_cache',
+    'PromptBuilder': 'prompt',
+    'Deadline': 'deadline',
+    'Hedger': 'hedge'
+}
 
 __all__ = [
     'ASRProcessor',
-    'SafetyGuard', 
+    'TranscriptEvent',
+    'TranscriptFanout',
+    'Word',
+    'SafetyGuard',
+    'SafetySession',
     'LLMProcessor',
     'PostProcessor',
-    'TTSProcessor'
-]
\ No newline at end of file
+    'TTSProcessor',
+    'VoicePipeline',
+    'TurnStream',
+    'SentenceSegmenter',
+    'EmotionLexicon',
+    'get_lexicon',
+    'AudioCache',
+    'PromptBuilder',
+    'Deadline',
+    'Hedger'
+]
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{module}', __name__), name)
+    globals()[name] = value  # later lookups skip this hook
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -3,22 +3,90 @@ ASR (Automatic Speech Recognition) Module
 Deepgram integration with mock mode for demos
 """
 import asyncio
+import codecs
+import re
 import time
 import os
-from typing import Optional
+from typing import AsyncIterable, AsyncIterator, List, NamedTuple, Optional, Union
+
+from .http_pool import ClientPool
+
+WORD = re.compile(r'\S+')
+
+
+class Word(NamedTuple):
+    """One recognized word; offsets index into the transcript and never move"""
+    text: str
+    start: int
+    end: int
+
+
+class TranscriptEvent(NamedTuple):
+    """Partial or final transcript; each partial extends the previous one"""
+    text: str
+    words: List[Word]
+    is_final: bool
+
+
+class TranscriptFanout:
+    """
+    Deliver one transcript event stream to several subscribers.
+
+    Subscribe before calling ``run``; every subscriber receives every
+    event, ending with the final one.
+    """
+
+    def __init__(self, events: AsyncIterator[TranscriptEvent]):
+        self._events = events
+        self._queues: List[asyncio.Queue] = []
+
+    def subscribe(self) -> AsyncIterator[TranscriptEvent]:
+        queue: asyncio.Queue = asyncio.Queue()
+        self._queues.append(queue)
+        return self._drain(queue)
+
+    async def run(self) -> Optional[TranscriptEvent]:
+        """Pump events to subscribers and return the final event"""
+        last = None
+        try:
+            async for event in self._events:
+                last = event
+                for queue in self._queues:
+                    queue.put_nowait(event)
+        finally:
+            for queue in self._queues:
+                queue.put_nowait(None)
+        return last
+
+    @staticmethod
+    async def _drain(queue: asyncio.Queue) -> AsyncIterator[TranscriptEvent]:
+        while True:
+            event = await queue.get()
+            if event is None:
+                return
+            yield event
+
 
 class ASRProcessor:
-    def __init__(self, mode: str = "mock"):
+    def __init__(
+        self,
+        mode: str = "mock",
+        pool: Optional[ClientPool] = None,
+        words_per_second: float = 3.0
+    ):
         self.mode = mode
         self.target_latency = 90  # ms
         
+        # Mock streaming replays text at this speaking rate
+        self.words_per_second = words_per_second
+        
         if mode == "live":
             self.api_key = os.getenv("DEEPGRAM_API_KEY")
-            if self.api_key:
-                # Would initialize Deepgram client here
-                pass
+            # Keep-alive Deepgram client shared with the other stages
+            self.pool = pool or ClientPool()
+            self.params = {'model': 'nova-2', 'language': 'ko'}
     
-    async def process(self, audio_or_text: str) -> str:
+    async def process(self, audio_or_text: Union[bytes, str]) -> str:
         """
         Process audio to text (or pass through text in mock mode)
         """
@@ -29,12 +97,94 @@ class ASRProcessor:
             return audio_or_text
         
         else:  # live mode
-            # Real Deepgram API call would go here
-            # For now, simulate with realistic latency
-            await asyncio.sleep(self.target_latency / 1000)
+            # Text input (CLI demo) is already a transcript
+            if isinstance(audio_or_text, str):
+                return audio_or_text
             
-            # This would be replaced with actual Deepgram transcription
-            return audio_or_text
+            response = await self.pool.client('deepgram').post(
+                '/listen',
+                params=self.params,
+                content=audio_or_text,
+                headers={'Content-Type': 'audio/wav'}
+            )
+            response.raise_for_status()
+            result = response.json()
+            return result['results']['channels'][0]['alternatives'][0]['transcript']
+    
+    async def process_stream(
+        self,
+        frames: Union[str, AsyncIterable[Union[bytes, str]]]
+    ) -> AsyncIterator[TranscriptEvent]:
+        """
+        Streaming recognition
+        Yields a partial event whenever a word completes, then one final
+        event. In mock mode the input is text: a string is replayed at
+        ``words_per_second``, an async iterable of text chunks is
+        transcribed as it arrives.
+        """
+        if self.mode == "mock":
+            chunks = self._replay_words(frames) if isinstance(frames, str) else frames
+            async for event in self._transcribe_chunks(chunks):
+                yield event
+        
+        else:  # live mode
+            # Deepgram's streaming API needs a websocket client; until one
+            # is added, frames are sent as one pooled /listen request
+            if isinstance(frames, str):
+                transcript = frames
+            else:
+                audio = b"".join([frame async for frame in frames])
+                transcript = await self.process(audio)
+            async for event in self._transcribe_chunks(self._once(transcript)):
+                yield event
+    
+    async def _replay_words(self, text: str) -> AsyncIterator[str]:
+        """Yield text word by word at the mock speaking rate"""
+        interval = 1 / self.words_per_second if self.words_per_second > 0 else 0
+        for match in re.finditer(r'\S+\s*', text):
+            await asyncio.sleep(interval)
+            yield match.group()
+    
+    @staticmethod
+    async def _once(text: str) -> AsyncIterator[str]:
+        yield text
+    
+    @staticmethod
+    async def _transcribe_chunks(
+        chunks: AsyncIterable[Union[bytes, str]]
+    ) -> AsyncIterator[TranscriptEvent]:
+        # A character may be split across byte frames
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        # Text up to the end of the last completed word, and what follows it;
+        # only the short tail is rescanned when a chunk arrives
+        text = ""
+        tail = ""
+        words: List[Word] = []
+        
+        async for chunk in chunks:
+            if isinstance(chunk, bytes):
+                chunk = decoder.decode(chunk)
+            tail += chunk
+            
+            # A word is complete once whitespace follows it
+            cut = 0
+            for match in WORD.finditer(tail):
+                if match.end() == len(tail):
+                    break
+                words.append(Word(match.group(), len(text) + match.start(), len(text) + match.end()))
+                cut = match.end()
+            if cut:
+                text += tail[:cut]
+                tail = tail[cut:]
+                yield TranscriptEvent(text, list(words), False)
+        
+        # Whatever is left is the last word
+        tail += decoder.decode(b"", final=True)
+        cut = 0
+        for match in WORD.finditer(tail):
+            words.append(Word(match.group(), len(text) + match.start(), len(text) + match.end()))
+            cut = match.end()
+        yield TranscriptEvent(text + tail[:cut], list(words), True)
     
     def validate_korean(self, text: str) -> bool:
         """Check if text contains Korean characters"""
@@ -0,0 +1,146 @@
+"""
+TTS Audio Cache
+Content-addressed synthesized audio with a memory LRU in front of an
+optional memory-mapped on-disk store
+"""
+import hashlib
+import json
+import mmap
+import os
+import tempfile
+import threading
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+# Synthesized audio, either in-process bytes or a read-only disk mapping
+Audio = Union[bytes, mmap.mmap]
+
+
+def normalize_text(text: str) -> str:
+    """NFC-normalize and collapse whitespace so equivalent text shares a key"""
+    return ' '.join(unicodedata.normalize('NFC', text).split())
+
+
+def cache_key(text: str, voice_style: str, prosody: Dict) -> str:
+    """Key for one rendering of text in a voice style with prosody parameters"""
+    material = json.dumps(
+        [normalize_text(text), voice_style, prosody],
+        ensure_ascii=False, sort_keys=True
+    )
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+class AudioCache:
+    """
+    Two-tier audio cache.
+
+    The memory tier is an LRU bounded by entry count and total bytes.
+    The disk tier, when ``disk_dir`` is set, keeps one file per key and
+    is read through ``mmap``, so several uvicorn workers pointed at the
+    same directory share both the files and the OS page cache. Files are
+    written to a temporary name and renamed into place, so a reader never
+    sees a partial file.
+    """
+
+    def __init__(
+        self,
+        max_items: int = 256,
+        max_bytes: int = 64 * 1024 * 1024,
+        disk_dir: Optional[Union[str, Path]] = None
+    ):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        if self.disk_dir:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+
+        self._memory: 'OrderedDict[str, Audio]' = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'stores': 0
+        }
+
+    @classmethod
+    def from_settings(cls, settings: Optional[Dict]) -> 'AudioCache':
+        """Build from the ``tts_cache`` settings section"""
+        settings = settings or {}
+        return cls(
+            max_items=settings.get('memory_items', 256),
+            max_bytes=int(settings.get('memory_mb', 64) * 1024 * 1024),
+            disk_dir=os.getenv('INTUNE_TTS_CACHE_DIR', settings.get('disk_dir'))
+        )
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def get(self, key: str) -> Optional[Audio]:
+        """Return cached audio, promoting disk hits into memory"""
+        with self._lock:
+            audio = self._memory.get(key)
+            if audio is not None:
+                self._memory.move_to_end(key)
+                self.stats['memory_hits'] += 1
+                return audio
+
+        audio = self._read_disk(key)
+        with self._lock:
+            if audio is None:
+                self.stats['misses'] += 1
+                return None
+            self.stats['disk_hits'] += 1
+            self._remember(key, audio)
+        return audio
+
+    def put(self, key: str, audio: bytes):
+        """Store audio in memory and, if configured, on disk"""
+        self._write_disk(key, audio)
+        with self._lock:
+            self.stats['stores'] += 1
+            self._remember(key, audio)
+
+    def _remember(self, key: str, audio: Audio):
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous)
+        if len(audio) > self.max_bytes:
+            return
+
+        self._memory[key] = audio
+        self._memory_bytes += len(audio)
+        while len(self._memory) > self.max_items or self._memory_bytes > self.max_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self.stats['evictions'] += 1
+
+    def _path(self, key: str) -> Path:
+        return self.disk_dir / key[:2] / f"{key}.audio"
+
+    def _read_disk(self, key: str) -> Optional[Audio]:
+        if not self.disk_dir:
+            return None
+        try:
+            with open(self._path(key), 'rb') as f:
+                return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):  # missing or empty file
+            return None
+
+    def _write_disk(self, key: str, audio: bytes):
+        if not self.disk_dir:
+            return
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(audio)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
@@ -0,0 +1,52 @@
+"""
+Turn Deadlines
+End-to-end deadline per turn, split into per-stage cutoffs from latency_budget
+"""
+import time
+from typing import Callable, Dict, NamedTuple, Optional
+
+# Stages in the order a turn runs them
+STAGE_ORDER = ('asr', 'safety', 'llm', 'postprocess', 'tts')
+
+
+class TurnBudget(NamedTuple):
+    """A latency budget and whether it is enforced, replaced as one value"""
+    stages: Dict
+    enforce: bool
+
+    @classmethod
+    def from_settings(cls, budget: Optional[Dict]) -> 'TurnBudget':
+        """From a ``latency_budget`` section; an empty one is not enforced"""
+        budget = dict(budget or {})
+        return cls(budget, bool(budget) and budget.get('enforce', True))
+
+
+class Deadline:
+    """
+    A turn's deadline and the latest time each stage may finish.
+
+    The turn target is split across stages in proportion to their budgets,
+    so the slack between the summed budgets and the target is shared
+    rather than handed to whichever stage overruns first. Cutoffs are
+    absolute: a stage that finishes early leaves its savings to the next,
+    and one that overruns is stopped at its cutoff and falls back, which
+    keeps every later stage's share intact.
+    """
+
+    def __init__(self, budget: Dict, clock: Callable[[], float] = time.perf_counter):
+        self.clock = clock
+        self.start = clock()
+        self.total_ms = budget.get('total_target', 700)
+        self.end = self.start + self.total_ms / 1000
+
+        allotted = sum(budget.get(stage, 0) for stage in STAGE_ORDER) or 1
+        self._cutoffs: Dict[str, float] = {}
+        elapsed = 0.0
+        for stage in STAGE_ORDER:
+            elapsed += budget.get(stage, 0)
+            self._cutoffs[stage] = self.start + self.total_ms * elapsed / allotted / 1000
+
+    def remaining(self, stage: Optional[str] = None) -> float:
+        """Seconds left for ``stage``, or for the whole turn; never negative"""
+        cutoff = self.end if stage is None else self._cutoffs[stage]
+        return max(cutoff - self.clock(), 0.0)
@@ -0,0 +1,148 @@
+"""
+Emotion Lexicon Engine
+Compiled Korean emotion and cultural-marker scoring shared by the CLI
+pipeline and the inference service
+"""
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+DEFAULT_LEXICON = Path(__file__).parent.parent / "config" / "emotion_lexicon.yaml"
+
+
+class _Compiled(NamedTuple):
+    """One loaded lexicon, swapped in as a whole on reload"""
+    pattern: re.Pattern
+    # longest keyword at a position -> every (keyword, kind, name) found there
+    found_at: Dict[str, List[Tuple[str, str, str]]]
+    emotions: List[str]
+    cultural: Dict[str, float]
+    base: float
+    per_keyword: float
+    mtime: Optional[float]
+
+
+class EmotionLexicon:
+    """
+    Emotion scorer over a YAML lexicon.
+
+    The lexicon is compiled into one regex alternation when loaded, so
+    ``analyze`` finds every emotion keyword and cultural marker in a
+    single pass. At each position the alternation reports the longest
+    keyword; shorter keywords that are its prefixes are known from the
+    lexicon, so overlapping keywords are never missed. ``reload``
+    recompiles from disk when the file changed; analyses already running
+    keep the lexicon they started with.
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None):
+        self.path = Path(path or DEFAULT_LEXICON)
+        self._lock = threading.Lock()
+        self._compiled = self._compile()
+
+    def reload(self, force: bool = False) -> bool:
+        """Recompile if the lexicon file changed; returns True if reloaded"""
+        with self._lock:
+            if not force and self._mtime() == self._compiled.mtime:
+                return False
+            self._compiled = self._compile()
+            return True
+
+    def analyze(self, text: str) -> Dict:
+        """Score primary emotion, confidence and 한/정/눈치 markers"""
+        return self._analyze(self._compiled, text)
+
+    def analyze_many(self, texts: Iterable[str]) -> List[Dict]:
+        """Batch analyze; every text is scored against the same lexicon"""
+        compiled = self._compiled
+        return [self._analyze(compiled, text) for text in texts]
+
+    @staticmethod
+    def _analyze(compiled: _Compiled, text: str) -> Dict:
+        found = {emotion: set() for emotion in compiled.emotions}
+        cultural_emotions = dict.fromkeys(compiled.cultural, 0.0)
+
+        for keyword in compiled.pattern.findall(text):
+            for found_keyword, kind, name in compiled.found_at[keyword]:
+                if kind == 'emotion':
+                    found[name].add(found_keyword)
+                else:
+                    cultural_emotions[name] = compiled.cultural[name]
+
+        # Detect primary emotion
+        detected_emotion = 'neutral'
+        max_score = 0
+        for emotion in compiled.emotions:
+            score = len(found[emotion])
+            if score > max_score:
+                max_score = score
+                detected_emotion = emotion
+
+        return {
+            'primary': detected_emotion,
+            'confidence': min(max_score * compiled.per_keyword + compiled.base, 1.0),
+            'cultural': cultural_emotions
+        }
+
+    def _mtime(self) -> Optional[float]:
+        try:
+            return os.stat(self.path).st_mtime
+        except OSError:
+            return None
+
+    def _compile(self) -> _Compiled:
+        # Imported on first compile, so importing the pipeline loads no YAML parser
+        import yaml
+
+        mtime = self._mtime()
+        with open(self.path, encoding='utf-8') as f:
+            lexicon = yaml.load(f, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader)) or {}
+
+        emotions = lexicon.get('emotions', {})
+        cultural = lexicon.get('cultural', {})
+        confidence = lexicon.get('confidence', {})
+
+        keywords: Dict[str, List[Tuple[str, str]]] = {}
+        for emotion, words in emotions.items():
+            for keyword in words:
+                keywords.setdefault(keyword, []).append(('emotion', emotion))
+        for marker, spec in cultural.items():
+            for word in spec.get('words', []):
+                keywords.setdefault(word, []).append(('cultural', marker))
+        keywords.pop('', None)
+
+        found_at = {
+            keyword: [(keyword[:end], kind, name)
+                      for end in range(1, len(keyword) + 1)
+                      for kind, name in keywords.get(keyword[:end], ())]
+            for keyword in keywords
+        }
+        # Zero-width lookahead reports a match at every position
+        alternatives = '|'.join(re.escape(keyword) for keyword in
+                                sorted(keywords, key=len, reverse=True))
+
+        return _Compiled(
+            pattern=re.compile(f'(?=({alternatives}))' if keywords else r'(?!)'),
+            found_at=found_at,
+            emotions=list(emotions),
+            cultural={marker: float(spec.get('score', 0.0)) for marker, spec in cultural.items()},
+            base=float(confidence.get('base', 0.5)),
+            per_keyword=float(confidence.get('per_keyword', 0.3)),
+            mtime=mtime
+        )
+
+
+_default_lexicon: Optional[EmotionLexicon] = None
+_default_lock = threading.Lock()
+
+
+def get_lexicon() -> EmotionLexicon:
+    """Return the process-wide lexicon, loading it on first use"""
+    global _default_lexicon
+    if _default_lexicon is None:
+        with _default_lock:
+            if _default_lexicon is None:
+                _default_lexicon = EmotionLexicon()
+    return _default_lexicon
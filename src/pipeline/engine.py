@@ -0,0 +1,814 @@
+"""
+Voice Pipeline Engine
+Long-lived ASR → Safety → LLM → Post → TTS pipeline shared across sessions
+"""
+import asyncio
+import time
+from typing import AsyncIterable, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+from .asr import ASRProcessor
+from .safety import CRITICAL_THRESHOLD, MONITORING_THRESHOLD, SafetyGuard, Thresholds
+from .llm import LLMProcessor
+from .postprocess import PostProcessor
+from .tts import TTSProcessor
+from .segmenter import SentenceSegmenter
+from .audio_cache import AudioCache
+from .http_pool import ClientPool
+from .metrics import PipelineMetrics, audio_cache_counts, get_metrics
+from .tracing import RISK_ATTRIBUTE, get_tracer, span_context
+from .deadline import Deadline, TurnBudget
+from .hedge import Hedger
+
+# Phrase used to exercise every stage once before the first real turn
+WARMUP_TEXT = "안녕하세요, 요즘 조금 힘들고 불안해요. 연락처는 010-1234-5678이에요."
+
+tracer = get_tracer(__name__)
+
+# Stage durations copied into a turn's timings, in whole milliseconds
+STAGE_TIMINGS = ('asr', 'safety', 'llm', 'postprocess', 'tts', 'total')
+
+# Emotion used to voice the emergency response
+CRISIS_EMOTION = {'primary': 'crisis', 'confidence': 1.0}
+
+# Turn input: text, a recorded utterance, or frames that arrive as they are spoken
+TurnInput = Union[str, bytes, AsyncIterable[Union[bytes, str]]]
+
+
+class TurnStream:
+    """
+    Audio segments of one streamed turn.
+
+    Iterate to receive each segment as soon as it is synthesized. Once
+    iteration has finished, ``result`` holds the same dict as
+    ``VoicePipeline.run_turn`` plus ``audio_segments`` and
+    ``timings['first_audio']`` (time-to-first-audio).
+    """
+
+    def __init__(self):
+        self.result: Optional[Dict] = None
+        self._segments: Optional[AsyncIterator[Dict]] = None
+
+    def __aiter__(self) -> AsyncIterator[Dict]:
+        return self._segments
+
+    async def collect(self) -> Dict:
+        """Consume the whole stream and return the final result"""
+        async for _ in self:
+            pass
+        return self.result
+
+
+class VoicePipeline:
+    """
+    Reusable voice pipeline.
+
+    Settings are read once and every stage is built once per pipeline,
+    so a turn only pays for the work it actually does. Stages keep no
+    per-turn state, which makes ``run_turn`` safe to call concurrently
+    from many sessions on the same event loop.
+
+    In speculative mode the LLM starts as soon as the transcript exists
+    and runs alongside the safety check instead of after it. In streaming
+    mode (``stream_turn``) LLM output is cut into sentences that are
+    post-processed and voiced while later tokens are still generated.
+
+    A turn given an async iterable of frames is transcribed with
+    streaming ASR while it is spoken, and ``asr_stream.enabled`` sends
+    text turns the same way (mock mode replays them word by word). The
+    safety check then runs incrementally on each partial transcript: a
+    crisis phrase ends the turn mid-utterance with the emergency
+    response, and otherwise the LLM starts on the final transcript with
+    no safety stage left to wait for.
+
+    The first turn runs ``warmup`` unless ``auto_warmup`` is false, for
+    one-shot runs where warming up costs more than it saves; a crisis
+    turn then synthesizes the emergency response instead.
+    """
+
+    def __init__(
+        self,
+        settings: Optional[Dict] = None,
+        mode: Optional[str] = None,
+        speculative: Optional[bool] = None,
+        metrics: Optional[PipelineMetrics] = None,
+        auto_warmup: bool = True
+    ):
+        self.settings = settings or {}
+        self.mode = mode or self.settings.get('mode', 'mock')
+
+        # Start the LLM while the safety check is still running
+        if speculative is None:
+            speculative = self.settings.get('optimization', {}).get('speculative_llm', False)
+        self.speculative = speculative
+
+        # Keep-alive provider connections shared by the live stages
+        self.http = ClientPool.from_settings(self.settings.get('http_pool'))
+
+        # Build stages once
+        asr_stream = self.settings.get('asr_stream', {})
+        self.asr = ASRProcessor(
+            mode=self.mode,
+            pool=self.http,
+            words_per_second=asr_stream.get('mock_words_per_second', 3.0)
+        )
+        self.stream_asr = asr_stream.get('enabled', False)
+        safety_settings = self.settings.get('safety', {})
+        self.safety = SafetyGuard(
+            mode=self.mode,
+            cascade=safety_settings.get('cascade', False),
+            layer_order=safety_settings.get('layer_order'),
+            escalation_threshold=safety_settings.get('escalation_threshold', CRITICAL_THRESHOLD),
+            monitoring_threshold=safety_settings.get('monitoring_threshold', MONITORING_THRESHOLD)
+        )
+        hedging = self.settings.get('hedging')
+        self.llm = LLMProcessor(
+            mode=self.mode,
+            pool=self.http,
+            hedger=Hedger.from_settings(hedging, 'llm')
+        )
+        self.post = PostProcessor(mode=self.mode)
+        self.tts = TTSProcessor(
+            mode=self.mode,
+            cache=AudioCache.from_settings(self.settings.get('tts_cache')),
+            pool=self.http,
+            hedger=Hedger.from_settings(hedging, 'tts')
+        )
+
+        # Per-stage latency histograms, exported by whoever serves /metrics
+        if metrics is None:
+            enabled = self.settings.get('metrics', {}).get('enabled', True)
+            metrics = get_metrics() if enabled else PipelineMetrics(enabled=False)
+        self.metrics = metrics
+        self.metrics.track_cache('tts', self.tts.cache, audio_cache_counts)
+
+        # Per-stage latency budget; each turn gets a deadline unless enforce is false
+        self.set_latency_budget(self.settings.get('latency_budget'))
+
+        self.auto_warmup = auto_warmup
+        self._warm = False
+        self._warm_lock: Optional[asyncio.Lock] = None
+        # Curated fallback audio being rendered after a deadline miss
+        self._pinning: Dict[str, asyncio.Task] = {}
+
+    @property
+    def is_warm(self) -> bool:
+        return self._warm
+
+    async def warmup(self):
+        """
+        Exercise the CPU-bound parts of every stage once so the first
+        real turn does not pay for lazy initialisation (regex caches,
+        lookup tables), and pre-render the emergency response audio so
+        a crisis turn never waits for synthesis. Raises RuntimeError if
+        the crisis audio is not available afterwards. Safe to call more
+        than once.
+
+        Curated fallback replies are pre-rendered here only when the TTS
+        cache has a disk tier, where they are synthesized once per
+        deployment; otherwise each is rendered in the background after
+        its first deadline miss.
+        """
+        if self._warm:
+            return
+        if self._warm_lock is None:
+            self._warm_lock = asyncio.Lock()
+
+        async with self._warm_lock:
+            if self._warm:
+                return
+            self.asr.validate_korean(WARMUP_TEXT)
+            with tracer.start_as_current_span('pipeline.warmup'):
+                await self.safety.check(WARMUP_TEXT)
+            await self.llm._analyze_emotion(WARMUP_TEXT)
+            self.post._clean(WARMUP_TEXT)
+            self.tts._adjust_prosody('neutral')
+
+            # Open provider connections before the first live turn
+            if self.mode == "live" and self.settings.get('http_pool', {}).get('prewarm', True):
+                await self.http.prewarm()
+
+            # Crisis audio is held in memory for the pipeline's lifetime, as
+            # are the curated replies voiced when a turn overruns its deadline
+            await self.tts.pin(self.safety.emergency_response, CRISIS_EMOTION)
+            if self.enforce_deadlines and self.tts.cache.disk_dir is not None:
+                pins = [
+                    self.tts.pin(self._fallback_reply(emotion), emotion)
+                    for emotion in self._fallback_emotions()
+                ]
+                if self.mode == "live":
+                    # One at a time over the prewarmed keep-alive connection
+                    for pin in pins:
+                        await pin
+                else:
+                    await asyncio.gather(*pins)
+            if self.tts.prerendered(self.safety.emergency_response, CRISIS_EMOTION) is None:
+                raise RuntimeError("Emergency response audio was not pre-rendered")
+            self._warm = True
+
+    def watch(self, settings) -> Callable[[], None]:
+        """
+        Follow hot reloads of the latency budget and safety thresholds
+        ``settings`` is a config Settings; returns a function that stops following
+        """
+        unsubscribes = [
+            settings.subscribe('latency_budget', self.set_latency_budget),
+            settings.subscribe('safety', self.set_safety_thresholds)
+        ]
+
+        def unwatch():
+            for unsubscribe in unsubscribes:
+                unsubscribe()
+        return unwatch
+
+    def set_latency_budget(self, budget: Optional[Dict]):
+        """
+        Budget for turns that start from now on; turns already running keep
+        their deadline. The budget and its enforce flag change in one
+        assignment, since reloads arrive on the settings watcher thread
+        """
+        self.turn_budget = TurnBudget.from_settings(budget)
+
+    @property
+    def budget(self) -> Dict:
+        return self.turn_budget.stages
+
+    @property
+    def enforce_deadlines(self) -> bool:
+        return self.turn_budget.enforce
+
+    def set_safety_thresholds(self, safety: Optional[Dict]):
+        """
+        Escalation and monitoring thresholds from a ``safety`` settings
+        section; both change in one assignment, since reloads arrive on the
+        settings watcher thread while turns are running
+        """
+        safety = safety or {}
+        self.safety.thresholds = Thresholds(
+            safety.get('escalation_threshold', CRITICAL_THRESHOLD),
+            safety.get('monitoring_threshold', MONITORING_THRESHOLD)
+        )
+
+    async def aclose(self):
+        """Release pooled provider connections"""
+        await self.http.aclose()
+
+    async def prewarm_tts(self) -> Dict:
+        """
+        Render the configured ``tts_cache.prewarm`` phrases into the TTS
+        cache, typically once at deploy time against a shared disk store
+        Returns how many phrases were synthesized and the cache counters
+        """
+        phrases = [
+            (phrase['text'], {'primary': phrase.get('emotion', 'neutral')})
+            for phrase in self.settings.get('tts_cache', {}).get('prewarm', [])
+        ]
+        rendered = await self.tts.prewarm(phrases)
+        return {
+            'phrases': len(phrases),
+            'rendered': rendered,
+            'cache': dict(self.tts.cache.stats)
+        }
+
+    async def run_turn(self, text: TurnInput, speculative: Optional[bool] = None) -> Dict:
+        """
+        Run one conversational turn: ASR → Safety → LLM → Post → TTS
+        Returns timing breakdown and response. With deadlines enforced, a
+        stage that overruns its cutoff falls back and the stage is listed
+        in ``timings['overruns']`` and ``timings['fallbacks']``; when the
+        fallback replaced the generated reply with a curated one,
+        ``fallback_stage`` names the stage that overran.
+        """
+        if self.auto_warmup and not self._warm:
+            await self.warmup()
+        if speculative is None:
+            speculative = self.speculative
+
+        with tracer.start_as_current_span(
+            'voice.turn', attributes={'intune.mode': self.mode, 'intune.speculative': speculative}
+        ) as turn_span:
+            result = await self._run_turn(text, speculative)
+            turn_span.set_attributes({
+                RISK_ATTRIBUTE: result['safety']['risk_level'],
+                'intune.total_ms': result['timings']['total']
+            })
+        return result
+
+    async def _run_turn(self, text: TurnInput, speculative: bool) -> Dict:
+        start_time = time.perf_counter()
+        streamed = self._streams(text)
+        deadline = None if streamed else self._deadline()
+        timings = {}
+        seconds: Dict[str, float] = {}  # unrounded stage durations for metrics
+
+        # 1. ASR (Speech-to-Text)
+        asr_start = time.perf_counter()
+        with tracer.start_as_current_span('asr'):
+            transcript, safety_result = await self._within(
+                'asr', self._transcribe(text, timings, seconds), deadline, timings
+            )
+        seconds['asr'] = time.perf_counter() - asr_start
+        if streamed:
+            deadline = self._deadline()
+
+        if safety_result is not None:
+            # 2. Safety Check, already run on the partial transcripts
+            self._trace_incremental_safety(safety_result)
+            llm_output = None
+        elif speculative:
+            # 2+3. Safety Check overlapped with speculative LLM
+            safety_result, llm_output = await self._check_with_speculative_llm(
+                transcript, seconds, timings, deadline
+            )
+        else:
+            # 2. Safety Check (3 layers)
+            safety_start = time.perf_counter()
+            with tracer.start_as_current_span('safety') as span:
+                safety_result = await self._check_safety(transcript, seconds, timings, deadline)
+                span.set_attribute(RISK_ATTRIBUTE, safety_result['risk_level'])
+            seconds['safety'] = time.perf_counter() - safety_start
+            llm_output = None
+
+        if safety_result['risk_level'] == 'critical':
+            # Emergency response
+            response = safety_result['emergency_response']
+            emotion = dict(CRISIS_EMOTION)
+        else:
+            if llm_output is None:
+                # 3. LLM Processing
+                llm_start = time.perf_counter()
+                with tracer.start_as_current_span('llm'):
+                    llm_output = await self._within(
+                        'llm', self.llm.generate(transcript, safety_result), deadline, timings,
+                        lambda: self.llm.fallback(transcript), 'curated_reply'
+                    )
+                seconds['llm'] = time.perf_counter() - llm_start
+            response, emotion = llm_output
+
+            # 4. Post-processing
+            post_start = time.perf_counter()
+            with tracer.start_as_current_span('postprocess'):
+                response = await self._within(
+                    'postprocess', self.post.process(response), deadline, timings,
+                    lambda: self.post.process_many([response])[0], 'sync_clean'
+                )
+            seconds['postprocess'] = time.perf_counter() - post_start
+
+        # 5. TTS (Text-to-Speech), pre-rendered for the emergency response
+        # and the curated replies
+        audio_url = None
+        if safety_result['risk_level'] == 'critical' or 'llm' in timings.get('fallbacks', {}):
+            audio_url = self.tts.prerendered(response, emotion)
+        if audio_url is not None:
+            seconds['tts'] = 0.0
+            timings['tts_prerendered'] = True
+        else:
+            tts_start = time.perf_counter()
+            generated = response
+            fallback = lambda: self._tts_fallback(generated, emotion, timings)
+            if safety_result['risk_level'] == 'critical':
+                # The emergency response is always voiced, however long it takes
+                synthesis, fallback = self._synthesize(response, emotion), None
+            elif 'llm' in timings.get('fallbacks', {}):
+                # Render the curated reply into the pinned set; the rendering
+                # carries on for later turns if this one gives up on it
+                synthesis = self._voice_curated(response, emotion)
+            else:
+                synthesis = self._synthesize(response, emotion)
+            with tracer.start_as_current_span('tts'):
+                response, audio_url = await self._within(
+                    'tts', synthesis, deadline, timings, fallback, 'cached_audio'
+                )
+            seconds['tts'] = time.perf_counter() - tts_start
+
+        # Total time
+        seconds['total'] = time.perf_counter() - start_time
+        self._finish_timings(timings, seconds, safety_result['risk_level'])
+
+        return {
+            'input': text if isinstance(text, (str, bytes)) else transcript,
+            'transcript': transcript,
+            'response': response,
+            'emotion': emotion,
+            'safety': safety_result,
+            'audio_url': audio_url,
+            'fallback_stage': self._fallback_stage(timings),
+            'timings': timings
+        }
+
+    async def _within(
+        self,
+        stage: str,
+        awaitable: Awaitable,
+        deadline: Optional[Deadline],
+        timings: Dict,
+        fallback: Optional[Callable[[], object]] = None,
+        fallback_name: Optional[str] = None
+    ):
+        """
+        Await a stage, giving up at its cutoff.
+        On overrun the stage is cancelled and ``fallback()`` supplies its
+        result; a stage without a fallback runs to completion and is only
+        recorded as overrun
+        """
+        if deadline is None:
+            return await awaitable
+        if fallback is None:
+            result = await awaitable
+            if not deadline.remaining(stage):
+                timings.setdefault('overruns', []).append(stage)
+            return result
+        try:
+            return await asyncio.wait_for(awaitable, deadline.remaining(stage))
+        except asyncio.TimeoutError:
+            timings.setdefault('overruns', []).append(stage)
+            timings.setdefault('fallbacks', {})[stage] = fallback_name
+            return fallback()
+
+    def _deadline(self) -> Optional[Deadline]:
+        """
+        A turn deadline starting now, or None when deadlines are off.
+        Streamed input starts its deadline at the final transcript: until
+        then the clock is the speaker's, and the budget covers only the
+        wait after they stop talking
+        """
+        budget = self.turn_budget
+        return Deadline(budget.stages) if budget.enforce else None
+
+    def _streams(self, text: TurnInput) -> bool:
+        """Whether a turn's input goes through streaming ASR"""
+        return not isinstance(text, (str, bytes)) or (self.stream_asr and isinstance(text, str))
+
+    async def _transcribe(
+        self,
+        text: TurnInput,
+        timings: Dict,
+        seconds: Dict[str, float]
+    ) -> Tuple[str, Optional[Dict]]:
+        """
+        Transcript of a turn's input, and its safety assessment when the
+        input was streamed. Streamed input is transcribed as it arrives and
+        every partial is fed to a safety session, so the check is finished
+        when the speaker is. A partial that turns critical ends the turn's
+        listening there, without waiting for the rest of the utterance.
+        """
+        if not self._streams(text):
+            return await self.asr.process(text), None
+        session = self.safety.session()
+        safety_s = 0.0
+        partials = 0
+        events = self.asr.process_stream(text)
+        try:
+            async for event in events:
+                partials += not event.is_final
+                scan_start = time.perf_counter()
+                critical = session.update(event.text)
+                safety_s += time.perf_counter() - scan_start
+                if critical is not None:
+                    if not event.is_final:
+                        timings['partial_crisis'] = True
+                    break
+        finally:
+            await events.aclose()
+        timings['asr_partials'] = partials
+        seconds['safety'] = safety_s
+        return event.text, session.critical or session.assessment()
+
+    @staticmethod
+    def _trace_incremental_safety(safety_result: Dict, context=None):
+        with tracer.start_as_current_span(
+            'safety', context=context, attributes={'intune.incremental': True}
+        ) as span:
+            span.set_attribute(RISK_ATTRIBUTE, safety_result['risk_level'])
+
+    async def _check_safety(
+        self,
+        transcript: str,
+        seconds: Dict[str, float],
+        timings: Dict,
+        deadline: Optional[Deadline]
+    ) -> Dict:
+        """Safety check that falls back to a synchronous full scan, never to skipping it"""
+        return await self._within(
+            'safety', self.safety.check(transcript, seconds), deadline, timings,
+            lambda: self.safety.check_many([transcript])[0], 'sync_scan'
+        )
+
+    async def _synthesize(self, response: str, emotion: Dict) -> Tuple[str, str]:
+        return response, await self.tts.synthesize(response, emotion)
+
+    def _fallback_emotions(self) -> List[Dict]:
+        return [{'primary': primary} for primary in self.tts.emotion_voices if primary != 'crisis']
+
+    def _fallback_reply(self, emotion: Dict) -> str:
+        """Curated reply for an emotion, as post-processing leaves it"""
+        return self.post.process_many([self.llm.fallback_reply(emotion)])[0]
+
+    def _fallback_audio(self, emotion: Dict) -> Tuple[str, Optional[str]]:
+        """
+        Curated reply for an emotion and its pinned audio; without pinned
+        audio yet, it is rendered in the background for later turns
+        """
+        reply = self._fallback_reply(emotion)
+        audio_url = self.tts.prerendered(reply, emotion)
+        if audio_url is None:
+            self._pin_later(reply, emotion)
+        return reply, audio_url
+
+    def _tts_fallback(self, response: str, emotion: Dict, timings: Dict) -> Tuple[str, Optional[str]]:
+        """
+        What a turn says when TTS overruns: the curated reply if its audio
+        is pinned, else the generated reply as text only
+        """
+        reply, audio_url = self._fallback_audio(emotion)
+        if audio_url is None:
+            timings['fallbacks']['tts'] = 'text_only'
+            return response, None
+        return reply, audio_url
+
+    def _pin_later(self, reply: str, emotion: Dict) -> asyncio.Task:
+        """Pin a curated reply's audio in the background, once per emotion"""
+        primary = emotion.get('primary', 'neutral')
+        task = self._pinning.get(primary)
+        if task is not None:
+            return task
+        task = asyncio.create_task(self.tts.pin(reply, emotion))
+        self._pinning[primary] = task
+
+        def done(task: asyncio.Task):
+            # A failed rendering is retried on the next miss
+            if task.cancelled() or task.exception() is not None:
+                self._pinning.pop(primary, None)
+        task.add_done_callback(done)
+        return task
+
+    async def _voice_curated(self, reply: str, emotion: Dict) -> Tuple[str, str]:
+        return reply, await asyncio.shield(self._pin_later(reply, emotion))
+
+    @staticmethod
+    def _fallback_stage(timings: Dict) -> Optional[str]:
+        """Stage whose overrun replaced the generated reply with a curated one"""
+        fallbacks = timings.get('fallbacks', {})
+        for stage, name in (('llm', 'curated_reply'), ('tts', 'cached_audio')):
+            if fallbacks.get(stage) == name:
+                return stage
+        return None
+
+    def _finish_timings(self, timings: Dict, seconds: Dict[str, float], risk_level: str):
+        """Record a turn's stage durations and add them to timings in whole ms"""
+        self.metrics.record_turn(self.mode, risk_level, seconds)
+        for stage in STAGE_TIMINGS:
+            if stage in seconds:
+                timings[stage] = int(seconds[stage] * 1000)
+
+    async def _check_with_speculative_llm(
+        self,
+        transcript: str,
+        seconds: Dict[str, float],
+        timings: Dict,
+        deadline: Optional[Deadline] = None
+    ) -> Tuple[Dict, Optional[Tuple[str, Dict]]]:
+        """
+        Run the safety check while the LLM generates speculatively.
+        A critical result cancels the LLM and discards anything it
+        produced, so the caller only ever sees LLM output for turns
+        that passed the safety check.
+        """
+        overlap_start = time.perf_counter()
+        llm_done: Dict[str, float] = {}
+
+        async def speculative_llm():
+            with tracer.start_as_current_span('llm', attributes={'intune.speculative': True}):
+                output = await self.llm.generate(transcript, None)
+            llm_done['at'] = time.perf_counter()
+            return output
+
+        llm_task = asyncio.create_task(speculative_llm())
+        try:
+            with tracer.start_as_current_span('safety') as span:
+                safety_result = await self._check_safety(transcript, seconds, timings, deadline)
+                span.set_attribute(RISK_ATTRIBUTE, safety_result['risk_level'])
+        except BaseException:
+            llm_task.cancel()
+            raise
+        safety_done = time.perf_counter()
+        seconds['safety'] = safety_done - overlap_start
+
+        if safety_result['risk_level'] == 'critical':
+            llm_task.cancel()
+            await asyncio.gather(llm_task, return_exceptions=True)
+            timings['overlap_saved'] = 0
+            return safety_result, None
+
+        llm_output = await self._within(
+            'llm', llm_task, deadline, timings,
+            lambda: self.llm.fallback(transcript), 'curated_reply'
+        )
+        llm_end = llm_done.get('at', time.perf_counter())
+        seconds['llm'] = llm_end - overlap_start
+
+        # Sequential cost minus what the overlapped section actually took
+        sequential = (safety_done - overlap_start) + (llm_end - overlap_start)
+        overlapped = max(safety_done, llm_end) - overlap_start
+        timings['overlap_saved'] = int((sequential - overlapped) * 1000)
+        return safety_result, llm_output
+
+    def stream_turn(self, text: TurnInput) -> TurnStream:
+        """
+        Run one turn in streaming mode: ASR → Safety → (LLM ⇢ Post ⇢ TTS)
+        Returns a TurnStream of audio segments
+        """
+        stream = TurnStream()
+        stream._segments = self._stream_segments(text, stream)
+        return stream
+
+    async def _stream_segments(self, text: TurnInput, stream: TurnStream) -> AsyncIterator[Dict]:
+        if self.auto_warmup and not self._warm:
+            await self.warmup()
+
+        # The root span is never made current: this generator suspends at
+        # each yield, so children are parented through turn_ctx explicitly
+        turn_span = tracer.start_span('voice.turn', attributes={
+            'intune.mode': self.mode, 'intune.streaming': True
+        })
+        turn_ctx = span_context(turn_span)
+        segments = self._stream_turn(text, stream, turn_ctx)
+        try:
+            async for segment in segments:
+                yield segment
+            turn_span.set_attributes({
+                RISK_ATTRIBUTE: stream.result['safety']['risk_level'],
+                'intune.total_ms': stream.result['timings']['total']
+            })
+        finally:
+            await segments.aclose()
+            turn_span.end()
+
+    async def _stream_turn(self, text: TurnInput, stream: TurnStream, turn_ctx) -> AsyncIterator[Dict]:
+        start_time = time.perf_counter()
+        streamed = self._streams(text)
+        deadline = None if streamed else self._deadline()
+        timings = {}
+        seconds: Dict[str, float] = {}
+        segments: List[Dict] = []
+
+        def emit(segment_text: str, audio_url: str) -> Dict:
+            at_ms = int((time.perf_counter() - start_time) * 1000)
+            timings.setdefault('first_audio', at_ms)
+            segment = {
+                'index': len(segments),
+                'text': segment_text,
+                'audio_url': audio_url,
+                'at_ms': at_ms
+            }
+            segments.append(segment)
+            return segment
+
+        # 1. ASR (Speech-to-Text)
+        asr_start = time.perf_counter()
+        with tracer.start_as_current_span('asr', context=turn_ctx):
+            transcript, safety_result = await self._within(
+                'asr', self._transcribe(text, timings, seconds), deadline, timings
+            )
+        seconds['asr'] = time.perf_counter() - asr_start
+        if streamed:
+            deadline = self._deadline()
+
+        # 2. Safety Check (3 layers), unless it already ran on the partials
+        if safety_result is not None:
+            self._trace_incremental_safety(safety_result, turn_ctx)
+        else:
+            safety_start = time.perf_counter()
+            with tracer.start_as_current_span('safety', context=turn_ctx) as span:
+                safety_result = await self._check_safety(transcript, seconds, timings, deadline)
+                span.set_attribute(RISK_ATTRIBUTE, safety_result['risk_level'])
+            seconds['safety'] = time.perf_counter() - safety_start
+
+        if safety_result['risk_level'] == 'critical':
+            # Emergency response, voiced as a single pre-rendered segment
+            emotion = dict(CRISIS_EMOTION)
+            response = safety_result['emergency_response']
+            audio_url = self.tts.prerendered(response, emotion)
+            if audio_url is not None:
+                seconds['tts'] = 0.0
+                timings['tts_prerendered'] = True
+            else:
+                tts_start = time.perf_counter()
+                with tracer.start_as_current_span('tts', context=turn_ctx):
+                    audio_url = await self.tts.synthesize_segment(response, emotion, 0)
+                seconds['tts'] = time.perf_counter() - tts_start
+            yield emit(response, audio_url)
+        else:
+            # 3. LLM streams sentences into a queue in the background
+            llm_start = time.perf_counter()
+            llm_span = tracer.start_span('llm', context=turn_ctx)
+            try:
+                tokens, emotion = await self.llm.generate_stream(transcript, safety_result)
+            except BaseException:
+                llm_span.end()
+                raise
+            sentences: asyncio.Queue = asyncio.Queue()
+            producer = asyncio.create_task(
+                self._produce_sentences(tokens, sentences, timings, seconds, llm_start)
+            )
+            producer.add_done_callback(lambda _: llm_span.end())
+
+            post_s = 0.0
+            tts_s = 0.0
+            overran = False
+            try:
+                while True:
+                    # The deadline bounds time to first audio; an overrun
+                    # before then ends the stream (fallback returns None)
+                    first = deadline if not segments else None
+                    sentence = await self._within(
+                        'llm', sentences.get(), first, timings, lambda: None, 'curated_reply'
+                    )
+                    if sentence is None:
+                        break
+
+                    # 4. Post-processing per sentence
+                    post_start = time.perf_counter()
+                    with tracer.start_as_current_span('postprocess', context=turn_ctx):
+                        sentence = await self._within(
+                            'postprocess', self.post.process(sentence), first, timings,
+                            lambda: self.post.process_many([sentence])[0], 'sync_clean'
+                        )
+                    post_s += time.perf_counter() - post_start
+
+                    # 5. TTS per sentence
+                    tts_start = time.perf_counter()
+                    with tracer.start_as_current_span(
+                        'tts', context=turn_ctx, attributes={'intune.segment': len(segments)}
+                    ):
+                        audio_url = await self._within(
+                            'tts', self.tts.synthesize_segment(sentence, emotion, len(segments)),
+                            first, timings, lambda: None, 'cached_audio'
+                        )
+                    tts_s += time.perf_counter() - tts_start
+                    if audio_url is None:
+                        break
+
+                    yield emit(sentence, audio_url)
+
+                fallbacks = timings.get('fallbacks', {})
+                overran = 'llm' in fallbacks or 'tts' in fallbacks
+                if not overran:
+                    # Surface LLM errors
+                    await producer
+            finally:
+                if not producer.done():
+                    producer.cancel()
+                    await asyncio.gather(producer, return_exceptions=True)
+
+            seconds['postprocess'] = post_s
+            seconds['tts'] = tts_s
+
+            if overran:
+                # Nothing could be voiced in time: say the curated reply instead,
+                # or show the sentence the TTS could not voice
+                if 'tts' in fallbacks:
+                    response, audio_url = self._tts_fallback(sentence, emotion, timings)
+                else:
+                    response, audio_url = self._fallback_audio(emotion)
+                yield emit(response, audio_url)
+
+        # Total time
+        seconds['total'] = time.perf_counter() - start_time
+        self._finish_timings(timings, seconds, safety_result['risk_level'])
+
+        stream.result = {
+            'input': text if isinstance(text, (str, bytes)) else transcript,
+            'transcript': transcript,
+            'response': ' '.join(segment['text'] for segment in segments),
+            'emotion': emotion,
+            'safety': safety_result,
+            'audio_url': segments[0]['audio_url'] if segments else None,
+            'audio_segments': segments,
+            'fallback_stage': self._fallback_stage(timings),
+            'timings': timings
+        }
+
+    async def _produce_sentences(
+        self,
+        tokens: AsyncIterator[str],
+        sentences: asyncio.Queue,
+        timings: Dict,
+        seconds: Dict[str, float],
+        llm_start: float
+    ):
+        """Cut streamed LLM tokens into sentences; None marks the end"""
+        segmenter = SentenceSegmenter()
+        try:
+            async for token in tokens:
+                timings.setdefault(
+                    'llm_first_token', int((time.perf_counter() - llm_start) * 1000)
+                )
+                for sentence in segmenter.feed(token):
+                    sentences.put_nowait(sentence)
+
+            tail = segmenter.flush()
+            if tail:
+                sentences.put_nowait(tail)
+            seconds['llm'] = time.perf_counter() - llm_start
+        finally:
+            sentences.put_nowait(None)
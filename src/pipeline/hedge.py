@@ -0,0 +1,141 @@
+"""
+Hedged Requests
+Tail-latency control for the upstream LLM and TTS calls
+"""
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict, List, Optional, TypeVar
+
+T = TypeVar('T')
+
+
+class Hedger:
+    """
+    Send a second attempt when the first is slower than usual.
+
+    The hedge delay is the running ``percentile`` of recent first-attempt
+    latencies, so only the slowest (100 - percentile)% of calls are
+    candidates. The first attempt to succeed wins and the other is
+    cancelled. Each hedge spends a token from a budget that earns
+    ``max_rate`` per call, up to ``burst``, so hedging adds at most about
+    ``max_rate`` extra upstream requests even when the upstream is slow
+    across the board. Calls are not hedged until ``min_samples``
+    latencies are known.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 90.0,
+        max_rate: float = 0.1,
+        burst: float = 5.0,
+        window: int = 200,
+        min_samples: int = 20,
+        clock: Callable[[], float] = time.perf_counter
+    ):
+        self.percentile = percentile
+        self.max_rate = max_rate
+        self.burst = burst
+        self.min_samples = min_samples
+        self.clock = clock
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self._latencies: deque = deque(maxlen=window)
+        self._tokens = 0.0
+
+    @classmethod
+    def from_settings(cls, settings: Optional[Dict], stage: str) -> Optional['Hedger']:
+        """
+        Build a stage's hedger from the ``hedging`` settings section
+        None when hedging is disabled or the stage is not listed
+        """
+        settings = settings or {}
+        if not settings.get('enabled', False) or stage not in settings.get('stages', []):
+            return None
+        return cls(
+            percentile=settings.get('percentile', 90.0),
+            max_rate=settings.get('max_rate', 0.1),
+            burst=settings.get('burst', 5.0),
+            window=settings.get('window', 200),
+            min_samples=settings.get('min_samples', 20)
+        )
+
+    def delay(self) -> Optional[float]:
+        """Seconds to wait before hedging, or None while still learning"""
+        if len(self._latencies) < self.min_samples:
+            return None
+        ordered = sorted(self._latencies)
+        rank = max(math.ceil(self.percentile / 100 * len(ordered)), 1)
+        return ordered[rank - 1]
+
+    async def run(self, attempt: Callable[[], Awaitable[T]]) -> T:
+        """Await ``attempt()``, hedging it once if it overruns the delay"""
+        self.calls += 1
+        self._tokens = min(self._tokens + self.max_rate, self.burst)
+        delay = self.delay()
+        started: Dict[asyncio.Future, float] = {}
+        attempts: List[asyncio.Future] = []
+
+        def send():
+            task = asyncio.ensure_future(attempt())
+            started[task] = self.clock()
+            attempts.append(task)
+
+        send()
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait(attempts, timeout=delay)
+                if not done and self._tokens >= 1:
+                    self._tokens -= 1
+                    self.hedged += 1
+                    send()
+            return await self._first_success(attempts, started)
+        finally:
+            losers = [task for task in attempts if not task.done()]
+            for task in losers:
+                task.cancel()
+            if losers:
+                await asyncio.gather(*losers, return_exceptions=True)
+
+    async def _first_success(
+        self,
+        attempts: List[asyncio.Future],
+        started: Dict[asyncio.Future, float]
+    ):
+        primary = attempts[0]
+        pending = set(attempts)
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    self._record(primary, started[primary])
+                    if task is not primary:
+                        self.hedge_wins += 1
+                    return task.result()
+                error = error or task.exception()
+        raise error
+
+    def _record(self, primary: asyncio.Future, started: float):
+        """
+        Record the primary attempt's latency. When a hedge won, the primary
+        has taken at least as long as it has run so far, and that lower
+        bound is recorded: taking the winner's shorter time instead would
+        drag the delay down and hedge more and more calls
+        """
+        if primary.done() and primary.exception() is not None:
+            return  # a failure's timing says nothing about a success's
+        self._latencies.append(self.clock() - started)
+
+    @property
+    def stats(self) -> Dict:
+        delay = self.delay()
+        return {
+            'calls': self.calls,
+            'hedged': self.hedged,
+            'hedge_wins': self.hedge_wins,
+            'hedge_rate': self.hedged / self.calls if self.calls else 0.0,
+            'delay_ms': round(delay * 1000, 1) if delay is not None else None
+        }
@@ -0,0 +1,120 @@
+"""
+HTTP Client Pool
+Long-lived keep-alive clients for the live ASR, LLM and TTS providers
+"""
+import asyncio
+import importlib.util
+import logging
+import os
+from typing import TYPE_CHECKING, Dict, Optional
+
+if TYPE_CHECKING:
+    import httpx
+
+logger = logging.getLogger(__name__)
+
+# Provider endpoints and how each one authenticates
+PROVIDERS = {
+    'deepgram': {
+        'base_url': 'https://api.deepgram.com/v1',
+        'auth_header': 'Authorization',
+        'auth_format': 'Token {key}',
+        'key_env': 'DEEPGRAM_API_KEY'
+    },
+    'openai': {
+        'base_url': 'https://api.openai.com/v1',
+        'auth_header': 'Authorization',
+        'auth_format': 'Bearer {key}',
+        'key_env': 'OPENAI_API_KEY'
+    },
+    'elevenlabs': {
+        'base_url': 'https://api.elevenlabs.io/v1',
+        'auth_header': 'xi-api-key',
+        'auth_format': '{key}',
+        'key_env': 'ELEVENLABS_API_KEY'
+    }
+}
+
+# HTTP/2 needs the optional h2 package
+HTTP2_AVAILABLE = importlib.util.find_spec('h2') is not None
+
+
+class ClientPool:
+    """
+    One pooled ``httpx.AsyncClient`` per provider.
+
+    Clients are created on first use and reused for every turn, so TCP
+    and TLS handshakes are paid once per connection instead of once per
+    request. Each provider gets its own connection limits; HTTP/2 is
+    negotiated when enabled and h2 is installed. ``prewarm`` opens the
+    connections before the first turn.
+    """
+
+    def __init__(self, settings: Optional[Dict] = None):
+        settings = settings or {}
+        self.http2 = settings.get('http2', True) and HTTP2_AVAILABLE
+        self.timeout = settings.get('timeout_s', 10.0)
+        self.keepalive_expiry = settings.get('keepalive_expiry_s', 60.0)
+        self.providers: Dict[str, Dict] = {}
+        for name, defaults in PROVIDERS.items():
+            self.providers[name] = dict(defaults, **settings.get('providers', {}).get(name, {}))
+        for name, overrides in settings.get('providers', {}).items():
+            self.providers.setdefault(name, dict(overrides))
+        self._clients: Dict[str, 'httpx.AsyncClient'] = {}
+
+    @classmethod
+    def from_settings(cls, settings: Optional[Dict]) -> 'ClientPool':
+        """Build from the ``http_pool`` settings section"""
+        return cls(settings)
+
+    def client(self, provider: str) -> 'httpx.AsyncClient':
+        """Return the shared client for a provider, creating it once"""
+        client = self._clients.get(provider)
+        if client is None or client.is_closed:
+            client = self._build(provider)
+            self._clients[provider] = client
+        return client
+
+    async def prewarm(self, providers: Optional[list] = None):
+        """
+        Open a connection to each provider ahead of the first turn
+        Failures are logged, not raised; the turn will connect on demand
+        """
+        import httpx
+        names = providers or list(self.providers)
+
+        async def warm(name: str):
+            config = self.providers[name]
+            try:
+                await self.client(name).head(config.get('warm_path', '/'))
+            except httpx.HTTPError as e:
+                logger.warning(f"Connection pre-warm for {name} failed: {e}")
+
+        await asyncio.gather(*(warm(name) for name in names))
+
+    async def aclose(self):
+        """Close every client and its pooled connections"""
+        clients, self._clients = self._clients, {}
+        await asyncio.gather(*(client.aclose() for client in clients.values()))
+
+    def _build(self, provider: str) -> 'httpx.AsyncClient':
+        # Imported on first live use; mock runs never load httpx
+        import httpx
+
+        config = self.providers[provider]
+        headers = {}
+        key = os.getenv(config.get('key_env', ''), '')
+        if key and config.get('auth_header'):
+            headers[config['auth_header']] = config['auth_format'].format(key=key)
+
+        return httpx.AsyncClient(
+            base_url=config['base_url'],
+            headers=headers,
+            http2=self.http2 and config.get('http2', True),
+            timeout=config.get('timeout_s', self.timeout),
+            limits=httpx.Limits(
+                max_connections=config.get('max_connections', 20),
+                max_keepalive_connections=config.get('max_keepalive', 10),
+                keepalive_expiry=config.get('keepalive_expiry_s', self.keepalive_expiry)
+            )
+        )
@@ -0,0 +1,120 @@
+"""
+Latency Histogram
+Constant-memory latency percentiles for long runs over large corpora
+"""
+import math
+from typing import Dict, Iterable, Optional
+
+# Values below 2**SUB_BITS µs get exact buckets; above that each power of
+# two is split into 2**(SUB_BITS - 1) buckets, so any recorded value is
+# reported within 1/64 (about 1.6%) of itself
+SUB_BITS = 7
+_SUB = 1 << SUB_BITS
+_HALF = _SUB >> 1
+
+
+def _index(micros: int) -> int:
+    if micros < _SUB:
+        return micros
+    shift = micros.bit_length() - SUB_BITS
+    return _SUB + (shift - 1) * _HALF + (micros >> shift) - _HALF
+
+
+def _highest(index: int) -> int:
+    """Largest µs value that falls into a bucket"""
+    if index < _SUB:
+        return index
+    shift, offset = divmod(index - _SUB, _HALF)
+    shift += 1
+    return ((offset + _HALF + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    """
+    Log-linear histogram of latencies in milliseconds.
+
+    Memory is bounded by the number of distinct buckets (a few thousand
+    at most), not by the number of samples, so a 44k-line corpus and a
+    million-request load test cost the same. Histograms from concurrent
+    workers can be combined with ``merge``. ``record_corrected`` fills in
+    the samples a stalled closed-loop client never sent (coordinated
+    omission), as HdrHistogram's expected-interval recording does.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self._buckets: Dict[int, int] = {}
+
+    def record(self, ms: float, count: int = 1):
+        """Add ``count`` samples of ``ms`` milliseconds"""
+        index = _index(max(int(ms * 1000), 0))
+        self._buckets[index] = self._buckets.get(index, 0) + count
+        self.count += count
+        self.total += ms * count
+        self.total_sq += ms * ms * count
+        self.min = ms if self.min is None else min(self.min, ms)
+        self.max = ms if self.max is None else max(self.max, ms)
+
+    def record_corrected(self, ms: float, expected_interval_ms: float):
+        """
+        Add a sample from a client meant to send every ``expected_interval_ms``
+        A response slower than the interval also records the requests that
+        would have been waiting behind it: ms - interval, ms - 2 * interval, ...
+        """
+        self.record(ms)
+        if expected_interval_ms <= 0:
+            return
+        missed = ms - expected_interval_ms
+        while missed >= expected_interval_ms:
+            self.record(missed)
+            missed -= expected_interval_ms
+
+    def merge(self, other: 'LatencyHistogram'):
+        """Fold another histogram's samples into this one"""
+        for index, count in other._buckets.items():
+            self._buckets[index] = self._buckets.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        self.total_sq += other.total_sq
+        for bound in (other.min, other.max):
+            if bound is not None:
+                self.min = bound if self.min is None else min(self.min, bound)
+                self.max = bound if self.max is None else max(self.max, bound)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def stdev(self) -> float:
+        if self.count < 2:
+            return 0.0
+        variance = (self.total_sq - self.total * self.total / self.count) / (self.count - 1)
+        return math.sqrt(max(variance, 0.0))
+
+    def percentile(self, p: float) -> float:
+        """Smallest latency at or above ``p`` percent of samples, in ms"""
+        if not self.count:
+            return 0.0
+        rank = max(math.ceil(p / 100 * self.count), 1)
+        seen = 0
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            if seen >= rank:
+                return min(_highest(index) / 1000, self.max)
+        return self.max
+
+    def summary(self, percentiles: Iterable[float] = (50, 90, 95, 99)) -> Dict:
+        """Count, mean, max and the requested percentiles in ms"""
+        result = {
+            'count': self.count,
+            'mean': round(self.mean, 2),
+            'max': round(self.max or 0.0, 2)
+        }
+        for p in percentiles:
+            result[f"p{p:g}"] = round(self.percentile(p), 2)
+        return result
@@ -3,18 +3,45 @@ LLM (Large Language Model) Processing
 GPT-4o integration for therapeutic responses
 """
 import asyncio
+import json
 import os
 import random
-from typing import Dict, Tuple
+import re
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from .emotion import EmotionLexicon, get_lexicon
+from .hedge import Hedger
+from .http_pool import ClientPool
+
+SYSTEM_PROMPT = """You are a compassionate AI therapist specializing in CBT.
+You understand Korean culture deeply, including concepts like 한(han), 정(jeong), and 눈치(nunchi).
+Respond with empathy, validation, and gentle guidance.
+Keep responses concise (2-3 sentences) for natural conversation flow."""
 
 class LLMProcessor:
-    def __init__(self, mode: str = "mock"):
+    def __init__(
+        self,
+        mode: str = "mock",
+        lexicon: Optional[EmotionLexicon] = None,
+        pool: Optional[ClientPool] = None,
+        hedger: Optional[Hedger] = None
+    ):
         self.mode = mode
         self.target_latency = 280  # ms
+        self.first_token_latency = 80  # ms, streaming mode
+        
+        # Emotion lexicon shared with the inference service
+        self.lexicon = lexicon or get_lexicon()
         
         if mode == "live":
             self.api_key = os.getenv("OPENAI_API_KEY")
-            # Would initialize OpenAI client here
+            # Keep-alive OpenAI client shared with the other stages
+            self.pool = pool or ClientPool()
+            self.model = os.getenv("MODEL_NAME", "gpt-4o")
+            self.max_tokens = int(os.getenv("MAX_TOKENS", "500"))
+            self.temperature = float(os.getenv("TEMPERATURE", "0.7"))
+            # Second request when a completion is slower than usual
+            self.hedger = hedger
         
         # Mock responses for different emotional states
         self.mock_responses = {
@@ -36,9 +63,11 @@ class LLMProcessor:
             ]
         }
     
-    async def generate(self, text: str, safety_result: Dict) -> Tuple[str, Dict]:
+    async def generate(self, text: str, safety_result: Optional[Dict]) -> Tuple[str, Dict]:
         """
         Generate therapeutic response and emotion analysis
+        safety_result is None when generation starts speculatively,
+        before the safety check has finished
         """
         # Detect emotion
         emotion = await self._analyze_emotion(text)
@@ -53,54 +82,96 @@ class LLMProcessor:
             response = random.choice(responses)
             
         else:  # live mode
-            # Real OpenAI API call would go here
-            await asyncio.sleep(self.target_latency / 1000)
-            response = "Live mode response would come from GPT-4o"
+            if self.hedger is not None:
+                response = await self.hedger.run(lambda: self._complete(text))
+            else:
+                response = await self._complete(text)
         
         return response, emotion
     
-    async def _analyze_emotion(self, text: str) -> Dict:
-        """Analyze emotional content"""
-        # Korean emotion keywords
-        emotion_keywords = {
-            'sadness': ['우울', '슬프', '힘들', '외로', '눈물'],
-            'anxiety': ['불안', '걱정', '두렵', '무서', '긴장'],
-            'stress': ['스트레스', '압박', '부담', '지치', '피곤'],
-            'anger': ['화나', '짜증', '분노', '억울', '미워'],
-            'joy': ['기쁘', '행복', '좋', '즐거', '신나']
-        }
-        
-        # Detect primary emotion
-        detected_emotion = 'neutral'
-        max_score = 0
+    async def generate_stream(
+        self,
+        text: str,
+        safety_result: Optional[Dict]
+    ) -> Tuple[AsyncIterator[str], Dict]:
+        """
+        Streaming variant of generate
+        Returns an async iterator of token chunks and the emotion analysis,
+        which is known before the first token so TTS can pick a voice
+        """
+        emotion = await self._analyze_emotion(text)
         
-        for emotion, keywords in emotion_keywords.items():
-            score = sum(1 for keyword in keywords if keyword in text)
-            if score > max_score:
-                max_score = score
-                detected_emotion = emotion
+        if self.mode == "mock":
+            emotion_type = emotion['primary']
+            responses = self.mock_responses.get(emotion_type, self.mock_responses['neutral'])
+            response = random.choice(responses)
+            return self._replay_tokens(response), emotion
         
-        # Korean cultural emotions
-        cultural_emotions = {
-            '한': 0.0,
-            '정': 0.0, 
-            '눈치': 0.0
+        else:  # live mode
+            return self._stream_tokens(text), emotion
+    
+    def fallback(self, text: str) -> Tuple[str, Dict]:
+        """
+        Curated reply for the detected emotion, without generation
+        Used when the LLM overruns its slice of the turn deadline
+        """
+        emotion = self.lexicon.analyze(text)
+        return self.fallback_reply(emotion), emotion
+    
+    def fallback_reply(self, emotion: Dict) -> str:
+        """The fixed curated reply for an emotion, so its audio can be pre-rendered"""
+        responses = self.mock_responses.get(emotion.get('primary'), self.mock_responses['neutral'])
+        return responses[0]
+    
+    async def _complete(self, text: str) -> str:
+        """One chat completion request"""
+        result = await self.pool.client('openai').post(
+            '/chat/completions', json=self._request(text)
+        )
+        result.raise_for_status()
+        return result.json()['choices'][0]['message']['content']
+    
+    def _request(self, text: str, stream: bool = False) -> Dict:
+        """Chat completion request body"""
+        messages: List[Dict] = [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": text}
+        ]
+        return {
+            "model": self.model,
+            "messages": messages,
+            "max_tokens": self.max_tokens,
+            "temperature": self.temperature,
+            "stream": stream
         }
+    
+    async def _stream_tokens(self, text: str) -> AsyncIterator[str]:
+        """Yield content deltas from a streamed chat completion (SSE)"""
+        async with self.pool.client('openai').stream(
+            'POST', '/chat/completions', json=self._request(text, stream=True)
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith('data: '):
+                    continue
+                data = line[len('data: '):]
+                if data == '[DONE]':
+                    break
+                delta = json.loads(data)['choices'][0].get('delta', {})
+                if delta.get('content'):
+                    yield delta['content']
+    
+    async def _replay_tokens(self, response: str) -> AsyncIterator[str]:
+        """Yield a response word by word, spreading the latency budget"""
+        tokens = re.findall(r'\S+\s*', response)
+        await asyncio.sleep(self.first_token_latency / 1000)
+        per_token = max(0, self.target_latency - self.first_token_latency) / 1000 / max(len(tokens), 1)
         
-        # Check for 한 (han)
-        if any(word in text for word in ['그리움', '서러움', '아쉬움', '후회']):
-            cultural_emotions['한'] = 0.7
-        
-        # Check for 정 (jeong)
-        if any(word in text for word in ['고마워', '보고싶', '사랑', '우리']):
-            cultural_emotions['정'] = 0.7
-            
-        # Check for 눈치 (nunchi)
-        if any(word in text for word in ['미안', '부담', '실례', '죄송']):
-            cultural_emotions['눈치'] = 0.6
-        
-        return {
-            'primary': detected_emotion,
-            'confidence': min(max_score * 0.3 + 0.5, 1.0),
-            'cultural': cultural_emotions
-        }
\ No newline at end of file
+        for i, token in enumerate(tokens):
+            if i:
+                await asyncio.sleep(per_token)
+            yield token
+    
+    async def _analyze_emotion(self, text: str) -> Dict:
+        """Analyze emotional content"""
+        return self.lexicon.analyze(text)
@@ -0,0 +1,214 @@
+"""
+Multi-pattern Keyword Matcher
+Finds every keyword in a text: per-keyword substring search for small
+keyword sets, an Aho-Corasick automaton in one pass for large ones
+"""
+from collections import deque
+from typing import Any, Dict, Iterable, List, NamedTuple, Tuple
+
+# Keyword count up to which scan() searches keyword by keyword. C-level
+# substring search beats the per-character automaton until roughly this
+# many keywords (see tests/benchmarks/bench_safety_matcher.py)
+SUBSTRING_SCAN_LIMIT = 200
+
+
+class Hit(NamedTuple):
+    """One keyword occurrence; offsets refer to the original text"""
+    start: int
+    end: int
+    keyword: str
+    payload: Any
+    start_line: int
+    end_line: int
+
+
+class _Automaton:
+    """Goto/failure/output tables for a set of keywords"""
+
+    def __init__(self, keywords: Dict[str, List[Any]]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.out: List[List[Tuple[str, Any]]] = [[]]
+        self.max_len = 0
+
+        for keyword, payloads in keywords.items():
+            state = 0
+            for char in keyword:
+                next_state = self.goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][char] = next_state
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                state = next_state
+            self.out[state].extend((keyword, payload) for payload in payloads)
+            self.max_len = max(self.max_len, len(keyword))
+
+        # Breadth-first failure links; outputs of the fallback state are
+        # merged in so a match never has to walk the failure chain
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(char, 0)
+                self.fail[next_state] = target if target != next_state else 0
+                self.out[next_state] = self.out[next_state] + self.out[self.fail[next_state]]
+
+    def step(self, state: int, char: str) -> int:
+        goto = self.goto
+        while state and char not in goto[state]:
+            state = self.fail[state]
+        return goto[state].get(char, 0)
+
+
+class KeywordMatcher:
+    """
+    Compiled matcher over two keyword sets.
+
+    ``keywords`` match as literal substrings. ``flexible`` keywords match
+    with any whitespace between their characters, so "죽고싶" also finds
+    "죽고 싶" and "죽 고 싶". Each keyword carries payloads that are
+    returned with its hits. Up to ``substring_limit`` keywords, ``scan``
+    runs one substring search per keyword; past it, a single automaton
+    pass whose cost does not depend on the number of keywords. Both
+    return the same hits in the same order.
+    """
+
+    def __init__(
+        self,
+        keywords: Iterable[Tuple[str, Any]] = (),
+        flexible: Iterable[Tuple[str, Any]] = (),
+        substring_limit: int = SUBSTRING_SCAN_LIMIT
+    ):
+        literal: Dict[str, List[Any]] = {}
+        for keyword, payload in keywords:
+            if keyword:
+                literal.setdefault(keyword, []).append(payload)
+
+        compact: Dict[str, List[Any]] = {}
+        for keyword, payload in flexible:
+            keyword = ''.join(keyword.split())
+            if keyword:
+                compact.setdefault(keyword, []).append(payload)
+
+        self._literal_keywords = literal
+        self._compact_keywords = compact
+        self._use_automaton = len(literal) + len(compact) > substring_limit
+        self._literal = _Automaton(literal)
+        self._flexible = _Automaton(compact)
+        self._newlines = {keyword: keyword[:-1].count('\n') for keyword in literal}
+
+    def scan(self, text: str) -> List[Hit]:
+        """Return every hit in the text, ordered by end offset"""
+        if self._use_automaton:
+            return self.stream().feed(text)
+        return self._scan_substrings(text)
+
+    def _scan_substrings(self, text: str) -> List[Hit]:
+        """
+        One substring search per keyword; flexible keywords are searched
+        in the text with its whitespace removed, then mapped back
+        """
+        found = []
+        for keyword, payloads in self._literal_keywords.items():
+            if keyword not in text:  # the common case, and cheaper than find()
+                continue
+            start = text.find(keyword)
+            while start != -1:
+                end = start + len(keyword)
+                found.append((end, 0, start, keyword, payloads))
+                start = text.find(keyword, start + 1)
+
+        if self._compact_keywords:
+            positions = None
+            compact = ''.join(text.split())
+            for keyword, payloads in self._compact_keywords.items():
+                if keyword not in compact:
+                    continue
+                index = compact.find(keyword)
+                if positions is None:
+                    positions = [i for i, char in enumerate(text) if not char.isspace()]
+                while index != -1:
+                    end = positions[index + len(keyword) - 1] + 1
+                    found.append((end, 1, positions[index], keyword, payloads))
+                    index = compact.find(keyword, index + 1)
+
+        # The automaton's order: by end, literal before flexible, longest first
+        found.sort(key=lambda item: item[:3])
+        if '\n' not in text:
+            return [Hit(start, end, keyword, payload, 0, 0)
+                    for end, _, start, keyword, payloads in found
+                    for payload in payloads]
+        return [
+            Hit(start, end, keyword, payload, text.count('\n', 0, start), text.count('\n', 0, end - 1))
+            for end, _, start, keyword, payloads in found
+            for payload in payloads
+        ]
+
+    def stream(self) -> 'MatchStream':
+        """Start an incremental scan that can be fed text chunk by chunk"""
+        return MatchStream(self)
+
+
+class MatchStream:
+    """
+    Matcher state carried across chunks.
+
+    Feeding "죽 고" and then " 싶어" finds the same hits as scanning
+    "죽 고 싶어" at once; each call costs time proportional to its chunk.
+    """
+
+    def __init__(self, matcher: KeywordMatcher):
+        self._matcher = matcher
+        self._literal_state = 0
+        self._flexible_state = 0
+        self._offset = 0
+        self._line = 0
+        # (offset, line) of recent non-space characters, enough to locate
+        # the start of the longest flexible keyword
+        self._recent = deque(maxlen=max(matcher._flexible.max_len, 1))
+
+    @property
+    def offset(self) -> int:
+        """Number of characters consumed so far"""
+        return self._offset
+
+    def feed(self, chunk: str) -> List[Hit]:
+        """Consume the next chunk and return the hits it completes"""
+        literal = self._matcher._literal
+        flexible = self._matcher._flexible
+        newlines = self._matcher._newlines
+        literal_state = self._literal_state
+        flexible_state = self._flexible_state
+        recent = self._recent
+        offset = self._offset
+        line = self._line
+        hits = []
+
+        for char in chunk:
+            literal_state = literal.step(literal_state, char)
+            for keyword, payload in literal.out[literal_state]:
+                hits.append(Hit(offset - len(keyword) + 1, offset + 1, keyword, payload,
+                                line - newlines[keyword], line))
+
+            if not char.isspace():
+                recent.append((offset, line))
+                flexible_state = flexible.step(flexible_state, char)
+                for keyword, payload in flexible.out[flexible_state]:
+                    start, start_line = recent[-len(keyword)]
+                    hits.append(Hit(start, offset + 1, keyword, payload, start_line, line))
+
+            if char == '\n':
+                line += 1
+            offset += 1
+
+        self._literal_state = literal_state
+        self._flexible_state = flexible_state
+        self._offset = offset
+        self._line = line
+        return hits
@@ -0,0 +1,228 @@
+"""
+Pipeline Metrics
+Prometheus histograms of per-stage latency and counters for escalations,
+cache lookups and admission control
+
+Recording one turn costs a few microseconds (see
+tests/benchmarks/bench_metrics.py); the documented bound is
+TURN_OVERHEAD_BOUND_US per turn, well under 0.01% of the 700ms budget.
+Without the optional prometheus_client package every call is a no-op.
+prometheus_client is imported when the first enabled PipelineMetrics is
+built, not when this module is.
+"""
+import importlib.util
+import threading
+import weakref
+from typing import Callable, Dict, List, Optional, Tuple
+
+PROMETHEUS_AVAILABLE = importlib.util.find_spec('prometheus_client') is not None
+
+# Per-turn cost of record_turn that bench_metrics.py checks against
+TURN_OVERHEAD_BOUND_US = 50
+
+# Stages a turn can report; the safety layers are timed inside the check
+STAGES = (
+    'asr', 'safety', 'safety_keyword', 'safety_context', 'safety_pattern',
+    'llm', 'postprocess', 'tts', 'total'
+)
+
+# Seconds; dense around the per-stage and 700ms end-to-end budgets
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.15, 0.2, 0.3,
+    0.4, 0.5, 0.6, 0.7, 0.8, 1.0, 1.5, 2.5, 5.0
+)
+
+
+class _CacheCollector:
+    """Reads lookup counters from live caches at scrape time"""
+
+    def __init__(self):
+        self._caches: List[Tuple[str, weakref.ref, Callable]] = []
+        self._lock = threading.Lock()
+
+    def track(self, name: str, cache, counts: Callable[[object], Dict[str, int]]):
+        with self._lock:
+            self._caches.append((name, weakref.ref(cache), counts))
+
+    def collect(self):
+        from prometheus_client.core import CounterMetricFamily
+
+        family = CounterMetricFamily(
+            'intune_cache_lookups', 'Cache lookups by cache and result',
+            labels=['cache', 'result']
+        )
+        totals: Dict[Tuple[str, str], int] = {}
+        with self._lock:
+            self._caches = [entry for entry in self._caches if entry[1]() is not None]
+            caches = list(self._caches)
+        for name, ref, counts in caches:
+            cache = ref()
+            if cache is None:
+                continue
+            for result, count in counts(cache).items():
+                totals[(name, result)] = totals.get((name, result), 0) + count
+        for (name, result), count in sorted(totals.items()):
+            family.add_metric([name, result], count)
+        yield family
+
+
+class _AdmissionCollector:
+    """Reads queue depth and in-flight requests from admission controllers at scrape time"""
+
+    def __init__(self):
+        self._controllers: List[weakref.ref] = []
+        self._lock = threading.Lock()
+
+    def track(self, controller):
+        with self._lock:
+            self._controllers.append(weakref.ref(controller))
+
+    def collect(self):
+        from prometheus_client.core import GaugeMetricFamily
+
+        depth = GaugeMetricFamily(
+            'intune_admission_queue_depth', 'Requests waiting for an in-flight slot',
+            labels=['priority']
+        )
+        inflight = GaugeMetricFamily(
+            'intune_admission_inflight', 'Requests holding an in-flight slot'
+        )
+        queued: Dict[str, int] = {}
+        running = 0
+        with self._lock:
+            self._controllers = [ref for ref in self._controllers if ref() is not None]
+            controllers = [ref() for ref in self._controllers]
+        for controller in controllers:
+            if controller is None:
+                continue
+            running += controller.inflight
+            for priority, count in controller.stats()['queued'].items():
+                queued[priority] = queued.get(priority, 0) + count
+        for priority, count in sorted(queued.items()):
+            depth.add_metric([priority], count)
+        inflight.add_metric([], running)
+        yield depth
+        yield inflight
+
+
+class PipelineMetrics:
+    """
+    Stage latency histograms labelled by stage, mode and risk level.
+
+    Observations are made once per turn, after the risk level is known,
+    from the float durations the pipeline already measures. Labelled
+    children are cached, so the hot path does no label lookups. Cache
+    counters are pulled from the caches at scrape time and cost nothing
+    per lookup, and admission queue depth is read the same way.
+    """
+
+    def __init__(self, registry=None, enabled: bool = True):
+        self.enabled = enabled and PROMETHEUS_AVAILABLE
+        self._children: Dict[Tuple[str, str, str], object] = {}
+        self._escalation_children: Dict[str, object] = {}
+        self._wait_children: Dict[str, object] = {}
+        if not self.enabled:
+            return
+
+        from prometheus_client import REGISTRY, Counter, Histogram
+
+        registry = registry if registry is not None else REGISTRY
+        self.stage_latency = Histogram(
+            'intune_stage_latency_seconds',
+            'Latency of each pipeline stage per turn',
+            ['stage', 'mode', 'risk_level'],
+            buckets=LATENCY_BUCKETS,
+            registry=registry
+        )
+        self.escalations = Counter(
+            'intune_escalations',
+            'Turns escalated as critical risk',
+            ['mode'],
+            registry=registry
+        )
+        self.queue_wait = Histogram(
+            'intune_admission_queue_wait_seconds',
+            'Time admitted requests waited for an in-flight slot',
+            ['priority'],
+            buckets=LATENCY_BUCKETS,
+            registry=registry
+        )
+        self.shed = Counter(
+            'intune_admission_shed',
+            'Requests shed by admission control',
+            ['priority', 'reason'],
+            registry=registry
+        )
+        self._caches = _CacheCollector()
+        registry.register(self._caches)
+        self._admission = _AdmissionCollector()
+        registry.register(self._admission)
+
+    def record_turn(self, mode: str, risk_level: str, seconds: Dict[str, float]):
+        """Observe a finished turn's stage durations in seconds"""
+        if not self.enabled:
+            return
+        children = self._children
+        for stage, value in seconds.items():
+            key = (stage, mode, risk_level)
+            child = children.get(key)
+            if child is None:
+                child = children[key] = self.stage_latency.labels(stage, mode, risk_level)
+            child.observe(value)
+        if risk_level == 'critical':
+            child = self._escalation_children.get(mode)
+            if child is None:
+                child = self._escalation_children[mode] = self.escalations.labels(mode)
+            child.inc()
+
+    def track_cache(self, name: str, cache, counts: Callable[[object], Dict[str, int]]):
+        """
+        Export a cache's lookup counters as ``intune_cache_lookups_total``
+        ``counts(cache)`` returns {result: count}; the cache is weakly held
+        """
+        if self.enabled:
+            self._caches.track(name, cache, counts)
+
+    def track_admission(self, controller):
+        """
+        Export a controller's queue depth and in-flight count as gauges
+        The controller is weakly held
+        """
+        if self.enabled:
+            self._admission.track(controller)
+
+    def record_admission(self, priority: str, wait_seconds: float):
+        """Observe how long an admitted request queued"""
+        if not self.enabled:
+            return
+        child = self._wait_children.get(priority)
+        if child is None:
+            child = self._wait_children[priority] = self.queue_wait.labels(priority)
+        child.observe(wait_seconds)
+
+    def record_shed(self, priority: str, reason: str):
+        if self.enabled:
+            self.shed.labels(priority, reason).inc()
+
+
+def audio_cache_counts(cache) -> Dict[str, int]:
+    """Lookup counters of an AudioCache"""
+    stats = cache.stats
+    return {
+        'hit': stats['memory_hits'] + stats['disk_hits'],
+        'miss': stats['misses']
+    }
+
+
+_default_metrics: Optional[PipelineMetrics] = None
+_default_lock = threading.Lock()
+
+
+def get_metrics() -> PipelineMetrics:
+    """Return the process-wide metrics on the default registry"""
+    global _default_metrics
+    if _default_metrics is None:
+        with _default_lock:
+            if _default_metrics is None:
+                _default_metrics = PipelineMetrics()
+    return _default_metrics
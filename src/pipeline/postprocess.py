@@ -4,20 +4,52 @@ PII scrubbing, tone adjustment, safety validation
 """
 import asyncio
 import re
-from typing import Optional
+from typing import Iterable, List
 
 class PostProcessor:
     def __init__(self, mode: str = "mock"):
         self.mode = mode
         self.target_latency = 30  # ms
         
-        # PII patterns to remove
+        # Numeric PII patterns to remove, highest priority first
         self.pii_patterns = [
             (r'\d{3}-\d{4}-\d{4}', '[전화번호]'),  # Phone numbers
             (r'\d{6}-\d{7}', '[주민번호]'),        # Korean ID numbers
-            (r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', '[이메일]'),  # Email
             (r'\d{5,}', '[번호]'),                 # Long numbers
         ]
+        self.email_pattern = (r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', '[이메일]')
+        
+        # Harsh language and its supportive replacement
+        self.harsh_words = {
+            '절대': '가능하면',
+            '반드시': '되도록',
+            '틀렸': '다르게 생각해볼 수 있',
+            '안돼': '어려울 수 있어'
+        }
+        
+        self._build_rewriter()
+    
+    def _build_rewriter(self):
+        """
+        Compile PII patterns and tone substitutions into one alternation.
+        
+        The scan stops on each maximal run of address characters and
+        checks whether it continues into an email domain. Numeric PII
+        never leaves such a run, so a run that is not an email is
+        resolved in pii_patterns order; a phone number always wins over
+        the generic long number. Every character is visited once.
+        """
+        local, domain = self.email_pattern[0].split('@', 1)
+        self._digit_patterns = [
+            (re.compile(pattern), replacement)
+            for pattern, replacement in self.pii_patterns
+        ]
+        tone = '|'.join(re.escape(word) for word in
+                        sorted(self.harsh_words, key=len, reverse=True))
+        self._rewriter = re.compile(
+            rf'(?P<run>(?>{local}))(?P<domain>@{domain})?'
+            rf'|(?P<tone>{tone})'
+        )
     
     async def process(self, text: str) -> str:
         """
@@ -27,11 +59,22 @@ class PostProcessor:
         if self.mode == "mock":
             await asyncio.sleep(self.target_latency / 1000)
         
-        # Remove PII
-        cleaned = self._scrub_pii(text)
+        return self._clean(text)
+    
+    def process_many(self, texts: Iterable[str]) -> List[str]:
+        """
+        Batch post-processing for corpora and replays
+        Cleans every text synchronously, without simulated latency;
+        each result matches ``process``
+        """
+        return [self._clean(text) for text in texts]
+    
+    def _clean(self, text: str) -> str:
+        # Remove PII and harsh language in one scan
+        cleaned = self._rewrite(text)
         
         # Ensure appropriate tone
-        cleaned = self._adjust_tone(cleaned)
+        cleaned = self._polite_ending(cleaned)
         
         # Validate length
         if len(cleaned) > 500:
@@ -39,30 +82,27 @@ class PostProcessor:
         
         return cleaned
     
-    def _scrub_pii(self, text: str) -> str:
-        """Remove personally identifiable information"""
-        result = text
-        for pattern, replacement in self.pii_patterns:
-            result = re.sub(pattern, replacement, result)
-        return result
+    def _rewrite(self, text: str) -> str:
+        """Remove personally identifiable information and harsh language"""
+        return self._rewriter.sub(self._replace, text)
     
-    def _adjust_tone(self, text: str) -> str:
-        """Ensure therapeutic, supportive tone"""
-        # Remove any harsh language
-        harsh_words = {
-            '절대': '가능하면',
-            '반드시': '되도록',
-            '틀렸': '다르게 생각해볼 수 있',
-            '안돼': '어려울 수 있어'
-        }
+    def _replace(self, match: re.Match) -> str:
+        if match.lastgroup == 'tone':
+            return self.harsh_words[match.group()]
+        if match.group('domain'):
+            return self.email_pattern[1]
         
-        result = text
-        for harsh, gentle in harsh_words.items():
-            result = result.replace(harsh, gentle)
-        
-        # Ensure polite endings
-        if not result.endswith(('요', '까요?', '네요', '어요')):
-            if result.endswith('.'):
-                result = result[:-1] + '요.'
+        run = match.group()
+        if len(run) < 5:
+            return run
+        for pattern, replacement in self._digit_patterns:
+            run = pattern.sub(replacement, run)
+        return run
+    
+    def _polite_ending(self, text: str) -> str:
+        """Ensure therapeutic, supportive tone"""
+        if not text.endswith(('요', '요.', '요?', '요!', '까요?', '네요', '어요')):
+            if text.endswith('.'):
+                text = text[:-1] + '요.'
         
-        return result
\ No newline at end of file
+        return text
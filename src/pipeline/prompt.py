@@ -0,0 +1,110 @@
+"""
+Prompt Assembly
+Chat prompts packed with as much recent context as fits a token budget
+"""
+import importlib.util
+import math
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+# Exact counts need the optional tiktoken package; otherwise estimate
+TIKTOKEN_AVAILABLE = importlib.util.find_spec('tiktoken') is not None
+
+MESSAGE_OVERHEAD = 4  # role and separator tokens per chat message
+REPLY_OVERHEAD = 3    # tokens priming the assistant reply
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Upper-bound estimate without a tokenizer
+    About four ASCII characters per token, one token per other character
+    """
+    ascii_chars = sum(1 for char in text if char < '\x80')
+    return math.ceil(ascii_chars / 4) + len(text) - ascii_chars
+
+
+class TokenCounter:
+    """
+    Memoized token counts keyed by message text.
+
+    Stored context returns the same string objects every turn, so each
+    message is tokenized once while its session is active; least recently
+    used counts are dropped past ``max_items``.
+    """
+
+    def __init__(self, model: str = "gpt-4o", max_items: int = 65536):
+        self.max_items = max_items
+        self.hits = 0
+        self.misses = 0
+        self._counts: 'OrderedDict[str, int]' = OrderedDict()
+        self._encode = None
+        if TIKTOKEN_AVAILABLE:
+            import tiktoken
+            try:
+                self._encode = tiktoken.encoding_for_model(model).encode
+            except KeyError:
+                self._encode = tiktoken.get_encoding('o200k_base').encode
+
+    def __call__(self, text: str) -> int:
+        count = self._counts.get(text)
+        if count is not None:
+            self._counts.move_to_end(text)
+            self.hits += 1
+            return count
+
+        self.misses += 1
+        count = len(self._encode(text)) if self._encode else estimate_tokens(text)
+        self._counts[text] = count
+        if len(self._counts) > self.max_items:
+            self._counts.popitem(last=False)
+        return count
+
+
+class Prompt(NamedTuple):
+    messages: List[Dict[str, str]]
+    tokens: int                    # prompt tokens, including message overhead
+    context: List[Dict[str, str]]  # the exchanges that fit the budget
+
+
+class PromptBuilder:
+    """
+    Builds chat messages from a system prompt, recent exchanges and the
+    new utterance.
+
+    The system prompt and the utterance are always sent. Exchanges are
+    then added newest first, whole, until the next one would exceed
+    ``budget`` prompt tokens, so many short turns or a few long ones fit
+    the same prompt size.
+    """
+
+    def __init__(
+        self,
+        system_prompt: str,
+        budget: int = 1500,
+        counter: Optional[TokenCounter] = None
+    ):
+        self.system_prompt = system_prompt
+        self.budget = budget
+        self.count = counter or TokenCounter()
+
+    def build(self, text: str, context: Sequence[Dict[str, str]] = ()) -> Prompt:
+        """Messages for one chat completion, oldest context first"""
+        count = self.count
+        tokens = (REPLY_OVERHEAD + 2 * MESSAGE_OVERHEAD
+                  + count(self.system_prompt) + count(text))
+
+        exchanges = 0
+        for exchange in reversed(context):
+            cost = 2 * MESSAGE_OVERHEAD + count(exchange["user"]) + count(exchange["assistant"])
+            if tokens + cost > self.budget:
+                break
+            tokens += cost
+            exchanges += 1
+
+        packed = list(context[len(context) - exchanges:])
+        messages = [{"role": "system", "content": self.system_prompt}]
+        for exchange in packed:
+            messages.append({"role": "user", "content": exchange["user"]})
+            messages.append({"role": "assistant", "content": exchange["assistant"]})
+        messages.append({"role": "user", "content": text})
+        return Prompt(messages, tokens, packed)
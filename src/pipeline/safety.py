@@ -3,14 +3,168 @@
 Real-time crisis detection and intervention
 """
 import asyncio
-import re
-from typing import Dict, List
+import logging
+import time
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+
+from .matcher import Hit, KeywordMatcher
+from .tracing import get_tracer
+
+logger = logging.getLogger(__name__)
+tracer = get_tracer(__name__)
+
+# Layer 1 risk per level: literal keywords and whitespace-flexible patterns
+KEYWORD_SCORES = {'immediate': 0.9, 'high': 0.7, 'medium': 0.5}
+PATTERN_SCORES = {'immediate': 0.95, 'high': 0.75}
+
+# Layer 2 weight per distinct word found in each context group
+CONTEXT_WEIGHTS = {'isolation': 0.2, 'hopeless': 0.25}
+
+# Layer 3 weight per risk pattern found
+SEQUENCE_WEIGHT = 0.3
+
+# Scores above this are critical; layers combine by max, so no later
+# layer can lower a critical outcome
+CRITICAL_THRESHOLD = 0.8
+
+# Scores above this get enhanced monitoring
+MONITORING_THRESHOLD = 0.6
+
+# Layers cheapest first, the default cascade order
+LAYER_ORDER = ['keyword', 'context', 'pattern']
+
+
+class Thresholds(NamedTuple):
+    """Risk level cutoffs, swapped as one value so no check sees half an update"""
+    escalation: float = CRITICAL_THRESHOLD
+    monitoring: float = MONITORING_THRESHOLD
+
+
+class _RiskTally:
+    """
+    Layer scores accumulated from matcher hits.
+
+    Layer 3 patterns are ordered token pairs ("죽" ... "싶") that must
+    appear on the same line; the earliest end of every first token is
+    kept per line, so hits can be added in any number of batches.
+    """
+
+    def __init__(self, guard: 'SafetyGuard'):
+        self._sequences = guard._sequence_index
+        self.keyword_score = 0.0
+        self.context_words = {group: set() for group in CONTEXT_WEIGHTS}
+        self.patterns_found = set()
+        self._first_end = {}
+
+    def add(self, hits: List[Hit]):
+        for hit in hits:
+            kind, value = hit.payload
+            if kind == 'keyword':
+                self.keyword_score = max(self.keyword_score, KEYWORD_SCORES[value])
+            elif kind == 'pattern':
+                self.keyword_score = max(self.keyword_score, PATTERN_SCORES[value])
+            elif kind == 'context':
+                self.context_words[value].add(hit.keyword)
+            else:  # sequence token
+                for pattern_index, first in self._sequences[value]:
+                    if first is None:
+                        self.patterns_found.add(pattern_index)
+                    else:
+                        first_end = self._first_end.get((first, hit.start_line))
+                        if first_end is not None and first_end <= hit.start:
+                            self.patterns_found.add(pattern_index)
+                self._first_end.setdefault((value, hit.end_line), hit.end)
+
+    @property
+    def context_score(self) -> float:
+        score = sum(len(words) * CONTEXT_WEIGHTS[group]
+                    for group, words in self.context_words.items())
+        return min(score, 1.0)
+
+    @property
+    def pattern_score(self) -> float:
+        return min(len(self.patterns_found) * SEQUENCE_WEIGHT, 1.0)
+
+
+class SafetySession:
+    """
+    Incremental safety check over a transcript that grows chunk by chunk.
+
+    Matcher state is carried across chunks, so a phrase split as
+    "죽 고" + " 싶어" is found the moment its last character arrives, and
+    each append costs time proportional to the chunk. The first time the
+    combined risk turns critical, ``on_critical`` is called with the
+    assessment and ``append`` returns it.
+    """
+
+    def __init__(
+        self,
+        guard: 'SafetyGuard',
+        on_critical: Optional[Callable[[Dict], None]] = None
+    ):
+        self._guard = guard
+        self._stream = guard.matcher.stream()
+        self._tally = _RiskTally(guard)
+        self.on_critical = on_critical
+        self.critical: Optional[Dict] = None
+
+    @property
+    def length(self) -> int:
+        """Characters consumed so far"""
+        return self._stream.offset
+
+    def append(self, chunk: str) -> Optional[Dict]:
+        """Scan the next chunk; returns the assessment if it just turned critical"""
+        self._tally.add(self._stream.feed(chunk))
+        if self.critical is not None:
+            return None
+
+        assessment = self.assessment()
+        if assessment['risk_level'] != 'critical':
+            return None
+        self.critical = assessment
+        if self.on_critical is not None:
+            self.on_critical(assessment)
+        return assessment
+
+    def update(self, transcript: str) -> Optional[Dict]:
+        """Append whatever a growing partial transcript added since last time"""
+        return self.append(transcript[self.length:])
+
+    def assessment(self) -> Dict:
+        """Risk assessment of everything seen so far, shaped like ``check``"""
+        tally = self._tally
+        return self._guard._assess({
+            'keyword': tally.keyword_score,
+            'context': tally.context_score,
+            'pattern': tally.pattern_score
+        })
+
 
 class SafetyGuard:
-    def __init__(self, mode: str = "mock"):
+    def __init__(
+        self,
+        mode: str = "mock",
+        extra_keywords: Optional[Dict[str, List[str]]] = None,
+        cascade: bool = False,
+        layer_order: Optional[List[str]] = None,
+        escalation_threshold: float = CRITICAL_THRESHOLD,
+        monitoring_threshold: float = MONITORING_THRESHOLD
+    ):
         self.mode = mode
         self.target_latency = 50  # ms
         
+        # Risk levels; replaced whole while running (settings hot reload),
+        # and each check reads them once
+        self.thresholds = Thresholds(escalation_threshold, monitoring_threshold)
+        
+        # Cascade mode runs layers one by one and stops at a critical score
+        self.cascade = cascade
+        self.layer_order = list(layer_order or LAYER_ORDER)
+        unknown = set(self.layer_order) - set(LAYER_ORDER)
+        if unknown:
+            raise ValueError(f"Unknown safety layers: {', '.join(sorted(unknown))}")
+        
         # Korean crisis keywords (with variations)
         self.crisis_keywords = {
             'immediate': ['자살', '죽고싶', '죽고 싶', '죽을래', '죽을 래', '목매', '투신', 
@@ -19,55 +173,148 @@ class SafetyGuard:
             'medium': ['외로워', '외로 워', '슬퍼', '슬 퍼', '불안', '걱정', '스트레스']
         }
         
-        # Regex patterns for more flexible matching
+        # Production lists (e.g. data/safety-triggers) extend the built-in ones;
+        # a level without a score would never count, so it is skipped
+        for level, keywords in (extra_keywords or {}).items():
+            if level not in KEYWORD_SCORES:
+                logger.warning(f"Ignoring {len(keywords)} safety keywords with unknown level {level!r}")
+                continue
+            self.crisis_keywords[level].extend(keywords)
+        
+        # Patterns matched with any whitespace between characters
         self.crisis_patterns = {
             'immediate': [
-                r'죽\s*고\s*싶',     # 죽고싶, 죽고 싶, 죽 고 싶
-                r'죽\s*을\s*래',     # 죽을래, 죽을 래
-                r'자\s*살',          # 자살, 자 살
-                r'목\s*[을를]\s*매',  # 목을 매, 목 을 매
-                r'뛰\s*어\s*내\s*리'  # 뛰어내리, 뛰어 내리
+                '죽고싶',     # 죽고싶, 죽고 싶, 죽 고 싶
+                '죽을래',     # 죽을래, 죽을 래
+                '자살',       # 자살, 자 살
+                '목을매',     # 목을 매, 목 을 매
+                '목를매',
+                '뛰어내리'    # 뛰어내리, 뛰어 내리
             ],
             'high': [
-                r'우\s*울',          # 우울, 우 울
-                r'힘\s*들',          # 힘들어, 힘 들어
-                r'포\s*기',          # 포기, 포 기
-                r'절\s*망',          # 절망, 절 망
+                '우울',       # 우울, 우 울
+                '힘들',       # 힘들어, 힘 들어
+                '포기',       # 포기, 포 기
+                '절망',       # 절망, 절 망
             ]
         }
         
+        # Layer 2: isolation and hopelessness indicators
+        self.context_keywords = {
+            'isolation': ['혼자', '아무도', '관심없', '버림받'],
+            'hopeless': ['의미없', '포기', '끝', '못하겠']
+        }
+        
+        # Layer 3: sentence patterns, each a list of alternatives; an
+        # alternative is a single token or an ordered pair on one line
+        self.risk_sequences = [
+            [('더이상', '못'), ('안',), ('없',)],  # "더 이상 ~ 못/안/없"
+            [('죽', '싶'), ('싶', '죽')],          # Death wish patterns
+            [('끝', '내'), ('내', '끝')]           # Ending patterns
+        ]
+        
+        self._build_matcher()
+        
         self.emergency_response = """당신의 마음이 많이 힘드신 것 같아요. 
 지금 이 순간, 당신은 혼자가 아닙니다. 
 잠시만 기다려 주세요. 곧 전문 상담사님이 연결될 거예요.
 그동안 제가 옆에 있을게요. 함께 깊은 숨을 쉬어볼까요?"""
     
-    async def check(self, text: str) -> Dict:
+    async def check(self, text: str, seconds: Optional[Dict[str, float]] = None) -> Dict:
         """
         3-layer safety check
-        Returns risk assessment and intervention plan
+        Returns risk assessment and intervention plan; when ``seconds``
+        is given, each layer's duration is stored in it as safety_<layer>
         """
+        # Single pass over the transcript feeds all three layers
+        tally = self.scan(text)
+        
+        if self.cascade:
+            return await self._check_cascade(tally, seconds)
+        
         # Layer 1: Keyword detection (5ms)
-        layer1_start = asyncio.create_task(self._layer1_keywords(text))
+        layer1_start = asyncio.create_task(self._run_layer('keyword', tally, seconds))
         
         # Layer 2: Context analysis (20ms)
-        layer2_start = asyncio.create_task(self._layer2_context(text))
+        layer2_start = asyncio.create_task(self._run_layer('context', tally, seconds))
         
         # Layer 3: Pattern analysis (25ms)
-        layer3_start = asyncio.create_task(self._layer3_patterns(text))
+        layer3_start = asyncio.create_task(self._run_layer('pattern', tally, seconds))
         
         # Wait for all layers
-        layer1_risk = await layer1_start
-        layer2_risk = await layer2_start
-        layer3_risk = await layer3_start
+        layers = {
+            'keyword': await layer1_start,
+            'context': await layer2_start,
+            'pattern': await layer3_start
+        }
+        
+        assessment = self._assess(layers)
         
-        # Combine assessments
-        max_risk = max(layer1_risk, layer2_risk, layer3_risk)
+        # Simulate total processing time
+        if self.mode == "mock":
+            await asyncio.sleep(max(0, (self.target_latency / 1000) - 0.025))
+        
+        return assessment
+    
+    async def _check_cascade(
+        self,
+        tally: _RiskTally,
+        seconds: Optional[Dict[str, float]] = None
+    ) -> Dict:
+        """
+        Run layers in ``layer_order`` and stop at the first critical
+        score. ``layers_run`` lists the layers in the order they ran;
+        skipped layers score None
+        """
+        thresholds = self.thresholds
+        layers = {}
+        for name in self.layer_order:
+            layers[name] = await self._run_layer(name, tally, seconds)
+            if layers[name] > thresholds.escalation:
+                break
+        for name in LAYER_ORDER:
+            layers.setdefault(name, None)
+        return self._assess(layers, thresholds)
+    
+    def check_many(self, texts: Iterable[str]) -> List[Dict]:
+        """
+        Batch safety check for replays and dataset evaluation
+        Scores every text synchronously, without per-call tasks or
+        simulated layer latency; each result matches ``check``
+        """
+        results = []
+        for text in texts:
+            tally = self.scan(text)
+            results.append(self._assess({
+                'keyword': tally.keyword_score,
+                'context': tally.context_score,
+                'pattern': tally.pattern_score
+            }))
+        return results
+    
+    @property
+    def escalation_threshold(self) -> float:
+        return self.thresholds.escalation
+
+    @property
+    def monitoring_threshold(self) -> float:
+        return self.thresholds.monitoring
+    
+    def _assess(
+        self,
+        layers: Dict[str, Optional[float]],
+        thresholds: Optional[Thresholds] = None
+    ) -> Dict:
+        """Combine layer scores into a risk level and intervention plan"""
+        layers_run = [name for name, risk in layers.items() if risk is not None]
+        max_risk = max(layers[name] for name in layers_run)
+        thresholds = thresholds or self.thresholds
         
         # Determine risk level
-        if max_risk > 0.8:
+        if max_risk > thresholds.escalation:
             risk_level = "critical"
             intervention = "immediate_escalation"
-        elif max_risk > 0.6:
+        elif max_risk > thresholds.monitoring:
             risk_level = "high"
             intervention = "enhanced_monitoring"
         elif max_risk > 0.4:
@@ -77,78 +324,80 @@ class SafetyGuard:
             risk_level = "low"
             intervention = None
         
-        # Simulate total processing time
-        if self.mode == "mock":
-            await asyncio.sleep(max(0, (self.target_latency / 1000) - 0.025))
-        
         return {
             'risk_level': risk_level,
             'risk_score': max_risk,
             'intervention': intervention,
-            'layers': {
-                'keyword': layer1_risk,
-                'context': layer2_risk,
-                'pattern': layer3_risk
-            },
+            'layers': layers,
+            'layers_run': layers_run,
             'emergency_response': self.emergency_response if risk_level == "critical" else None
         }
     
-    async def _layer1_keywords(self, text: str) -> float:
+    def _build_matcher(self):
+        """Compile every layer's keywords into one automaton"""
+        keywords = [(keyword, ('keyword', level))
+                    for level, words in self.crisis_keywords.items()
+                    for keyword in words]
+        keywords += [(word, ('context', group))
+                     for group, words in self.context_keywords.items()
+                     for word in words]
+        
+        flexible = [(pattern, ('pattern', level))
+                    for level, patterns in self.crisis_patterns.items()
+                    for pattern in patterns]
+        
+        # token -> [(pattern index, token that must come first or None)]
+        self._sequence_index = {}
+        for index, alternatives in enumerate(self.risk_sequences):
+            for alternative in alternatives:
+                first = alternative[0] if len(alternative) > 1 else None
+                self._sequence_index.setdefault(alternative[-1], []).append((index, first))
+                for token in alternative:
+                    self._sequence_index.setdefault(token, [])
+        flexible += [(token, ('sequence', token)) for token in self._sequence_index]
+        
+        self.matcher = KeywordMatcher(keywords, flexible)
+    
+    def session(self, on_critical: Optional[Callable[[Dict], None]] = None) -> SafetySession:
+        """Start an incremental check over a streamed transcript"""
+        return SafetySession(self, on_critical)
+    
+    def scan(self, text: str) -> _RiskTally:
+        """Run the matcher once and tally hits for all three layers"""
+        tally = _RiskTally(self)
+        tally.add(self.matcher.scan(text))
+        return tally
+    
+    async def _run_layer(
+        self,
+        name: str,
+        tally: _RiskTally,
+        seconds: Optional[Dict[str, float]]
+    ) -> float:
+        run_layer = {
+            'keyword': self._layer1_keywords,
+            'context': self._layer2_context,
+            'pattern': self._layer3_patterns
+        }[name]
+        start = time.perf_counter()
+        with tracer.start_as_current_span(f'safety.{name}') as span:
+            score = await run_layer(tally)
+            span.set_attribute('intune.score', score)
+        if seconds is not None:
+            seconds[f'safety_{name}'] = time.perf_counter() - start
+        return score
+    
+    async def _layer1_keywords(self, tally: _RiskTally) -> float:
         """Layer 1: Real-time keyword detection"""
         await asyncio.sleep(0.005)  # 5ms
-        
-        risk_score = 0.0
-        
-        # Check exact keywords
-        for level, keywords in self.crisis_keywords.items():
-            for keyword in keywords:
-                if keyword in text:
-                    if level == 'immediate':
-                        risk_score = max(risk_score, 0.9)
-                    elif level == 'high':
-                        risk_score = max(risk_score, 0.7)
-                    elif level == 'medium':
-                        risk_score = max(risk_score, 0.5)
-        
-        # Check regex patterns for flexible spacing
-        for level, patterns in self.crisis_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, text):
-                    if level == 'immediate':
-                        risk_score = max(risk_score, 0.95)
-                    elif level == 'high':
-                        risk_score = max(risk_score, 0.75)
-        
-        return risk_score
+        return tally.keyword_score
     
-    async def _layer2_context(self, text: str) -> float:
+    async def _layer2_context(self, tally: _RiskTally) -> float:
         """Layer 2: Contextual analysis"""
         await asyncio.sleep(0.02)  # 20ms
-        
-        # Check for isolation indicators
-        isolation_words = ['혼자', '아무도', '관심없', '버림받']
-        isolation_score = sum(1 for word in isolation_words if word in text) * 0.2
-        
-        # Check for hopelessness
-        hopeless_words = ['의미없', '포기', '끝', '못하겠']
-        hopeless_score = sum(1 for word in hopeless_words if word in text) * 0.25
-        
-        return min(isolation_score + hopeless_score, 1.0)
+        return tally.context_score
     
-    async def _layer3_patterns(self, text: str) -> float:
+    async def _layer3_patterns(self, tally: _RiskTally) -> float:
         """Layer 3: Pattern analysis"""
         await asyncio.sleep(0.025)  # 25ms
-        
-        # Analyze sentence patterns
-        risk_patterns = [
-            r'더\s*이상.*못|안|없',  # "더 이상 ~ 못/안/없"
-            r'죽.*싶|싶.*죽',        # Death wish patterns
-            r'끝.*내|내.*끝'         # Ending patterns
-        ]
-        
-        pattern_score = 0.0
-        for pattern in risk_patterns:
-            if re.search(pattern, text):
-                pattern_score += 0.3
-        
-        return min(pattern_score, 1.0)
\ No newline at end of file
+        return tally.pattern_score
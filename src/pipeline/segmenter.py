@@ -0,0 +1,67 @@
+"""
+Korean Sentence Segmenter
+Cuts streamed LLM tokens into sentences that can be voiced independently
+"""
+import re
+from typing import List, Optional
+
+# A sentence ends at terminal punctuation (요. / 까요? / 다!) or at a polite
+# ending without punctuation (네요, 어요, ...). The following whitespace is
+# required so that "3.5" or "네요." are never split early; at the end of the
+# buffer we wait for the next token instead of guessing.
+SENTENCE_BOUNDARY = re.compile(
+    r'(?:[.?!…。]+|(?:네요|어요|아요|세요|해요|예요|에요|죠))(?=\s)'
+)
+
+
+class SentenceSegmenter:
+    """
+    Incremental sentence splitter for streamed Korean text.
+
+    ``feed`` returns every sentence completed by the new chunk and keeps
+    the unfinished tail buffered; ``flush`` returns whatever is left once
+    the stream ends. Sentences shorter than ``min_chars`` are merged with
+    the next one so TTS is not called for fragments like "네."
+    """
+
+    def __init__(self, min_chars: int = 8, max_chars: int = 150):
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+        self._buffer = ""
+        self._scan_from = 0
+
+    def feed(self, chunk: str) -> List[str]:
+        """Add a chunk of streamed text and return completed sentences"""
+        self._buffer += chunk
+        sentences = []
+
+        while True:
+            match = SENTENCE_BOUNDARY.search(self._buffer, self._scan_from)
+            if match is None:
+                break
+            end = match.end()
+            if len(self._buffer[:end].strip()) < self.min_chars:
+                # Too short to voice on its own, keep accumulating
+                self._scan_from = end
+                continue
+            sentences.append(self._buffer[:end].strip())
+            self._buffer = self._buffer[end:]
+            self._scan_from = 0
+
+        # Overlong run without a boundary: cut at the last space
+        while len(self._buffer) > self.max_chars:
+            cut = self._buffer.rfind(' ', 0, self.max_chars)
+            if cut <= 0:
+                cut = self.max_chars
+            sentences.append(self._buffer[:cut].strip())
+            self._buffer = self._buffer[cut:]
+            self._scan_from = 0
+
+        return [s for s in sentences if s]
+
+    def flush(self) -> Optional[str]:
+        """Return the buffered tail once the stream has ended"""
+        tail = self._buffer.strip()
+        self._buffer = ""
+        self._scan_from = 0
+        return tail or None
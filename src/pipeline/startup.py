@@ -0,0 +1,123 @@
+"""
+Startup Profile
+Initialization time per startup phase and import time per module, for
+tuning the cold start of the CLI and the inference service
+"""
+import re
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+# "import time: <self us> | <cumulative us> | <indent><module>" from -X importtime
+_IMPORT_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+class ImportTime(NamedTuple):
+    module: str
+    self_ms: float
+    cumulative_ms: float
+    depth: int  # 0 for modules imported directly
+
+
+class StartupProfile:
+    """
+    Wall time between named startup marks.
+
+    ``mark(name)`` charges the time since the previous mark (or since
+    ``start``) to ``name``, so startup code is timed by dropping marks
+    between its steps rather than wrapping them in blocks.
+    """
+
+    def __init__(self, start: Optional[float] = None, clock: Callable[[], float] = time.perf_counter):
+        self.clock = clock
+        self.start = clock() if start is None else start
+        self._last = self.start
+        self.phases: Dict[str, float] = {}
+
+    def mark(self, name: str) -> float:
+        """Close phase ``name``; returns its duration in ms"""
+        now = self.clock()
+        elapsed = (now - self._last) * 1000
+        self.phases[name] = self.phases.get(name, 0.0) + elapsed
+        self._last = now
+        return elapsed
+
+    @property
+    def total_ms(self) -> float:
+        return (self._last - self.start) * 1000
+
+    def report(self, imports: Optional[List[ImportTime]] = None, top: int = 10) -> Dict:
+        """Phases, plus the slowest imports when an import profile is given"""
+        report = {
+            'phases_ms': {name: round(ms, 1) for name, ms in self.phases.items()},
+            'total_ms': round(self.total_ms, 1)
+        }
+        if imports is not None:
+            report['imports_ms'] = {
+                entry.module: round(entry.cumulative_ms, 1)
+                for entry in slowest(imports, top, depth=0)
+            }
+            report['slowest_self_ms'] = {
+                entry.module: round(entry.self_ms, 1)
+                for entry in sorted(imports, key=lambda entry: entry.self_ms, reverse=True)[:top]
+            }
+        return report
+
+
+def import_profile(
+    modules: Sequence[str],
+    path: Sequence[str] = (),
+    python: str = sys.executable
+) -> List[ImportTime]:
+    """
+    Import ``modules`` in a fresh interpreter under ``-X importtime``
+    Returns every module they loaded, in load order; ``path`` is
+    prepended to sys.path first
+    """
+    code = f"import sys; sys.path[:0] = {list(path)!r}\n"
+    # Some loaded names are aliases that cannot be imported on their own
+    code += "".join(f"try:\n    import {module}\nexcept Exception:\n    pass\n"
+                    for module in modules)
+    result = subprocess.run(
+        [python, '-X', 'importtime', '-c', code],
+        capture_output=True, text=True, check=True
+    )
+    requested = set(modules)
+    imports: List[ImportTime] = []
+    pending: List[ImportTime] = []
+    for line in result.stderr.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, module = match.groups()
+        pending.append(ImportTime(
+            module, int(self_us) / 1000, int(cumulative_us) / 1000, (len(indent) - 1) // 2
+        ))
+        # A module is reported after everything it imported; the
+        # interpreter's own startup imports are dropped
+        if pending[-1].depth == 0:
+            if module in requested:
+                imports.extend(pending)
+            pending = []
+    return imports
+
+
+def slowest(imports: List[ImportTime], top: int = 10, depth: Optional[int] = None) -> List[ImportTime]:
+    """Imports with the highest cumulative time, optionally at one depth"""
+    entries = [entry for entry in imports if depth is None or entry.depth == depth]
+    return sorted(entries, key=lambda entry: entry.cumulative_ms, reverse=True)[:top]
+
+
+def loaded_since(before: Iterable[str]) -> List[str]:
+    """
+    Modules imported since the ``before`` snapshot of sys.modules, each
+    ahead of the modules it imported, so replaying them under
+    ``import_profile`` charges imports to the module that pulled them in
+    """
+    before = set(before)
+    # A module moves to the end of sys.modules once its own imports finish
+    return [
+        name for name in reversed(list(sys.modules))
+        if name not in before and not any(part.startswith('_') for part in name.split('.'))
+    ]
@@ -0,0 +1,219 @@
+"""
+Pipeline Tracing
+OpenTelemetry spans for every stage and safety layer, kept or dropped
+per trace once the whole turn is known (tail-based sampling)
+"""
+import importlib.util
+import os
+import random
+import sys
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+
+OTEL_AVAILABLE = importlib.util.find_spec('opentelemetry') is not None
+OTEL_SDK_AVAILABLE = OTEL_AVAILABLE and importlib.util.find_spec('opentelemetry.sdk') is not None
+
+# opentelemetry is imported only once tracing is configured (see _LazyTracer)
+if TYPE_CHECKING:
+    from opentelemetry.sdk.trace import ReadableSpan
+    from opentelemetry.sdk.trace.export import SpanExporter
+
+_OTEL_TRACE = 'opentelemetry.trace'
+
+# Root span attributes the tail sampler reads
+RISK_ATTRIBUTE = 'intune.risk_level'
+
+
+class _NoopSpan:
+    """Stands in for a span when opentelemetry is not installed"""
+
+    def set_attribute(self, key, value):
+        pass
+
+    def set_attributes(self, attributes):
+        pass
+
+    def end(self, end_time=None):
+        pass
+
+
+class _NoopTracer:
+    _span = _NoopSpan()
+
+    @contextmanager
+    def start_as_current_span(self, name, context=None, kind=None, attributes=None):
+        yield self._span
+
+    def start_span(self, name, context=None, kind=None, attributes=None):
+        return self._span
+
+
+_NOOP_TRACER = _NoopTracer()
+
+
+class _LazyTracer:
+    """
+    Module tracer that binds to opentelemetry once something imports it.
+
+    A tracer provider can only be installed by code that imported
+    opentelemetry.trace (configure_tracing, the inference service, a
+    test), and until then every span would be non-recording. Spans stay
+    no-ops until that import has happened, so processes that never
+    configure tracing never pay for loading opentelemetry.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._tracer = None
+
+    def _resolve(self):
+        if self._tracer is None:
+            trace = sys.modules.get(_OTEL_TRACE)
+            if trace is None:
+                return _NOOP_TRACER
+            self._tracer = trace.get_tracer(self.name)
+        return self._tracer
+
+    def start_as_current_span(self, name, **kwargs):
+        return self._resolve().start_as_current_span(name, **kwargs)
+
+    def start_span(self, name, **kwargs):
+        return self._resolve().start_span(name, **kwargs)
+
+
+def get_tracer(name: str):
+    """Tracer for a module; a no-op when opentelemetry is missing"""
+    if OTEL_AVAILABLE:
+        return _LazyTracer(name)
+    return _NOOP_TRACER
+
+
+def span_context(span):
+    """Context with ``span`` as parent, for spans started outside it"""
+    trace = sys.modules.get(_OTEL_TRACE)
+    if trace is None or isinstance(span, _NoopSpan):
+        return None
+    return trace.set_span_in_context(span)
+
+
+class TailSampler:
+    """
+    Span processor that decides per trace, after its local root ends.
+
+    Child spans are held until the root span of the trace in this
+    process ends. The whole trace is then forwarded to ``processor`` if
+    the root took longer than ``budget_ms``, carries a critical risk
+    level, or wins a ``ratio`` draw; otherwise it is dropped before any
+    export work. Spans that end after their root follow the decision
+    already made. Pending and decided traces are bounded, so abandoned
+    traces cannot grow memory. It implements the SDK's SpanProcessor
+    interface without subclassing it, so defining it loads no SDK code.
+    """
+
+    def __init__(
+        self,
+        processor,
+        budget_ms: float = 700.0,
+        ratio: float = 0.05,
+        max_traces: int = 10000,
+        rng: Callable[[], float] = random.random
+    ):
+        self.processor = processor
+        self.budget_ns = budget_ms * 1_000_000
+        self.ratio = ratio
+        self.max_traces = max_traces
+        self.rng = rng
+        self.kept = 0
+        self.dropped = 0
+        self._pending: 'OrderedDict[int, List]' = OrderedDict()
+        self._decided: 'OrderedDict[int, bool]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def on_start(self, span, parent_context=None):
+        pass
+
+    def on_end(self, span: 'ReadableSpan'):
+        trace_id = span.context.trace_id
+        is_root = span.parent is None or span.parent.is_remote
+        with self._lock:
+            keep = self._decided.get(trace_id)
+            if keep is None and not is_root:
+                self._pending.setdefault(trace_id, []).append(span)
+                if len(self._pending) > self.max_traces:
+                    self._pending.popitem(last=False)
+                return
+
+            if keep is None:
+                keep = self._keep(span)
+                self._decided[trace_id] = keep
+                if len(self._decided) > self.max_traces:
+                    self._decided.popitem(last=False)
+                if keep:
+                    self.kept += 1
+                else:
+                    self.dropped += 1
+            spans = self._pending.pop(trace_id, [])
+        if keep:
+            for pending in spans:
+                self.processor.on_end(pending)
+            self.processor.on_end(span)
+
+    def _keep(self, root: 'ReadableSpan') -> bool:
+        if root.end_time - root.start_time > self.budget_ns:
+            return True
+        if (root.attributes or {}).get(RISK_ATTRIBUTE) == 'critical':
+            return True
+        return self.rng() < self.ratio
+
+    def shutdown(self):
+        self.processor.shutdown()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return self.processor.force_flush(timeout_millis)
+
+
+def configure_tracing(
+    settings: Optional[Dict] = None,
+    exporter: Optional['SpanExporter'] = None,
+    processor=None
+) -> Optional['TailSampler']:
+    """
+    Install a global tracer provider behind a TailSampler.
+
+    Spans go to ``processor`` if given, else to a batch processor around
+    ``exporter``, else to OTLP when OTEL_EXPORTER_OTLP_ENDPOINT is set and
+    the exporter package is installed. Returns the sampler, or None when
+    tracing is disabled or unavailable.
+    """
+    settings = settings or {}
+    if not OTEL_SDK_AVAILABLE or not settings.get('enabled', True):
+        return None
+
+    if processor is None and exporter is None and not os.getenv('OTEL_EXPORTER_OTLP_ENDPOINT'):
+        return None  # nothing to export to; leave opentelemetry unloaded
+
+    from opentelemetry import trace
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+    if processor is None:
+        if exporter is None and os.getenv('OTEL_EXPORTER_OTLP_ENDPOINT'):
+            if importlib.util.find_spec('opentelemetry.exporter.otlp.proto.http') is not None:
+                from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+                exporter = OTLPSpanExporter()
+        if exporter is None:
+            return None
+        processor = BatchSpanProcessor(exporter)
+
+    sampler = TailSampler(
+        processor,
+        budget_ms=settings.get('budget_ms', 700),
+        ratio=settings.get('sample_ratio', 0.05),
+        max_traces=settings.get('max_pending_traces', 10000)
+    )
+    provider = TracerProvider()
+    provider.add_span_processor(sampler)
+    trace.set_tracer_provider(provider)
+    return sampler
@@ -4,16 +4,38 @@ ElevenLabs integration for emotional voice synthesis
 """
 import asyncio
 import os
-from typing import Dict, Optional
+from typing import Dict, Iterable, Optional, Tuple
+
+from .audio_cache import Audio, AudioCache, cache_key
+from .hedge import Hedger
+from .http_pool import ClientPool
 
 class TTSProcessor:
-    def __init__(self, mode: str = "mock"):
+    def __init__(
+        self,
+        mode: str = "mock",
+        cache: Optional[AudioCache] = None,
+        pool: Optional[ClientPool] = None,
+        hedger: Optional[Hedger] = None
+    ):
         self.mode = mode
         self.target_latency = 180  # ms
+        self.first_audio_latency = 60  # ms, shortest segment synthesis
+        self.chars_per_target = 100  # response length the full budget covers
+        
+        # Rendered audio keyed by (text, voice style, prosody)
+        self.cache = cache if cache is not None else AudioCache()
+        
+        # Audio rendered at startup and never evicted (crisis responses)
+        self._pinned: Dict[str, Audio] = {}
         
         if mode == "live":
             self.api_key = os.getenv("ELEVENLABS_API_KEY")
-            # Would initialize ElevenLabs client here
+            # Keep-alive ElevenLabs client shared with the other stages
+            self.pool = pool or ClientPool()
+            self.voice_id = os.getenv("ELEVENLABS_VOICE_ID", "korean_therapist_v2")
+            # Second request when synthesis is slower than usual
+            self.hedger = hedger
         
         # Voice emotion mappings
         self.emotion_voices = {
@@ -30,21 +52,100 @@ class TTSProcessor:
         Convert text to speech with emotional tone
         Returns audio URL or file path
         """
+        key, _, _ = await self._render_cached(text, emotion, self.target_latency)
+        return self._audio_url(key, emotion)
+    
+    async def synthesize_segment(self, text: str, emotion: Dict, index: int) -> str:
+        """
+        Convert one sentence of a streamed response to speech
+        Synthesis time scales with the segment length
+        """
+        latency = min(
+            self.target_latency,
+            max(self.first_audio_latency, self.target_latency * len(text) / self.chars_per_target)
+        )
+        key, _, _ = await self._render_cached(text, emotion, latency)
+        return self._audio_url(key, emotion)
+    
+    async def prewarm(self, phrases: Iterable[Tuple[str, Dict]]) -> int:
+        """
+        Render phrases into the cache ahead of traffic
+        Returns how many phrases actually had to be synthesized
+        """
+        rendered = 0
+        for text, emotion in phrases:
+            _, _, cached = await self._render_cached(text, emotion, self.target_latency)
+            rendered += not cached
+        return rendered
+    
+    async def pin(self, text: str, emotion: Dict) -> str:
+        """
+        Render audio now and hold it in memory for the process lifetime
+        Returns the audio URL later served by ``prerendered``
+        """
+        key, audio, _ = await self._render_cached(text, emotion, self.target_latency)
+        self._pinned[key] = audio
+        return self._audio_url(key, emotion)
+    
+    def prerendered(self, text: str, emotion: Dict) -> Optional[str]:
+        """Audio URL of a pinned rendering, or None if it was never pinned"""
+        voice_style, prosody = self._voice(emotion)
+        key = cache_key(text, voice_style, prosody)
+        if key not in self._pinned:
+            return None
+        return self._audio_url(key, emotion)
+    
+    def _voice(self, emotion: Dict) -> Tuple[str, Dict]:
         # Select appropriate voice based on emotion
         emotion_type = emotion.get('primary', 'neutral')
-        voice_style = self.emotion_voices.get(emotion_type, 'calm')
+        return self.emotion_voices.get(emotion_type, 'calm'), self._adjust_prosody(emotion_type)
+    
+    def _audio_url(self, key: str, emotion: Dict) -> str:
+        voice_style, _ = self._voice(emotion)
+        if self.mode == "mock":
+            return f"mock://audio/{voice_style}/{key}.wav"
+        return f"https://api.elevenlabs.io/v1/audio/{key}.wav"
+    
+    async def _render_cached(
+        self,
+        text: str,
+        emotion: Dict,
+        latency: float
+    ) -> Tuple[str, Audio, bool]:
+        """
+        Return (key, audio, cached) for the rendering
+        Synthesizes and stores the audio on a cache miss
+        """
+        voice_style, prosody = self._voice(emotion)
+        key = cache_key(text, voice_style, prosody)
+        
+        audio = self.cache.get(key)
+        if audio is not None:
+            return key, audio, True
         
+        audio = await self._render(text, voice_style, prosody, latency)
+        self.cache.put(key, audio)
+        return key, audio, False
+    
+    async def _render(self, text: str, voice_style: str, prosody: Dict, latency: float) -> bytes:
         if self.mode == "mock":
             # Simulate processing time
-            await asyncio.sleep(self.target_latency / 1000)
-            
-            # Return mock audio URL
-            return f"mock://audio/{voice_style}/response.wav"
+            await asyncio.sleep(latency / 1000)
+            return f"MOCKWAV|{voice_style}|{sorted(prosody.items())}|{text}".encode('utf-8')
         
         else:  # live mode
-            # Real ElevenLabs API call would go here
-            await asyncio.sleep(self.target_latency / 1000)
-            return "https://api.elevenlabs.io/v1/audio/sample.wav"
+            if self.hedger is not None:
+                return await self.hedger.run(lambda: self._request(text, voice_style, prosody))
+            return await self._request(text, voice_style, prosody)
+    
+    async def _request(self, text: str, voice_style: str, prosody: Dict) -> bytes:
+        """One synthesis request"""
+        response = await self.pool.client('elevenlabs').post(
+            f'/text-to-speech/{self.voice_id}',
+            json={'text': text, 'style': voice_style, 'voice_settings': prosody}
+        )
+        response.raise_for_status()
+        return response.content
     
     def _adjust_prosody(self, emotion_type: str) -> Dict:
         """Adjust voice parameters based on emotion"""
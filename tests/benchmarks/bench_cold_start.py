@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Cold start benchmark
+Wall time of fresh-interpreter starts of the CLI and the pipeline import,
+checked against the stored baseline in cold_start_baseline.json
+
+Each time is the median of RUNS starts, minus the median start of a
+bare interpreter, and is stored as a multiple of that interpreter start,
+so the baseline carries over between machines of different speed. The
+mock turn's own simulated stage time, as reported in its result, is
+taken off as well, leaving the cost of starting up. Exits non-zero when
+a scenario is slower than its baseline by more than TOLERANCE and SLACK;
+--update-baseline rewrites the file from this run.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+SRC = os.path.join(ROOT, 'src')
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cold_start_baseline.json')
+
+RUNS = 7
+TOLERANCE = 0.5   # allowed growth over the baseline
+SLACK = 1.0       # allowance for runner noise, in interpreter starts
+
+INTERPRETER = [sys.executable, '-c', 'pass']
+SCENARIOS = {
+    'cli_help': [sys.executable, os.path.join(SRC, 'main.py'), '--help'],
+    'import_engine': [sys.executable, '-c',
+                      f"import sys; sys.path.insert(0, {SRC!r}); import pipeline.engine"],
+    'cli_mock_turn': [sys.executable, os.path.join(SRC, 'main.py'), '--json',
+                      '--text', '안녕하세요, 오늘 기분이 어떠세요?']
+}
+# Scenarios that print a turn result; its timings.total is not startup cost
+TURNS = {'cli_mock_turn'}
+
+
+def cold_start_ms(command, runs: int = RUNS, turn: bool = False) -> float:
+    """
+    Median wall time of ``runs`` fresh processes in milliseconds, less the
+    turn's reported total when ``turn`` is set
+    """
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run(command, check=True, stdout=subprocess.PIPE, cwd=ROOT)
+        elapsed = (time.perf_counter() - start) * 1000
+        if turn:
+            elapsed -= json.loads(result.stdout)['timings']['total']
+        samples.append(elapsed)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Write this run's times as the new baseline")
+    parser.add_argument("--runs", type=int, default=RUNS)
+    args = parser.parse_args()
+
+    interpreter = cold_start_ms(INTERPRETER, args.runs)
+    measured = {
+        name: round((cold_start_ms(command, args.runs, name in TURNS) - interpreter) / interpreter, 2)
+        for name, command in SCENARIOS.items()
+    }
+
+    if args.update_baseline:
+        with open(BASELINE, 'w') as f:
+            json.dump(measured, f, indent=2)
+            f.write("\n")
+        print(f"Baseline written to {BASELINE}")
+        return
+
+    with open(BASELINE) as f:
+        baseline = json.load(f)
+
+    print(f"🚀 Cold start over a bare interpreter, in interpreter starts "
+          f"({interpreter:.0f}ms each), median of {args.runs}")
+    print("| Scenario        | measured |  baseline |    limit |")
+    print("|-----------------|----------|-----------|----------|")
+    failed = []
+    for name, ratio in measured.items():
+        limit = baseline[name] * (1 + TOLERANCE) + SLACK
+        status = "✅" if ratio <= limit else "❌"
+        if ratio > limit:
+            failed.append(name)
+        print(f"| {name:<15} | {ratio:>7.2f}x | {baseline[name]:>8.2f}x | {limit:>7.2f}x | "
+              f"{status} ({ratio * interpreter:.0f}ms)")
+
+    if failed:
+        print(f"\nCold start regressed past the baseline: {', '.join(failed)}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
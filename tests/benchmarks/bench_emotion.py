@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Emotion lexicon benchmark
+Per-utterance cost of the legacy per-call tables against the shared
+compiled lexicon, and a check that the CLI and inference service return
+identical results
+"""
+import asyncio
+import importlib.util
+import json
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+from pipeline import LLMProcessor, get_lexicon
+
+SAMPLE_DATA = os.path.join(ROOT, 'data', 'kmh44k_sample.jsonl')
+ITERATIONS = 20
+
+
+def legacy_analyze(text: str) -> dict:
+    """What _analyze_emotion used to do: rebuild tables, one scan per keyword"""
+    emotion_keywords = {
+        'sadness': ['우울', '슬프', '힘들', '외로', '눈물'],
+        'anxiety': ['불안', '걱정', '두렵', '무서', '긴장'],
+        'stress': ['스트레스', '압박', '부담', '지치', '피곤'],
+        'anger': ['화나', '짜증', '분노', '억울', '미워'],
+        'joy': ['기쁘', '행복', '좋', '즐거', '신나']
+    }
+    detected, max_score = 'neutral', 0
+    for emotion, keywords in emotion_keywords.items():
+        score = sum(1 for keyword in keywords if keyword in text)
+        if score > max_score:
+            max_score, detected = score, emotion
+    cultural = {'한': 0.0, '정': 0.0, '눈치': 0.0}
+    if any(w in text for w in ['그리움', '서러움', '아쉬움', '후회']):
+        cultural['한'] = 0.7
+    if any(w in text for w in ['고마워', '보고싶', '사랑', '우리']):
+        cultural['정'] = 0.7
+    if any(w in text for w in ['미안', '부담', '실례', '죄송']):
+        cultural['눈치'] = 0.6
+    return {'primary': detected, 'confidence': min(max_score * 0.3 + 0.5, 1.0), 'cultural': cultural}
+
+
+def load_texts():
+    texts = []
+    with open(SAMPLE_DATA, encoding='utf-8') as f:
+        for line in f:
+            try:
+                texts.append(json.loads(line)['text'])
+            except ValueError:
+                continue  # sample file ends with a truncated record
+    return texts
+
+
+def per_utterance(fn, texts):
+    """Median cost per utterance in microseconds"""
+    samples = []
+    for _ in range(ITERATIONS):
+        start = time.perf_counter()
+        fn(texts)
+        samples.append((time.perf_counter() - start) * 1_000_000 / len(texts))
+    return statistics.median(samples)
+
+
+def load_service():
+    """Import the inference service, or None if its dependencies are missing"""
+    spec = importlib.util.spec_from_file_location(
+        'inference_main', os.path.join(ROOT, 'services', 'inference', 'main.py')
+    )
+    service = importlib.util.module_from_spec(spec)
+    try:
+        spec.loader.exec_module(service)
+    except ImportError as e:
+        print(f"⚠️  Inference service not importable here ({e.name}); skipping service path")
+        return None
+    return service
+
+
+def main():
+    texts = load_texts()
+    lexicon = get_lexicon()
+    llm = LLMProcessor(mode="mock")
+
+    print("🚀 Emotion analysis cost per utterance (µs)")
+    print("| Path                   |     median |")
+    print("|------------------------|------------|")
+    rows = [
+        ("legacy per-call tables", lambda batch: [legacy_analyze(t) for t in batch]),
+        ("lexicon.analyze", lambda batch: [lexicon.analyze(t) for t in batch]),
+        ("lexicon.analyze_many", lexicon.analyze_many),
+    ]
+    for name, fn in rows:
+        print(f"| {name:<22} | {per_utterance(fn, texts):>10.2f} |")
+
+    cli = [asyncio.run(llm._analyze_emotion(t)) for t in texts]
+    assert cli == [legacy_analyze(t) for t in texts]
+    print(f"\nCLI path matches legacy scoring on {len(texts)} utterances ✅")
+
+    service = load_service()
+    if service is not None:
+        assert [service.analyze_emotion(t) for t in texts] == cli
+        print(f"Inference service matches CLI on {len(texts)} utterances ✅")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Per-turn setup overhead benchmark
+Compares the legacy per-call setup (settings parse + stage construction)
+against the long-lived VoicePipeline
+"""
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'src'))
+
+from pipeline import (
+    ASRProcessor,
+    SafetyGuard,
+    LLMProcessor,
+    PostProcessor,
+    TTSProcessor,
+    VoicePipeline
+)
+from config.settings import load_settings
+
+ITERATIONS = 2000
+CONCURRENT_TURNS = 200
+SAMPLE_TEXT = "요즘 너무 힘들고 우울해요"
+
+
+def legacy_setup():
+    """What process_voice_pipeline used to do before every turn"""
+    settings = load_settings()
+    return (
+        settings,
+        ASRProcessor(mode="mock"),
+        SafetyGuard(mode="mock"),
+        LLMProcessor(mode="mock"),
+        PostProcessor(mode="mock"),
+        TTSProcessor(mode="mock"),
+    )
+
+
+def measure(fn, iterations: int = ITERATIONS):
+    """Return per-call latencies in microseconds"""
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1_000_000)
+    return samples
+
+
+def summarize(name: str, samples):
+    samples = sorted(samples)
+    p99 = samples[int(len(samples) * 0.99) - 1]
+    print(f"| {name:<22} | {statistics.mean(samples):>10.1f} | "
+          f"{statistics.median(samples):>10.1f} | {p99:>10.1f} |")
+
+
+async def concurrent_turns(pipeline: VoicePipeline):
+    """Run many turns concurrently on one shared pipeline"""
+    start = time.perf_counter()
+    results = await asyncio.gather(*(
+        pipeline.run_turn(SAMPLE_TEXT) for _ in range(CONCURRENT_TURNS)
+    ))
+    elapsed = time.perf_counter() - start
+    totals = [r['timings']['total'] for r in results]
+    return elapsed, totals
+
+
+def main():
+    settings = load_settings()
+    pipeline = VoicePipeline(settings, mode="mock")
+    asyncio.run(pipeline.warmup())
+    pipelines = {"mock": pipeline}
+
+    print("🚀 Per-turn setup overhead (µs)")
+    print("| Setup                  |       mean |     median |        p99 |")
+    print("|------------------------|------------|------------|------------|")
+    legacy = measure(legacy_setup)
+    shared = measure(lambda: pipelines["mock"])
+    summarize("legacy per-call setup", legacy)
+    summarize("shared VoicePipeline", shared)
+    print(f"\nSaved per turn: {statistics.mean(legacy) - statistics.mean(shared):.1f}µs")
+
+    elapsed, totals = asyncio.run(concurrent_turns(pipeline))
+    print(f"\n{CONCURRENT_TURNS} concurrent mock turns on one pipeline: "
+          f"{elapsed * 1000:.0f}ms wall, max turn {max(totals)}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+PostProcessor rewrite benchmark
+Compares the legacy per-pattern re.sub/str.replace passes against the
+single compiled scan over a large synthetic corpus, and on long runs
+of address characters where the legacy email pattern goes quadratic
+"""
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'src'))
+
+from pipeline import PostProcessor
+
+CORPUS_SIZE = 20000
+SENTENCE_COUNTS = [1, 10, 100]
+RUN_LENGTHS = [1000, 4000, 16000]
+FRAGMENTS = [
+    "요즘 많이 힘드셨겠어요.", "절대 혼자가 아니에요.", "반드시 나아질 거예요.",
+    "연락처 010-1234-5678로 주세요.", "메일 care.team@example.com 이에요.",
+    "주민번호 900101-1234567은 말하지 마세요.", "예약 번호는 202410170001 이에요.",
+    "그 생각은 틀렸어요.", "그러면 안돼요.", "천천히 숨을 쉬어볼까요?",
+]
+
+LEGACY_PII = [
+    (r'\d{3}-\d{4}-\d{4}', '[전화번호]'),
+    (r'\d{6}-\d{7}', '[주민번호]'),
+    (r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', '[이메일]'),
+    (r'\d{5,}', '[번호]'),
+]
+LEGACY_TONE = {'절대': '가능하면', '반드시': '되도록', '틀렸': '다르게 생각해볼 수 있', '안돼': '어려울 수 있어'}
+
+
+def legacy_rewrite(text: str) -> str:
+    """What _scrub_pii and _adjust_tone used to do: one pass per pattern"""
+    for pattern, replacement in LEGACY_PII:
+        text = re.sub(pattern, replacement, text)
+    for harsh, gentle in LEGACY_TONE.items():
+        text = text.replace(harsh, gentle)
+    return text
+
+
+def synthetic_corpus(sentences: int, seed: int = 7):
+    rng = random.Random(seed)
+    return [' '.join(rng.choice(FRAGMENTS) for _ in range(sentences))
+            for _ in range(CORPUS_SIZE // sentences)]
+
+
+def throughput(fn, corpus):
+    """Return characters rewritten per second (millions)"""
+    start = time.perf_counter()
+    for text in corpus:
+        fn(text)
+    elapsed = time.perf_counter() - start
+    return sum(len(text) for text in corpus) / elapsed / 1_000_000
+
+
+def time_once(fn, text: str) -> float:
+    start = time.perf_counter()
+    fn(text)
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    post = PostProcessor(mode="mock")
+
+    print("🚀 Rewrite throughput (M chars/sec)")
+    print("| Sentences/text |     legacy |   compiled |")
+    print("|----------------|------------|------------|")
+    for sentences in SENTENCE_COUNTS:
+        corpus = synthetic_corpus(sentences)
+        legacy = throughput(legacy_rewrite, corpus)
+        compiled = throughput(post._rewrite, corpus)
+        print(f"| {sentences:>14} | {legacy:>10.2f} | {compiled:>10.2f} |")
+
+    print("\n🚀 Long address-like run without '@' (ms per text)")
+    print("|  Length |     legacy |   compiled |")
+    print("|---------|------------|------------|")
+    for length in RUN_LENGTHS:
+        text = "x" * length
+        legacy = time_once(legacy_rewrite, text)
+        compiled = time_once(post._rewrite, text)
+        print(f"| {length:>7} | {legacy:>10.2f} | {compiled:>10.2f} |")
+
+    corpus = synthetic_corpus(10)
+    start = time.perf_counter()
+    post.process_many(corpus)
+    rate = len(corpus) / (time.perf_counter() - start)
+    print(f"\nprocess_many over {len(corpus)} responses: {rate:.0f} texts/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+SafetyGuard batch throughput benchmark
+Compares awaiting check() per utterance against one check_many() call
+over the KMH44K sample
+"""
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'src'))
+
+from pipeline import SafetyGuard
+
+SAMPLE_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'data', 'kmh44k_sample.jsonl')
+BATCH_SIZE = 5000
+SEQUENTIAL_SIZE = 50
+
+
+def load_texts():
+    texts = []
+    with open(SAMPLE_DATA, encoding='utf-8') as f:
+        for line in f:
+            try:
+                texts.append(json.loads(line)['text'])
+            except ValueError:
+                continue  # sample file ends with a truncated record
+    return texts
+
+
+def repeat(texts, count: int):
+    return [texts[i % len(texts)] for i in range(count)]
+
+
+async def sequential_checks(guard: SafetyGuard, texts):
+    for text in texts:
+        await guard.check(text)
+
+
+def main():
+    guard = SafetyGuard(mode="mock")
+    texts = load_texts()
+
+    sequential = repeat(texts, SEQUENTIAL_SIZE)
+    start = time.perf_counter()
+    asyncio.run(sequential_checks(guard, sequential))
+    sequential_rate = len(sequential) / (time.perf_counter() - start)
+
+    batch = repeat(texts, BATCH_SIZE)
+    start = time.perf_counter()
+    guard.check_many(batch)
+    batch_rate = len(batch) / (time.perf_counter() - start)
+
+    print("🚀 Safety scoring throughput (texts/sec)")
+    print("| Mode                |    texts |    texts/sec |")
+    print("|---------------------|----------|--------------|")
+    print(f"| await check()       | {len(sequential):>8} | {sequential_rate:>12.1f} |")
+    print(f"| check_many()        | {len(batch):>8} | {batch_rate:>12.1f} |")
+    print(f"\nSpeedup: {batch_rate / sequential_rate:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+SafetyGuard keyword scan benchmark
+Compares the legacy per-keyword substring loop against both matcher
+strategies as the keyword list grows from 30 to 10,000 entries: the
+substring scan and the single-pass automaton. Keyword counts are on
+top of the ~50 built-in ones.
+
+The two cross over at about 200 keywords in total (100-300 extra), which
+sets SUBSTRING_SCAN_LIMIT in pipeline/matcher.py. Both matcher columns
+feed all three layers and return hit offsets; the legacy column is only
+Layer 1's yes/no substring loop, so it is a floor rather than a peer.
+"""
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'src'))
+
+from pipeline import SafetyGuard
+from pipeline.matcher import KeywordMatcher
+
+ITERATIONS = 200
+LIST_SIZES = [30, 100, 300, 1000, 3000, 10000]
+SAMPLE_TEXT = "요즘 너무 힘들고 우울해요. 아무도 제 얘기를 들어주지 않아서 더 이상 못 하겠어요"
+SYLLABLES = "가나다라마바사아자차카타파하거너더러머버서어저처커터퍼허고노도로모보소오조초"
+
+
+def synthetic_keywords(count: int, seed: int = 7):
+    """Random 2-4 syllable keywords standing in for data/safety-triggers"""
+    rng = random.Random(seed)
+    return [''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+            for _ in range(count)]
+
+
+def legacy_scan(keywords, text: str) -> float:
+    """What _layer1_keywords used to do: one substring search per keyword"""
+    score = 0.0
+    for keyword in keywords:
+        if keyword in text:
+            score = max(score, 0.5)
+    return score
+
+
+def guard_keywords(guard: SafetyGuard):
+    """The literal and flexible keyword lists the guard compiles"""
+    keywords = [(keyword, ('keyword', level))
+                for level, words in guard.crisis_keywords.items() for keyword in words]
+    keywords += [(word, ('context', group))
+                 for group, words in guard.context_keywords.items() for word in words]
+    flexible = [(pattern, ('pattern', level))
+                for level, patterns in guard.crisis_patterns.items() for pattern in patterns]
+    flexible += [(token, ('sequence', token)) for token in guard._sequence_index]
+    return keywords, flexible
+
+
+def measure(fn, iterations: int = ITERATIONS):
+    """Return per-call latencies in microseconds"""
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1_000_000)
+    return statistics.median(samples)
+
+
+def main():
+    print("🚀 Keyword scan, median per transcript (µs)")
+    print("| Keywords |     legacy |  substring |  automaton |   build (ms) |")
+    print("|----------|------------|------------|------------|--------------|")
+    for size in LIST_SIZES:
+        keywords = synthetic_keywords(size)
+
+        start = time.perf_counter()
+        guard = SafetyGuard(extra_keywords={'medium': keywords})
+        build_ms = (time.perf_counter() - start) * 1000
+
+        all_keywords = [k for words in guard.crisis_keywords.values() for k in words]
+        legacy = measure(lambda: legacy_scan(all_keywords, SAMPLE_TEXT))
+        scans = {}
+        for name, limit in (('substring', float('inf')), ('automaton', 0)):
+            guard.matcher = KeywordMatcher(*guard_keywords(guard), substring_limit=limit)
+            scans[name] = measure(lambda: guard.scan(SAMPLE_TEXT))
+        print(f"| {size:>8} | {legacy:>10.1f} | {scans['substring']:>10.1f} | "
+              f"{scans['automaton']:>10.1f} | {build_ms:>12.1f} |")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Session store benchmark
+Resident memory of full session windows at 10k and 50k sessions, the
+store's own byte estimate against it, and the request payload saved by
+not resending the conversation history
+"""
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+sys.path.insert(0, os.path.join(ROOT, 'services', 'inference'))
+
+from session_store import SessionStore
+
+SESSION_COUNTS = [10_000, 50_000]
+WINDOW = 5
+
+USER = "요즘 회사 일이 너무 많아서 잠을 잘 못 자요. 계속 불안하고 지쳐요."
+ASSISTANT = "많이 지치셨겠어요. 잠을 못 자는 날이 이어지면 더 불안해질 수 있어요. 오늘 가장 힘들었던 순간이 언제였나요?"
+
+
+def fill(count: int):
+    """Store a full window for every session; returns (store, traced bytes, µs per append)"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    store = SessionStore(window=WINDOW, max_bytes=1 << 40)
+    start = time.perf_counter()
+    for turn in range(WINDOW):
+        for i in range(count):
+            # Distinct strings per turn, as arriving requests would carry
+            store.append(f"session-{i:06d}", f"{USER} {turn}", f"{ASSISTANT} {turn}")
+    elapsed = time.perf_counter() - start
+    traced = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return store, traced, elapsed * 1_000_000 / (count * WINDOW)
+
+
+def main():
+    print(f"🚀 Session store footprint ({WINDOW} exchanges per session)")
+    print("| Sessions | traced MB | estimate MB | bytes/session | append µs |")
+    print("|----------|-----------|-------------|---------------|-----------|")
+    for count in SESSION_COUNTS:
+        store, traced, per_append = fill(count)
+        print(f"| {count:>8,} | {traced / 1e6:>9.1f} | {store.bytes / 1e6:>11.1f} "
+              f"| {traced / count:>13,.0f} | {per_append:>9.2f} |")
+        del store
+
+    context = [{"user": USER, "assistant": ASSISTANT}] * WINDOW
+    with_history = json.dumps({"text": USER, "session_id": "session-000001", "context": context},
+                              ensure_ascii=False).encode('utf-8')
+    without = json.dumps({"text": USER, "session_id": "session-000001"},
+                         ensure_ascii=False).encode('utf-8')
+    print(f"\nRequest body: {len(with_history):,} bytes with history, "
+          f"{len(without):,} bytes with server-side context")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+Open-loop load generator for the Intune-Care pipeline
+Sends turns on a constant or Poisson arrival schedule at a target rate,
+or sweeps closed-loop concurrency, against the in-process mock pipeline,
+a local HTTP stub of the inference service, or a running service. Latency
+is measured from each request's intended send time, so a stalled server
+cannot hide its queueing delay (coordinated omission). Reports use the
+run_latency_test markdown format.
+
+    python loadgen.py --schedule poisson --rps 20 --duration 10
+    python loadgen.py --target stub --sweep 1,4,16,64
+    python loadgen.py --target http --url http://localhost:8001 --rps 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from typing import Dict, Iterator, List, Optional
+
+import httpx
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+from pipeline import VoicePipeline
+from pipeline.latency import LatencyHistogram
+from config.settings import load_settings
+from report import analyze_histogram, generate_report
+
+TEST_SAMPLES = [
+    "안녕하세요, 오늘 기분이 어떠세요?",
+    "요즘 너무 힘들고 우울해요",
+    "직장 스트레스로 잠을 못 자고 있어요",
+    "가족과의 관계가 어려워요",
+    "미래가 불안해요"
+]
+SESSIONS = 1000  # distinct session_ids the HTTP targets rotate through
+
+
+def arrivals(schedule: str, rate: float, duration: float, seed: int = 0) -> Iterator[float]:
+    """Intended send offsets in seconds from the start of the run"""
+    rng = random.Random(seed)
+    offset = 0.0
+    while offset < duration:
+        yield offset
+        offset += 1 / rate if schedule == "constant" else rng.expovariate(rate)
+
+
+def load_texts(path: Optional[str]) -> List[str]:
+    if not path:
+        return TEST_SAMPLES
+    texts = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                texts.append(json.loads(line)['text'])
+            except (ValueError, KeyError):
+                continue  # sample file ends with a truncated record
+    return texts
+
+
+class PipelineTarget:
+    """Turns run on an in-process mock VoicePipeline"""
+
+    def __init__(self):
+        self.pipeline = VoicePipeline(load_settings(), mode="mock")
+        self.label = "in-process pipeline (mock)"
+
+    async def start(self):
+        await self.pipeline.warmup()
+
+    async def send(self, text: str, n: int) -> bool:
+        await self.pipeline.run_turn(text)
+        return True
+
+    async def stop(self):
+        await self.pipeline.aclose()
+
+
+class HttpTarget:
+    """Turns posted to an inference service's /process endpoint"""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.label = url
+        self.client: Optional[httpx.AsyncClient] = None
+
+    async def start(self):
+        self.client = httpx.AsyncClient(
+            base_url=self.url,
+            timeout=30.0,
+            limits=httpx.Limits(max_connections=1000, max_keepalive_connections=1000)
+        )
+
+    async def send(self, text: str, n: int) -> bool:
+        response = await self.client.post(
+            '/process', json={'text': text, 'session_id': f"load-{n % SESSIONS}"}
+        )
+        return response.status_code == 200
+
+    async def stop(self):
+        await self.client.aclose()
+
+
+class StubService:
+    """
+    Local stand-in for the inference service
+    Serves POST /process over HTTP/1.1 keep-alive by running each turn on
+    the mock pipeline, so the HTTP path can be load-tested without keys
+    """
+
+    def __init__(self):
+        self.pipeline = VoicePipeline(load_settings(), mode="mock")
+
+    async def start(self) -> str:
+        await self.pipeline.warmup()
+        self.server = await asyncio.start_server(self._handle, '127.0.0.1', 0)
+        return f"http://127.0.0.1:{self.server.sockets[0].getsockname()[1]}"
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+        await self.pipeline.aclose()
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                length = 0
+                while True:
+                    header = await reader.readline()
+                    if header in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = header.decode('latin-1').partition(':')
+                    if name.strip().lower() == 'content-length':
+                        length = int(value)
+                body = json.loads(await reader.readexactly(length)) if length else {}
+
+                status, payload = "200 OK", {}
+                if not request_line.startswith(b"POST /process "):
+                    status = "404 Not Found"
+                else:
+                    result = await self.pipeline.run_turn(body.get('text', ''))
+                    payload = {
+                        'response': result['response'],
+                        'emotion': result['emotion'],
+                        'safety_score': 1.0 - result['safety']['risk_score'],
+                        'processing_time_ms': result['timings']['total']
+                    }
+                data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                writer.write(
+                    f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n\r\n".encode() + data
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+class RunResult:
+    """Histograms and counts for one load level"""
+
+    def __init__(self):
+        self.corrected = LatencyHistogram()  # from intended send time
+        self.service = LatencyHistogram()    # from actual send time
+        self.lag = LatencyHistogram()        # how late the generator sent
+        self.total = 0
+        self.failed = 0
+        self.wall = 0.0
+
+    @property
+    def throughput(self) -> float:
+        return (self.total - self.failed) / self.wall if self.wall else 0.0
+
+    def analysis(self) -> Dict:
+        analysis = analyze_histogram(self.corrected, self.total, self.failed)
+        analysis['throughput_rps'] = self.throughput
+        analysis['service_time_stats'] = self.service.summary()
+        analysis['generator_lag_ms'] = self.lag.summary()
+        return analysis
+
+
+async def run_open_loop(
+    target,
+    texts: List[str],
+    schedule: str,
+    rate: float,
+    duration: float,
+    seed: int = 0
+) -> RunResult:
+    """
+    Send on the arrival schedule regardless of outstanding responses
+    Memory is bounded by the requests in flight, not the run length
+    """
+    result = RunResult()
+    inflight = set()
+
+    async def fire(n: int, intended: float):
+        sent = time.perf_counter()
+        result.lag.record((sent - intended) * 1000)
+        try:
+            ok = await target.send(texts[n % len(texts)], n)
+        except Exception:
+            ok = False
+        done = time.perf_counter()
+        if ok:
+            result.corrected.record((done - intended) * 1000)
+            result.service.record((done - sent) * 1000)
+        else:
+            result.failed += 1
+
+    start = time.perf_counter()
+    for n, offset in enumerate(arrivals(schedule, rate, duration, seed)):
+        intended = start + offset
+        delay = intended - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        task = asyncio.create_task(fire(n, intended))
+        inflight.add(task)
+        task.add_done_callback(inflight.discard)
+        result.total += 1
+    await asyncio.gather(*inflight)
+    result.wall = time.perf_counter() - start
+    return result
+
+
+async def run_closed_loop(
+    target,
+    texts: List[str],
+    concurrency: int,
+    duration: float,
+    expected_interval_ms: float
+) -> RunResult:
+    """
+    ``concurrency`` clients each sending as soon as their last turn returns
+    Each client is corrected against the uncontended turn interval
+    """
+    result = RunResult()
+    deadline = time.perf_counter() + duration
+
+    async def client(worker: int):
+        n = worker
+        while time.perf_counter() < deadline:
+            sent = time.perf_counter()
+            try:
+                ok = await target.send(texts[n % len(texts)], n)
+            except Exception:
+                ok = False
+            ms = (time.perf_counter() - sent) * 1000
+            result.total += 1
+            if ok:
+                result.service.record(ms)
+                result.corrected.record_corrected(ms, expected_interval_ms)
+            else:
+                result.failed += 1
+            n += concurrency
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(worker) for worker in range(concurrency)))
+    result.wall = time.perf_counter() - start
+    return result
+
+
+def sweep_table(levels: Dict[int, RunResult]) -> str:
+    lines = [
+        "## Concurrency Sweep",
+        "| Concurrency | Throughput (rps) | P50 (ms) | P95 (ms) | P99 (ms) | P99 uncorrected (ms) | Success |",
+        "|-------------|------------------|----------|----------|----------|----------------------|---------|"
+    ]
+    for concurrency, result in levels.items():
+        success = (result.total - result.failed) / result.total * 100 if result.total else 0.0
+        lines.append(
+            f"| {concurrency} | {result.throughput:.1f} | {result.corrected.percentile(50):.0f} "
+            f"| {result.corrected.percentile(95):.0f} | {result.corrected.percentile(99):.0f} "
+            f"| {result.service.percentile(99):.0f} | {success:.1f}% |"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def profile_section(label: str, schedule: str, rate: float, duration: float, result: RunResult) -> str:
+    return f"""
+## Load Profile
+- Target: {label}
+- Schedule: {schedule} arrivals at {rate:g} rps for {duration:g}s (open loop)
+- Sent: {result.total} requests ({result.total / duration:.1f} rps offered)
+- Completed Throughput: {result.throughput:.1f} rps, including the final drain
+- P99 Service Time (uncorrected): {result.service.percentile(99):.0f}ms
+- Max Generator Lag: {result.lag.max or 0:.1f}ms
+"""
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Open-loop load generator")
+    parser.add_argument("--target", choices=["pipeline", "stub", "http"], default="pipeline",
+                        help="In-process mock pipeline, local HTTP stub, or a running service")
+    parser.add_argument("--url", default="http://localhost:8001",
+                        help="Inference service base URL for --target http")
+    parser.add_argument("--schedule", choices=["constant", "poisson"], default="poisson")
+    parser.add_argument("--rps", type=float, default=20.0, help="Target arrival rate")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per load level")
+    parser.add_argument("--sweep", help="Comma-separated closed-loop concurrency levels, e.g. 1,4,16")
+    parser.add_argument("--corpus", help="JSONL file of {'text': ...} records to send")
+    parser.add_argument("--seed", type=int, default=0, help="Poisson schedule seed")
+    parser.add_argument("--report", help="Write the markdown report here")
+    parser.add_argument("--json", help="Write the analysis JSON here")
+    args = parser.parse_args()
+    if args.rps <= 0:
+        parser.error("--rps must be positive")
+
+    texts = load_texts(args.corpus)
+    stub = None
+    if args.target == "pipeline":
+        target = PipelineTarget()
+    else:
+        url = args.url
+        if args.target == "stub":
+            stub = StubService()
+            url = await stub.start()
+        target = HttpTarget(url)
+        if stub:
+            target.label = f"local inference stub ({url})"
+    await target.start()
+
+    try:
+        if args.sweep:
+            levels = [int(level) for level in args.sweep.split(',')]
+            print(f"🚀 Concurrency sweep {levels} against {target.label}", file=sys.stderr)
+            baseline = await run_closed_loop(target, texts, 1, min(args.duration, 2.0), 0)
+            interval = baseline.service.percentile(50)
+            results = {}
+            for concurrency in levels:
+                results[concurrency] = await run_closed_loop(
+                    target, texts, concurrency, args.duration, interval
+                )
+            busiest = results[levels[-1]]
+            report = generate_report(busiest.analysis()) + "\n" + sweep_table(results)
+            analysis = {str(level): result.analysis() for level, result in results.items()}
+            analysis['expected_interval_ms'] = interval
+        else:
+            print(f"🚀 {args.schedule} arrivals at {args.rps:g} rps for {args.duration:g}s "
+                  f"against {target.label}", file=sys.stderr)
+            result = await run_open_loop(
+                target, texts, args.schedule, args.rps, args.duration, args.seed
+            )
+            analysis = result.analysis()
+            report = generate_report(analysis) + profile_section(
+                target.label, args.schedule, args.rps, args.duration, result
+            )
+    finally:
+        await target.stop()
+        if stub:
+            await stub.stop()
+
+    print(report)
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            f.write(report)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(analysis, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
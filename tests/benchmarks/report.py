@@ -0,0 +1,61 @@
+"""
+Markdown latency report shared by the benchmark tools
+"""
+from datetime import datetime
+
+
+def analyze_histogram(latency, total_requests: int, failed_requests: int) -> dict:
+    """Build the ``analyze_results`` structure from a LatencyHistogram"""
+    successful = total_requests - failed_requests
+    analysis = {
+        "timestamp": datetime.now().isoformat(),
+        "total_requests": total_requests,
+        "successful_requests": successful,
+        "failed_requests": failed_requests,
+        "success_rate": successful / total_requests * 100 if total_requests else 0.0,
+        "latency_stats": {
+            "min": latency.min or 0.0,
+            "max": latency.max or 0.0,
+            "mean": latency.mean,
+            "median": latency.percentile(50),
+            "stdev": latency.stdev,
+            "p50": latency.percentile(50),
+            "p75": latency.percentile(75),
+            "p90": latency.percentile(90),
+            "p95": latency.percentile(95),
+            "p99": latency.percentile(99)
+        }
+    }
+    analysis["meets_target"] = analysis["latency_stats"]["p95"] < 700
+    return analysis
+
+
+def generate_report(analysis):
+    """Generate a markdown report"""
+    report = f"""# Latency Benchmark Report
+
+Generated: {analysis['timestamp']}
+
+## Summary
+- Total Requests: {analysis['total_requests']}
+- Success Rate: {analysis['success_rate']:.1f}%
+- **P95 Latency: {analysis['latency_stats']['p95']:.0f}ms**
+- Target Met: {'✅ Yes' if analysis['meets_target'] else '❌ No'}
+
+## Latency Distribution
+| Percentile | Latency (ms) | Target | Status |
+|------------|--------------|--------|--------|
+| P50 | {analysis['latency_stats']['p50']:.0f} | <500 | {'✅' if analysis['latency_stats']['p50'] < 500 else '❌'} |
+| P75 | {analysis['latency_stats']['p75']:.0f} | <600 | {'✅' if analysis['latency_stats']['p75'] < 600 else '❌'} |
+| P90 | {analysis['latency_stats']['p90']:.0f} | <700 | {'✅' if analysis['latency_stats']['p90'] < 700 else '❌'} |
+| P95 | {analysis['latency_stats']['p95']:.0f} | <700 | {'✅' if analysis['latency_stats']['p95'] < 700 else '❌'} |
+| P99 | {analysis['latency_stats']['p99']:.0f} | <900 | {'✅' if analysis['latency_stats']['p99'] < 900 else '❌'} |
+
+## Statistics
+- Min: {analysis['latency_stats']['min']:.0f}ms
+- Max: {analysis['latency_stats']['max']:.0f}ms
+- Mean: {analysis['latency_stats']['mean']:.0f}ms
+- Median: {analysis['latency_stats']['median']:.0f}ms
+- StdDev: {analysis['latency_stats']['stdev']:.0f}ms
+"""
+    return report
@@ -10,6 +10,8 @@ from datetime import datetime
 import aiohttp
 import numpy as np
 
+from report import generate_report
+
 # Test configuration
 API_URL = "http://localhost:8080/api/v1/voice"
 WS_URL = "ws://localhost:8080/ws"
@@ -100,36 +102,6 @@ def analyze_results(results):
     
     return analysis
 
-def generate_report(analysis):
-    """Generate a markdown report"""
-    report = f"""# Latency Benchmark Report
-
-Generated: {analysis['timestamp']}
-
-## Summary
-- Total Requests: {analysis['total_requests']}
-- Success Rate: {analysis['success_rate']:.1f}%
-- **P95 Latency: {analysis['latency_stats']['p95']:.0f}ms**
-- Target Met: {'✅ Yes' if analysis['meets_target'] else '❌ No'}
-
-## Latency Distribution
-| Percentile | Latency (ms) | Target | Status |
-|------------|--------------|--------|--------|
-| P50 | {analysis['latency_stats']['p50']:.0f} | <500 | {'✅' if analysis['latency_stats']['p50'] < 500 else '❌'} |
-| P75 | {analysis['latency_stats']['p75']:.0f} | <600 | {'✅' if analysis['latency_stats']['p75'] < 600 else '❌'} |
-| P90 | {analysis['latency_stats']['p90']:.0f} | <700 | {'✅' if analysis['latency_stats']['p90'] < 700 else '❌'} |
-| P95 | {analysis['latency_stats']['p95']:.0f} | <700 | {'✅' if analysis['latency_stats']['p95'] < 700 else '❌'} |
-| P99 | {analysis['latency_stats']['p99']:.0f} | <900 | {'✅' if analysis['latency_stats']['p99'] < 900 else '❌'} |
-
-## Statistics
-- Min: {analysis['latency_stats']['min']:.0f}ms
-- Max: {analysis['latency_stats']['max']:.0f}ms
-- Mean: {analysis['latency_stats']['mean']:.0f}ms
-- Median: {analysis['latency_stats']['median']:.0f}ms
-- StdDev: {analysis['latency_stats']['stdev']:.0f}ms
-"""
-    return report
-
 async def main():
     """Main benchmark execution"""
     print("🚀 Starting Intune-Care Latency Benchmark")
@@ -0,0 +1,187 @@
+"""
+Tests for inference service admission control
+"""
+import pytest
+import asyncio
+from prometheus_client import CollectorRegistry
+from src.pipeline.latency import LatencyHistogram
+from src.pipeline.metrics import PipelineMetrics
+from services.inference.admission import AdmissionController, Overloaded, retry_after_header
+
+SERVICE = 0.02  # seconds a request holds its slot
+
+async def settle():
+    """Let queued waiters run up to their next await"""
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+class TestAdmissionController:
+    """Test the in-flight bound, queue order and shedding"""
+
+    @pytest.mark.asyncio
+    async def test_inflight_is_bounded(self):
+        admission = AdmissionController(max_inflight=2, queue_timeout=1.0)
+        running, peak = 0, 0
+
+        async def request():
+            nonlocal running, peak
+            async with admission.admit():
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(SERVICE)
+                running -= 1
+
+        await asyncio.gather(*(request() for _ in range(10)))
+        assert peak == 2
+        assert admission.inflight == 0
+        assert admission.stats()['admitted'] == 10
+
+    @pytest.mark.asyncio
+    async def test_critical_requests_jump_the_queue(self):
+        admission = AdmissionController(max_inflight=1, queue_timeout=1.0)
+        held = await admission.acquire()
+        order = []
+
+        async def request(name, critical=False):
+            async with admission.admit(critical):
+                order.append(name)
+
+        waiters = [asyncio.create_task(request('normal-1')),
+                   asyncio.create_task(request('normal-2'))]
+        await settle()
+        waiters.append(asyncio.create_task(request('crisis', critical=True)))
+        await settle()
+        assert admission.depth() == 3
+        admission.release(held)
+        await asyncio.gather(*waiters)
+        assert order == ['crisis', 'normal-1', 'normal-2']
+
+    @pytest.mark.asyncio
+    async def test_waiting_past_the_budget_is_shed(self):
+        admission = AdmissionController(max_inflight=1, queue_timeout=0.05)
+        await admission.acquire()
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        with pytest.raises(Overloaded) as shed:
+            await admission.acquire()
+        assert 0.05 <= loop.time() - start < 0.2
+        assert shed.value.reason == 'queue_timeout'
+        assert shed.value.retry_after >= 0.05
+        assert admission.depth() == 0
+
+    @pytest.mark.asyncio
+    async def test_long_expected_wait_is_shed_without_queueing(self):
+        admission = AdmissionController(max_inflight=1, queue_timeout=0.05)
+        admission.service_time = 0.2
+        await admission.acquire()
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        with pytest.raises(Overloaded) as shed:
+            await admission.acquire()
+        assert loop.time() - start < 0.01
+        assert shed.value.reason == 'expected_wait'
+        assert shed.value.retry_after == pytest.approx(0.2)
+        assert retry_after_header(shed.value) == '1'
+
+    @pytest.mark.asyncio
+    async def test_full_queue_sheds_normal_but_not_crisis(self):
+        admission = AdmissionController(max_inflight=1, max_queue=1, queue_timeout=1.0)
+        held = await admission.acquire()
+        queued = asyncio.create_task(admission.acquire())
+        await settle()
+        with pytest.raises(Overloaded) as shed:
+            await admission.acquire()
+        assert shed.value.reason == 'queue_full'
+        crisis = asyncio.create_task(admission.acquire(critical=True))
+        await settle()
+        assert admission.depth() == 2
+        admission.release(held)
+        await crisis
+        assert not queued.done()
+        admission.release()
+        await queued
+        assert admission.inflight == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_leak_a_slot(self):
+        admission = AdmissionController(max_inflight=1, queue_timeout=1.0)
+        held = await admission.acquire()
+        waiter = asyncio.create_task(admission.acquire())
+        await settle()
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        admission.release(held)
+        assert (admission.inflight, admission.depth()) == (0, 0)
+        await admission.acquire()
+        assert admission.inflight == 1
+
+    @pytest.mark.asyncio
+    async def test_service_time_tracks_slot_hold_time(self):
+        now = [0.0]
+        admission = AdmissionController(clock=lambda: now[0])
+        for _ in range(50):
+            granted_at = await admission.acquire()
+            now[0] += 0.1
+            admission.release(granted_at)
+        assert admission.service_time == pytest.approx(0.1, rel=0.01)
+        assert admission.expected_wait(ahead=63) == pytest.approx(0.2, rel=0.01)
+
+    @pytest.mark.asyncio
+    async def test_crisis_waits_stay_short_under_a_burst(self):
+        """Test a burst at 4x capacity: crises keep short waits, the rest are shed"""
+        admission = AdmissionController(max_inflight=4, queue_timeout=0.1)
+        waits = {'critical': LatencyHistogram(), 'normal': LatencyHistogram()}
+        shed = {'critical': 0, 'normal': 0}
+        loop = asyncio.get_running_loop()
+
+        async def request(n):
+            priority = 'critical' if n % 20 == 0 else 'normal'
+            start = loop.time()
+            try:
+                async with admission.admit(priority == 'critical'):
+                    waits[priority].record((loop.time() - start) * 1000)
+                    await asyncio.sleep(SERVICE)
+            except Overloaded:
+                shed[priority] += 1
+
+        async def arrivals():
+            for n in range(400):
+                yield asyncio.create_task(request(n))
+                await asyncio.sleep(SERVICE / 16)
+
+        await asyncio.gather(*[task async for task in arrivals()])
+        assert shed['critical'] == 0
+        assert shed['normal'] > 0
+        assert waits['critical'].percentile(99) < SERVICE * 1000 * 2
+        assert waits['normal'].percentile(99) <= 100 + 20
+
+class TestAdmissionMetrics:
+    """Test queue depth and queue wait exports"""
+
+    @pytest.mark.asyncio
+    async def test_depth_wait_and_shed_are_exported(self):
+        registry = CollectorRegistry()
+        admission = AdmissionController(
+            max_inflight=1, queue_timeout=0.05, metrics=PipelineMetrics(registry=registry)
+        )
+        held = await admission.acquire()
+        crisis = asyncio.create_task(admission.acquire(critical=True))
+        await settle()
+        assert registry.get_sample_value(
+            'intune_admission_queue_depth', {'priority': 'critical'}) == 1
+        assert registry.get_sample_value('intune_admission_inflight') == 1
+
+        await asyncio.sleep(0.01)
+        admission.release(held)
+        await crisis
+        with pytest.raises(Overloaded):
+            await admission.acquire()
+
+        assert registry.get_sample_value(
+            'intune_admission_queue_depth', {'priority': 'critical'}) == 0
+        assert registry.get_sample_value(
+            'intune_admission_queue_wait_seconds_count', {'priority': 'normal'}) == 1
+        assert registry.get_sample_value(
+            'intune_admission_queue_wait_seconds_sum', {'priority': 'critical'}) >= 0.01
+        assert registry.get_sample_value(
+            'intune_admission_shed_total', {'priority': 'normal', 'reason': 'queue_timeout'}) == 1
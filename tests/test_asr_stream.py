@@ -0,0 +1,149 @@
+"""
+Tests for streaming ASR with partial transcripts
+"""
+import pytest
+import asyncio
+import time
+from src.pipeline import ASRProcessor, TranscriptFanout, VoicePipeline
+from src.config.settings import load_settings
+
+async def chunks(*parts):
+    for part in parts:
+        yield part
+
+class TestStreamingASR:
+    """Test partial and final transcript events"""
+    
+    @pytest.mark.asyncio
+    async def test_partials_extend_with_stable_offsets(self):
+        asr = ASRProcessor(words_per_second=0)
+        events = [e async for e in asr.process_stream("요즘 너무 불안해서 잠을 못 자요")]
+        
+        assert [e.is_final for e in events] == [False] * 5 + [True]
+        final = events[-1]
+        assert final.text == "요즘 너무 불안해서 잠을 못 자요"
+        assert [w.text for w in final.words] == final.text.split()
+        for earlier, later in zip(events, events[1:]):
+            assert later.text.startswith(earlier.text)
+            assert later.words[:len(earlier.words)] == earlier.words
+        for word in final.words:
+            assert final.text[word.start:word.end] == word.text
+    
+    @pytest.mark.asyncio
+    async def test_words_split_across_frames(self):
+        asr = ASRProcessor()
+        events = [e async for e in asr.process_stream(chunks("죽 ", "고 싶", "어요 ", b"\xec\xa0\x95\xeb\xa7\x90"))]
+        assert [[w.text for w in e.words] for e in events] == [
+            ["죽"], ["죽", "고"], ["죽", "고", "싶어요"], ["죽", "고", "싶어요", "정말"]
+        ]
+        assert events[-1].is_final
+    
+    @pytest.mark.asyncio
+    async def test_mock_replay_rate(self):
+        asr = ASRProcessor(words_per_second=50)
+        start = time.perf_counter()
+        events = [e async for e in asr.process_stream("하나 둘 셋 넷 다섯")]
+        assert time.perf_counter() - start >= 5 / 50
+        assert events[-1].text == "하나 둘 셋 넷 다섯"
+    
+    @pytest.mark.asyncio
+    async def test_subscribers_receive_every_partial(self):
+        asr = ASRProcessor(words_per_second=0)
+        fanout = TranscriptFanout(asr.process_stream("오늘 너무 힘들어요"))
+        subscribers = [fanout.subscribe(), fanout.subscribe()]
+        
+        async def collect(subscriber):
+            return [e async for e in subscriber]
+        
+        final, *received = await asyncio.gather(fanout.run(), *(collect(s) for s in subscribers))
+        assert final.is_final and final.text == "오늘 너무 힘들어요"
+        assert received[0] == received[1]
+        assert received[0][-1] == final
+        assert len(received[0]) == 3
+    
+    def test_rate_from_settings(self):
+        settings = load_settings()
+        settings['asr_stream'] = {'mock_words_per_second': 7.5}
+        assert VoicePipeline(settings, mode="mock").asr.words_per_second == 7.5
+    
+    @pytest.mark.asyncio
+    async def test_multibyte_characters_split_across_frames(self):
+        data = "죽고 싶어 정말 ".encode('utf-8')
+        frames = [data[i:i + 4] for i in range(0, len(data), 4)]
+        events = [e async for e in ASRProcessor().process_stream(chunks(*frames))]
+        assert [w.text for w in events[-1].words] == ["죽고", "싶어", "정말"]
+        assert events[-1].text == "죽고 싶어 정말"
+        assert [e.text for e in events if not e.is_final] == ["죽고", "죽고 싶어", "죽고 싶어 정말"]
+
+class TestEngineStreaming:
+    """Test turns that run on streaming ASR"""
+    
+    @pytest.mark.asyncio
+    async def test_frames_are_transcribed_as_they_arrive(self):
+        pipeline = VoicePipeline(load_settings(), mode="mock")
+        result = await pipeline.run_turn(chunks("요즘 ", "너무 불", "안해요"))
+        assert result['transcript'] == "요즘 너무 불안해요"
+        assert result['input'] == result['transcript']
+        assert result['timings']['asr_partials'] == 2
+        assert result['emotion']['primary'] == 'anxiety'
+    
+    @pytest.mark.asyncio
+    async def test_speaking_time_is_outside_the_deadline(self):
+        """Test a turn spoken for longer than the budget still meets it"""
+        pipeline = VoicePipeline(load_settings(), mode="mock")
+        assert pipeline.enforce_deadlines
+        generate = pipeline.llm.generate
+        calls = []
+        async def counted(text, safety_result):
+            calls.append(text)
+            return await generate(text, safety_result)
+        pipeline.llm.generate = counted
+        
+        async def speaker():
+            for part in ("요즘 ", "회사 일이 ", "너무 많아서 ", "잠을 ", "못 자요"):
+                await asyncio.sleep(0.2)
+                yield part
+        
+        result = await pipeline.run_turn(speaker())
+        assert result['timings']['total'] > 1000
+        assert 'overruns' not in result['timings']
+        assert result['timings'].get('fallbacks', {}) == {}
+        assert calls == ["요즘 회사 일이 너무 많아서 잠을 못 자요"]
+        assert result['audio_url'] is not None
+    
+    @pytest.mark.asyncio
+    async def test_text_turns_stream_when_enabled(self):
+        settings = load_settings()
+        settings['asr_stream'] = {'enabled': True, 'mock_words_per_second': 0}
+        pipeline = VoicePipeline(settings, mode="mock")
+        result = await pipeline.stream_turn("오늘 너무 힘들어요").collect()
+        assert result['input'] == result['transcript'] == "오늘 너무 힘들어요"
+        assert result['timings']['asr_partials'] == 2
+    
+    @pytest.mark.asyncio
+    async def test_crisis_ends_turn_mid_utterance(self):
+        pipeline = VoicePipeline(load_settings(), mode="mock")
+        pipeline.llm.generate = None  # never reached
+        spoken = []
+        
+        async def speaker():
+            for part in ("너무 힘들어서 ", "죽고 싶", "어요 ", "정말로 ", "이제는 "):
+                spoken.append(part)
+                yield part
+        
+        result = await pipeline.run_turn(speaker())
+        assert result['safety']['risk_level'] == 'critical'
+        assert result['timings']['partial_crisis']
+        assert result['transcript'] == "너무 힘들어서 죽고"
+        assert len(spoken) == 2  # "죽고" completed with the second frame
+        assert '혼자가 아닙니다' in result['response']
+        assert result['timings']['tts_prerendered']
+    
+    @pytest.mark.asyncio
+    async def test_streamed_safety_matches_full_check(self):
+        pipeline = VoicePipeline(load_settings(), mode="mock")
+        text = "아무도 제 얘기를 안 들어줘서 너무 우울해요"
+        result = await pipeline.stream_turn(chunks(*(word + " " for word in text.split()))).collect()
+        assert 'partial_crisis' not in result['timings']
+        assert result['transcript'] == text
+        assert result['safety'] == await pipeline.safety.check(text)
@@ -0,0 +1,121 @@
+"""
+Tests for the CLI batch mode and latency histogram
+"""
+import pytest
+import json
+import os
+import random
+import subprocess
+from src.pipeline.latency import LatencyHistogram
+
+SAMPLE_DATA = "data/kmh44k_sample.jsonl"
+
+class TestLatencyHistogram:
+    """Test constant-memory percentiles"""
+    
+    def test_percentiles_within_resolution(self):
+        rng = random.Random(7)
+        samples = sorted(rng.expovariate(1 / 300) for _ in range(20000))
+        histogram = LatencyHistogram()
+        for ms in samples:
+            histogram.record(ms)
+        for p in (50, 90, 99):
+            exact = samples[int(p / 100 * len(samples)) - 1]
+            assert histogram.percentile(p) == pytest.approx(exact, rel=0.02)
+        assert histogram.percentile(100) == samples[-1]
+    
+    def test_memory_bounded_by_buckets(self):
+        histogram = LatencyHistogram()
+        for i in range(100000):
+            histogram.record(400 + i % 300)
+        assert len(histogram._buckets) < 300
+        assert histogram.count == 100000
+    
+    def test_merge_matches_single_histogram(self):
+        combined, left, right = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+        for i in range(1000):
+            combined.record(i * 1.5)
+            (left if i % 2 else right).record(i * 1.5)
+        left.merge(right)
+        assert left.summary() == combined.summary()
+    
+    def test_corrected_fills_in_missed_samples(self):
+        histogram = LatencyHistogram()
+        histogram.record_corrected(1000, expected_interval_ms=100)
+        assert histogram.count == 10
+        assert histogram.min == 100
+        uncorrected = LatencyHistogram()
+        uncorrected.record_corrected(50, expected_interval_ms=100)
+        assert uncorrected.count == 1
+    
+    def test_stdev(self):
+        histogram = LatencyHistogram()
+        for ms in (2, 4, 4, 4, 5, 5, 7, 9):
+            histogram.record(ms)
+        assert histogram.stdev == pytest.approx(2.138, rel=1e-3)
+    
+    def test_empty_summary(self):
+        assert LatencyHistogram().summary()['p99'] == 0.0
+
+class TestBatchMode:
+    """Test --batch over the sample corpus"""
+    
+    def test_batch_writes_one_row_per_record(self, tmp_path):
+        output = tmp_path / "results.jsonl"
+        result = subprocess.run(
+            ["python3", "src/main.py", "--batch", SAMPLE_DATA, "--concurrency", "4",
+             "--output", str(output), "--json"],
+            capture_output=True,
+            text=True
+        )
+        assert result.returncode == 0
+        
+        rows = [json.loads(line) for line in output.read_text().splitlines()]
+        records = [line for line in open(SAMPLE_DATA, encoding="utf-8") if line.strip()]
+        assert sorted(row['line'] for row in rows) == list(range(1, len(records) + 1))
+        
+        summary = json.loads(result.stderr.strip().splitlines()[-1])
+        errors = [row for row in rows if 'error' in row]
+        assert summary['errors'] == len(errors) == 1  # sample ends with a truncated record
+        assert summary['turns'] == len(rows) - 1
+        assert summary['latency_ms']['count'] == summary['turns']
+        assert all(row['timings']['total'] < 700 for row in rows if 'error' not in row)
+    
+    def test_batch_reads_stdin(self):
+        lines = [json.dumps({"text": text}, ensure_ascii=False)
+                 for text in ["안녕하세요", "요즘 불안해요"]]
+        result = subprocess.run(
+            ["python3", "src/main.py", "--batch", "-", "--json"],
+            input="\n".join(lines) + "\n",
+            capture_output=True,
+            text=True
+        )
+        assert result.returncode == 0
+        rows = [json.loads(line) for line in result.stdout.splitlines()]
+        assert sorted(row['input'] for row in rows) == ["안녕하세요", "요즘 불안해요"]
+    
+    @pytest.mark.skipif(not os.path.exists("/dev/full"), reason="needs /dev/full")
+    def test_failing_output_ends_the_run(self, tmp_path):
+        """Test workers dying on write fail the run instead of stalling it"""
+        corpus = tmp_path / "corpus.jsonl"
+        corpus.write_text("".join(json.dumps({"text": "안녕하세요"}, ensure_ascii=False) + "\n"
+                                  for _ in range(200)), encoding="utf-8")
+        result = subprocess.run(
+            ["python3", "src/main.py", "--batch", str(corpus), "--concurrency", "4",
+             "--output", "/dev/full", "--json"],
+            capture_output=True,
+            text=True,
+            timeout=60
+        )
+        assert result.returncode == 1
+        assert "No space left" in result.stdout
+    
+    def test_missing_corpus_fails_before_running(self, tmp_path):
+        result = subprocess.run(
+            ["python3", "src/main.py", "--batch", str(tmp_path / "missing.jsonl"), "--json"],
+            capture_output=True,
+            text=True,
+            timeout=60
+        )
+        assert result.returncode == 1
+        assert "No such file" in result.stdout
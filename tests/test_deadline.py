@@ -0,0 +1,222 @@
+"""
+Tests for turn deadlines and per-stage fallbacks
+"""
+import pytest
+import asyncio
+from src.pipeline import Deadline, VoicePipeline
+from src.config.settings import load_settings
+
+STALL = 5.0  # seconds; far past any stage cutoff
+
+async def stall(*args, **kwargs):
+    await asyncio.sleep(STALL)
+
+class TestDeadline:
+    """Test per-stage cutoffs carved from the turn budget"""
+
+    BUDGET = {'asr': 90, 'safety': 50, 'llm': 280, 'postprocess': 30,
+              'tts': 180, 'total_target': 700}
+
+    def test_cutoffs_share_slack_by_budget(self):
+        now = [0.0]
+        deadline = Deadline(self.BUDGET, clock=lambda: now[0])
+        assert deadline.remaining('asr') == pytest.approx(0.1)
+        assert deadline.remaining('safety') == pytest.approx(0.7 * 140 / 630)
+        assert deadline.remaining('llm') == pytest.approx(0.7 * 420 / 630)
+        assert deadline.remaining('postprocess') == pytest.approx(0.5)
+        assert deadline.remaining('tts') == pytest.approx(0.7)
+        assert deadline.remaining() == pytest.approx(0.7)
+
+    def test_remaining_never_negative(self):
+        now = [0.0]
+        deadline = Deadline(self.BUDGET, clock=lambda: now[0])
+        now[0] = 0.3
+        assert deadline.remaining('asr') == 0.0
+        assert deadline.remaining('postprocess') == pytest.approx(0.2)
+        assert deadline.remaining() == pytest.approx(0.4)
+
+class TestStageFallbacks:
+    """Test that overrunning stages fall back within the 700ms target"""
+
+    @pytest.fixture
+    def pipeline(self, tmp_path):
+        # A disk tier makes warmup pin the curated fallback audio
+        settings = load_settings()
+        settings['tts_cache'] = dict(settings['tts_cache'], disk_dir=str(tmp_path))
+        return VoicePipeline(settings, mode="mock")
+
+    @pytest.mark.asyncio
+    async def test_on_budget_turn_has_no_fallbacks(self, pipeline):
+        result = await pipeline.run_turn("요즘 너무 우울해요")
+        assert 'overruns' not in result['timings']
+        assert 'fallbacks' not in result['timings']
+
+    @pytest.mark.asyncio
+    async def test_slow_llm_falls_back_to_curated_reply(self, pipeline):
+        await pipeline.warmup()
+        pipeline.llm.generate = stall
+        result = await pipeline.run_turn("요즘 불안해요")
+        timings = result['timings']
+        assert timings['fallbacks'] == {'llm': 'curated_reply'}
+        assert timings['overruns'] == ['llm']
+        assert result['response'] == pipeline._fallback_reply({'primary': 'anxiety'})
+        assert result['fallback_stage'] == 'llm'
+        assert result['emotion']['primary'] == 'anxiety'
+        assert timings['tts_prerendered'] is True
+        assert timings['total'] < 700
+
+    @pytest.mark.asyncio
+    async def test_slow_tts_falls_back_to_pinned_audio(self, pipeline):
+        await pipeline.warmup()
+        pipeline.tts.synthesize = stall
+        result = await pipeline.run_turn("스트레스를 받고 있어요")
+        assert result['timings']['fallbacks'] == {'tts': 'cached_audio'}
+        reply, audio_url = pipeline._fallback_audio(result['emotion'])
+        assert (result['response'], result['audio_url']) == (reply, audio_url)
+        assert audio_url is not None
+        assert result['fallback_stage'] == 'tts'
+        assert result['timings']['total'] < 750
+    
+    @pytest.mark.asyncio
+    async def test_streamed_turn_runs_every_stage_on_budget(self, pipeline):
+        """Test a spoken turn checked on its partials leaves no stage overrun"""
+        await pipeline.warmup()
+        
+        async def speaker():
+            for part in ("요즘 ", "너무 ", "불안해서 ", "잠이 ", "안 와요"):
+                await asyncio.sleep(0.2)
+                yield part
+        
+        result = await pipeline.run_turn(speaker())
+        assert result['timings']['asr_partials']
+        assert 'overruns' not in result['timings']
+        assert 'fallbacks' not in result['timings']
+        assert result['safety']['risk_level'] != 'critical'
+        assert result['emotion']['primary'] == 'anxiety'
+        
+        streamed = await pipeline.stream_turn(speaker()).collect()
+        assert 'overruns' not in streamed['timings']
+        assert streamed['audio_segments']
+    
+    @pytest.mark.asyncio
+    async def test_on_budget_turn_has_no_fallback_stage(self, pipeline):
+        result = await pipeline.run_turn("안녕하세요")
+        assert result['fallback_stage'] is None
+
+    @pytest.mark.asyncio
+    async def test_slow_safety_still_escalates(self, pipeline):
+        """Test an overrunning safety check is replaced, never skipped"""
+        await pipeline.warmup()
+        pipeline.safety.check = stall
+        result = await pipeline.run_turn("죽고 싶어요")
+        assert result['timings']['fallbacks'] == {'safety': 'sync_scan'}
+        assert result['safety']['risk_level'] == 'critical'
+        assert result['response'] == result['safety']['emergency_response']
+
+    @pytest.mark.asyncio
+    async def test_slow_postprocess_still_scrubs_pii(self, pipeline):
+        await pipeline.warmup()
+        async def generate(text, safety_result):
+            return "연락처는 010-1234-5678이에요.", {'primary': 'neutral'}
+        pipeline.llm.generate = generate
+        pipeline.post.process = stall
+        result = await pipeline.run_turn("안녕하세요")
+        assert result['timings']['fallbacks'] == {'postprocess': 'sync_clean'}
+        assert '010-1234-5678' not in result['response']
+
+    @pytest.mark.asyncio
+    async def test_asr_overrun_recorded_without_fallback(self, pipeline):
+        await pipeline.warmup()
+        process = pipeline.asr.process
+        async def slow_asr(text):
+            await asyncio.sleep(0.2)
+            return await process(text)
+        pipeline.asr.process = slow_asr
+        result = await pipeline.run_turn("안녕하세요")
+        # ASR has no fallback; later stages absorb the overrun
+        assert result['timings']['overruns'][0] == 'asr'
+        assert 'asr' not in result['timings'].get('fallbacks', {})
+        assert result['timings']['total'] < 750
+
+    @pytest.mark.asyncio
+    async def test_speculative_llm_falls_back(self, pipeline):
+        await pipeline.warmup()
+        pipeline.llm.generate = stall
+        result = await pipeline.run_turn("요즘 불안해요", speculative=True)
+        assert result['timings']['fallbacks'] == {'llm': 'curated_reply'}
+        assert result['timings']['total'] < 700
+
+    @pytest.mark.asyncio
+    async def test_streamed_turn_falls_back_before_first_audio(self, pipeline):
+        await pipeline.warmup()
+        async def generate_stream(text, safety_result):
+            async def tokens():
+                await asyncio.sleep(STALL)
+                yield "늦은 답변이에요."
+            return tokens(), {'primary': 'sadness'}
+        pipeline.llm.generate_stream = generate_stream
+        result = await pipeline.stream_turn("요즘 너무 우울해요").collect()
+        assert result['timings']['fallbacks'] == {'llm': 'curated_reply'}
+        assert result['timings']['first_audio'] < 700
+        reply, audio_url = pipeline._fallback_audio({'primary': 'sadness'})
+        assert [(s['text'], s['audio_url']) for s in result['audio_segments']] == [(reply, audio_url)]
+        assert result['fallback_stage'] == 'llm'
+
+class TestLazyFallbackAudio:
+    """Test curated fallback audio rendered after the first deadline miss"""
+
+    @pytest.fixture
+    def pipeline(self):
+        return VoicePipeline(load_settings(), mode="mock")
+
+    @pytest.mark.asyncio
+    async def test_warmup_pins_only_crisis_audio(self, pipeline):
+        await pipeline.warmup()
+        neutral = {'primary': 'neutral'}
+        assert pipeline.tts.prerendered(pipeline._fallback_reply(neutral), neutral) is None
+        assert len(pipeline.tts._pinned) == 1
+
+    @pytest.mark.asyncio
+    async def test_first_tts_miss_keeps_generated_reply(self, pipeline):
+        await pipeline.warmup()
+        async def generate(text, safety_result):
+            return "일이 많이 쌓이셨군요.", {'primary': 'stress'}
+        pipeline.llm.generate = generate
+        pipeline.tts.synthesize = stall
+        first = await pipeline.run_turn("스트레스를 받고 있어요")
+        assert first['timings']['fallbacks'] == {'tts': 'text_only'}
+        assert first['audio_url'] is None
+        assert first['fallback_stage'] is None
+        assert first['response'] == "일이 많이 쌓이셨군요."
+
+        # The curated reply was rendered in the background meanwhile
+        await asyncio.gather(*pipeline._pinning.values())
+        second = await pipeline.run_turn("스트레스를 받고 있어요")
+        assert second['timings']['fallbacks'] == {'tts': 'cached_audio'}
+        assert second['fallback_stage'] == 'tts'
+        assert second['audio_url'] is not None
+
+    @pytest.mark.asyncio
+    async def test_llm_miss_renders_curated_reply_once(self, pipeline):
+        await pipeline.warmup()
+        pipeline.llm.generate = stall
+        first = await pipeline.run_turn("요즘 불안해요")
+        assert first['fallback_stage'] == 'llm'
+        assert first['audio_url'] is not None
+        second = await pipeline.run_turn("요즘 불안해요")
+        assert second['timings']['tts_prerendered'] is True
+        assert second['audio_url'] == first['audio_url']
+
+    @pytest.mark.asyncio
+    async def test_enforce_false_waits_for_slow_stage(self):
+        settings = load_settings()
+        settings['latency_budget'] = dict(settings['latency_budget'], enforce=False)
+        pipeline = VoicePipeline(settings, mode="mock")
+        generate = pipeline.llm.generate
+        async def slow_generate(text, safety_result):
+            await asyncio.sleep(0.5)
+            return await generate(text, safety_result)
+        pipeline.llm.generate = slow_generate
+        result = await pipeline.run_turn("요즘 불안해요")
+        assert 'fallbacks' not in result['timings']
+        assert result['timings']['total'] > 700
@@ -0,0 +1,114 @@
+"""
+Tests for the shared emotion lexicon engine
+"""
+import pytest
+import json
+import os
+import shutil
+from pathlib import Path
+from src.pipeline.emotion import EmotionLexicon, DEFAULT_LEXICON, get_lexicon
+from src.pipeline.llm import LLMProcessor
+
+SAMPLE_DATA = Path(__file__).parent.parent / "data" / "kmh44k_sample.jsonl"
+
+EDGE_CASES = [
+    "요즘 너무 우울하고 힘들어요",
+    "불안하고 걱정돼서 잠을 못 자요",
+    "회사 일이 부담돼서 미안한 마음이에요",
+    "돌아가신 할머니가 그리움에 보고싶어요",
+    "기쁘고 행복하고 좋아요",
+    "우울 우울 우울",
+    "",
+]
+
+def legacy_analyze(text):
+    """Reference implementation of the original LLMProcessor._analyze_emotion"""
+    emotion_keywords = {
+        'sadness': ['우울', '슬프', '힘들', '외로', '눈물'],
+        'anxiety': ['불안', '걱정', '두렵', '무서', '긴장'],
+        'stress': ['스트레스', '압박', '부담', '지치', '피곤'],
+        'anger': ['화나', '짜증', '분노', '억울', '미워'],
+        'joy': ['기쁘', '행복', '좋', '즐거', '신나']
+    }
+    detected, max_score = 'neutral', 0
+    for emotion, keywords in emotion_keywords.items():
+        score = sum(1 for keyword in keywords if keyword in text)
+        if score > max_score:
+            max_score, detected = score, emotion
+    cultural = {'한': 0.0, '정': 0.0, '눈치': 0.0}
+    if any(w in text for w in ['그리움', '서러움', '아쉬움', '후회']):
+        cultural['한'] = 0.7
+    if any(w in text for w in ['고마워', '보고싶', '사랑', '우리']):
+        cultural['정'] = 0.7
+    if any(w in text for w in ['미안', '부담', '실례', '죄송']):
+        cultural['눈치'] = 0.6
+    return {'primary': detected, 'confidence': min(max_score * 0.3 + 0.5, 1.0), 'cultural': cultural}
+
+def corpus():
+    texts = []
+    for line in SAMPLE_DATA.read_text().splitlines():
+        try:
+            texts.append(json.loads(line)['text'])
+        except ValueError:
+            continue  # sample file ends with a truncated record
+    return texts + EDGE_CASES
+
+class TestEmotionLexicon:
+    """Test the compiled emotion lexicon"""
+    
+    @pytest.mark.parametrize("text", corpus())
+    def test_matches_legacy_implementation(self, text):
+        assert get_lexicon().analyze(text) == legacy_analyze(text)
+    
+    def test_analyze_many_matches_analyze(self):
+        lexicon = get_lexicon()
+        texts = corpus()
+        assert lexicon.analyze_many(texts) == [lexicon.analyze(t) for t in texts]
+    
+    @pytest.mark.asyncio
+    async def test_llm_uses_shared_lexicon(self):
+        llm = LLMProcessor()
+        assert llm.lexicon is get_lexicon()
+        assert await llm._analyze_emotion("너무 불안해요") == get_lexicon().analyze("너무 불안해요")
+    
+    def test_overlapping_keywords_all_found(self, tmp_path):
+        path = tmp_path / "lexicon.yaml"
+        path.write_text(
+            "emotions:\n  sadness: [보고, 보고싶, 싶어]\n"
+            "cultural:\n  정:\n    score: 0.7\n    words: [보고싶]\n",
+            encoding='utf-8'
+        )
+        result = EmotionLexicon(path).analyze("보고싶어")
+        assert result['primary'] == 'sadness'
+        assert result['confidence'] == 1.0
+        assert result['cultural'] == {'정': 0.7}
+    
+    def test_reload_without_restart(self, tmp_path):
+        path = tmp_path / "lexicon.yaml"
+        shutil.copy(DEFAULT_LEXICON, path)
+        lexicon = EmotionLexicon(path)
+        assert lexicon.analyze("막막해요")['primary'] == 'neutral'
+        assert lexicon.reload() is False
+        
+        path.write_text(path.read_text(encoding='utf-8').replace(
+            'sadness: [우울,', 'sadness: [막막, 우울,'), encoding='utf-8')
+        stat = path.stat()
+        os.utime(path, (stat.st_atime, stat.st_mtime + 1))
+        assert lexicon.reload() is True
+        assert lexicon.analyze("막막해요")['primary'] == 'sadness'
+
+class TestInferenceServiceEmotion:
+    """Test the inference service scores emotion with the same engine"""
+    
+    def test_service_matches_cli(self):
+        pytest.importorskip("fastapi")
+        pytest.importorskip("openai")
+        import importlib.util
+        spec = importlib.util.spec_from_file_location(
+            "inference_main",
+            Path(__file__).parent.parent / "services" / "inference" / "main.py"
+        )
+        service = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(service)
+        for text in corpus():
+            assert service.analyze_emotion(text) == get_lexicon().analyze(text)
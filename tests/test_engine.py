@@ -0,0 +1,170 @@
+"""
+Tests for the long-lived VoicePipeline engine
+"""
+import pytest
+import asyncio
+from src.pipeline import VoicePipeline
+from src.config.settings import load_settings
+
+class TestVoicePipeline:
+    """Test the shared pipeline engine"""
+    
+    @pytest.fixture
+    def pipeline(self):
+        return VoicePipeline(load_settings(), mode="mock")
+    
+    @pytest.mark.asyncio
+    async def test_run_turn_result_shape(self, pipeline):
+        """Test a turn returns the same structure as the legacy pipeline"""
+        result = await pipeline.run_turn("요즘 너무 우울해요")
+        for key in ('input', 'transcript', 'response', 'emotion',
+                    'safety', 'audio_url', 'timings'):
+            assert key in result
+        for stage in ('asr', 'safety', 'llm', 'postprocess', 'tts', 'total'):
+            assert stage in result['timings']
+        assert result['emotion']['primary'] == 'sadness'
+    
+    @pytest.mark.asyncio
+    async def test_warmup_is_idempotent(self, pipeline):
+        """Test stages are built and warmed only once"""
+        stages = (pipeline.asr, pipeline.safety, pipeline.llm,
+                  pipeline.post, pipeline.tts)
+        await asyncio.gather(pipeline.warmup(), pipeline.warmup())
+        assert pipeline.is_warm
+        await pipeline.run_turn("안녕하세요")
+        assert stages == (pipeline.asr, pipeline.safety, pipeline.llm,
+                          pipeline.post, pipeline.tts)
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_sessions(self, pipeline):
+        """Test concurrent turns on one pipeline do not interfere"""
+        texts = ["죽고 싶어요", "스트레스를 받고 있어요", "불안해서 잠을 못 자요"] * 10
+        results = await asyncio.gather(*(pipeline.run_turn(t) for t in texts))
+        
+        for text, result in zip(texts, results):
+            assert result['input'] == text
+            if text == "죽고 싶어요":
+                assert result['safety']['risk_level'] == 'critical'
+                assert '혼자가 아닙니다' in result['response']
+            else:
+                assert result['safety']['risk_level'] != 'critical'
+
+    @pytest.mark.asyncio
+    async def test_safety_cascade_from_settings(self):
+        """Test safety cascade mode and layer order come from settings"""
+        settings = load_settings()
+        settings['safety'] = dict(settings['safety'], cascade=True,
+                                  layer_order=['context', 'keyword', 'pattern'])
+        pipeline = VoicePipeline(settings, mode="mock")
+        result = await pipeline.run_turn("죽고 싶어요")
+        assert result['safety']['layers_run'] == ['context', 'keyword']
+
+class TestPrerenderedCrisisAudio:
+    """Test the emergency response is voiced without synthesis"""
+    
+    @pytest.fixture
+    def pipeline(self):
+        return VoicePipeline(load_settings(), mode="mock")
+    
+    @pytest.mark.asyncio
+    async def test_crisis_turn_skips_synthesis(self, pipeline):
+        """Test a critical turn uses the audio rendered at warmup"""
+        await pipeline.warmup()
+        
+        async def fail_synthesize(*args):
+            raise AssertionError("crisis turn called the synthesizer")
+        pipeline.tts.synthesize = fail_synthesize
+        pipeline.tts.synthesize_segment = fail_synthesize
+        
+        result = await pipeline.run_turn("죽고 싶어요")
+        assert result['timings']['tts'] == 0
+        assert result['timings']['tts_prerendered'] is True
+        assert 'urgent_care' in result['audio_url']
+        
+        streamed = await pipeline.stream_turn("죽고 싶어요").collect()
+        assert streamed['timings']['tts_prerendered'] is True
+        assert streamed['audio_url'] == result['audio_url']
+    
+    @pytest.mark.asyncio
+    async def test_crisis_audio_survives_cache_eviction(self, pipeline):
+        """Test pinned audio is not subject to the LRU bound"""
+        pipeline.tts.cache.max_items = 1
+        await pipeline.warmup()
+        await pipeline.run_turn("스트레스를 받고 있어요")
+        result = await pipeline.run_turn("자살하고 싶어요")
+        assert result['timings']['tts_prerendered'] is True
+    
+    @pytest.mark.asyncio
+    async def test_normal_turn_is_not_prerendered(self, pipeline):
+        result = await pipeline.run_turn("스트레스를 받고 있어요")
+        assert 'tts_prerendered' not in result['timings']
+    
+    @pytest.mark.asyncio
+    async def test_warmup_fails_loudly_without_crisis_audio(self, pipeline):
+        """Test startup refuses to continue if pre-rendering did not complete"""
+        pipeline.tts.prerendered = lambda text, emotion: None
+        with pytest.raises(RuntimeError):
+            await pipeline.warmup()
+        assert not pipeline.is_warm
+
+    @pytest.mark.asyncio
+    async def test_one_shot_crisis_turn_synthesizes_without_warmup(self):
+        """Test a pipeline built without auto warmup still voices a crisis"""
+        pipeline = VoicePipeline(load_settings(), mode="mock", auto_warmup=False)
+        result = await pipeline.run_turn("죽고 싶어요")
+        assert not pipeline.is_warm
+        assert result['safety']['risk_level'] == 'critical'
+        assert 'tts_prerendered' not in result['timings']
+        assert 'urgent_care' in result['audio_url']
+
+class TestSpeculativeLLM:
+    """Test LLM generation overlapped with the safety check"""
+    
+    LEAK_MARKER = "SPECULATIVE-LLM-OUTPUT"
+    
+    @pytest.fixture
+    def pipeline(self):
+        return VoicePipeline(load_settings(), mode="mock", speculative=True)
+    
+    @pytest.mark.asyncio
+    async def test_overlap_savings_reported(self, pipeline):
+        """Test a normal turn keeps the LLM result and reports the overlap"""
+        result = await pipeline.run_turn("스트레스를 받고 있어요")
+        timings = result['timings']
+        assert result['emotion']['primary'] == 'stress'
+        assert timings['overlap_saved'] > 0
+        assert timings['overlap_saved'] <= min(timings['safety'], timings['llm'])
+    
+    @pytest.mark.asyncio
+    async def test_critical_turn_never_leaks_finished_llm_output(self, pipeline):
+        """Test an LLM that finishes before the safety check is discarded"""
+        async def fast_generate(text, safety_result):
+            return self.LEAK_MARKER, {'primary': 'neutral', 'confidence': 0.5}
+        pipeline.llm.generate = fast_generate
+        
+        result = await pipeline.run_turn("죽고 싶어요")
+        assert result['safety']['risk_level'] == 'critical'
+        assert result['response'] == result['safety']['emergency_response']
+        assert result['emotion']['primary'] == 'crisis'
+        assert self.LEAK_MARKER not in repr(result)
+        assert 'llm' not in result['timings']
+    
+    @pytest.mark.asyncio
+    async def test_critical_turn_cancels_running_llm(self, pipeline):
+        """Test an LLM still generating when the check goes critical is cancelled"""
+        state = {'started': False, 'cancelled': False}
+        
+        async def slow_generate(text, safety_result):
+            state['started'] = True
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                state['cancelled'] = True
+                raise
+            return self.LEAK_MARKER, {'primary': 'neutral', 'confidence': 0.5}
+        pipeline.llm.generate = slow_generate
+        
+        result = await pipeline.run_turn("자살하고 싶어요")
+        assert state == {'started': True, 'cancelled': True}
+        assert self.LEAK_MARKER not in repr(result)
+        assert result['timings']['total'] < 1000
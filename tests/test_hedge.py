@@ -0,0 +1,223 @@
+"""
+Tests for hedged LLM and TTS requests
+"""
+import pytest
+import asyncio
+import json
+from src.pipeline import AudioCache, Hedger, LLMProcessor, TTSProcessor, VoicePipeline
+from src.pipeline.http_pool import ClientPool
+from src.pipeline.latency import LatencyHistogram
+from src.config.settings import load_settings
+
+FAST = 0.01  # seconds
+SLOW = 0.4
+
+def one_in(n: int):
+    """Latency distribution: every n-th request stalls upstream"""
+    return lambda request: SLOW if request % n == n // 2 else FAST
+
+class LatencyStub:
+    """Local OpenAI/ElevenLabs stand-in with an injected latency per request"""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.requests = 0
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, '127.0.0.1', 0)
+        return f"http://127.0.0.1:{self.server.sockets[0].getsockname()[1]}/v1"
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readuntil(b"\r\n")
+                path = request_line.decode().split(" ")[1]
+                length = 0
+                while (line := await reader.readuntil(b"\r\n")) != b"\r\n":
+                    name, value = line.decode().split(":", 1)
+                    if name.strip().lower() == 'content-length':
+                        length = int(value)
+                body = await reader.readexactly(length)
+                self.requests += 1
+                await asyncio.sleep(self.latency(self.requests))
+                if path.startswith('/v1/chat/completions'):
+                    payload = json.dumps({'choices': [{'message': {'content': '괜찮아요.'}}]}).encode()
+                else:
+                    payload = b"ID3" + body[:32]
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Length: %d\r\n\r\n" % len(payload) + payload
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            writer.close()  # the client hung up on a losing attempt
+
+def pool(url: str) -> ClientPool:
+    return ClientPool({'http2': False, 'providers': {
+        name: {'base_url': url} for name in ('openai', 'elevenlabs')
+    }})
+
+async def drive(call, calls: int = 300, workers: int = 10) -> LatencyHistogram:
+    """Run calls from concurrent workers; latencies in ms"""
+    latency = LatencyHistogram()
+    loop = asyncio.get_running_loop()
+
+    async def worker(index: int):
+        for n in range(index, calls, workers):
+            start = loop.time()
+            await call(n)
+            latency.record((loop.time() - start) * 1000)
+
+    await asyncio.gather(*(worker(index) for index in range(workers)))
+    return latency
+
+class TestHedger:
+    """Test hedge delay, winner selection and the hedge budget"""
+
+    def warmed(self, **kwargs) -> Hedger:
+        hedger = Hedger(min_samples=10, **kwargs)
+        hedger._latencies.extend([FAST] * 10)
+        return hedger
+
+    def test_no_delay_until_min_samples(self):
+        hedger = Hedger(min_samples=3)
+        hedger._latencies.extend([0.01, 0.02])
+        assert hedger.delay() is None
+        hedger._latencies.append(0.03)
+        assert hedger.delay() == 0.03
+
+    def test_delay_is_running_percentile(self):
+        hedger = Hedger(percentile=90, window=10, min_samples=1)
+        hedger._latencies.extend(n / 100 for n in range(1, 11))
+        assert hedger.delay() == 0.09
+        hedger._latencies.extend([0.5] * 10)  # older samples fall out
+        assert hedger.delay() == 0.5
+
+    @pytest.mark.asyncio
+    async def test_hedge_wins_and_loser_is_cancelled(self):
+        hedger = self.warmed(max_rate=1.0)
+        delays = iter([SLOW, FAST])
+        cancelled = []
+
+        async def attempt():
+            delay = next(delays)
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                cancelled.append(delay)
+                raise
+            return delay
+
+        assert await hedger.run(attempt) == FAST
+        assert cancelled == [SLOW]
+        assert (hedger.hedged, hedger.hedge_wins) == (1, 1)
+
+    @pytest.mark.asyncio
+    async def test_hedge_win_records_primary_lower_bound(self):
+        hedger = self.warmed(max_rate=1.0, window=10)
+
+        async def attempt(delays=iter([SLOW, FAST] * 10)):
+            await asyncio.sleep(next(delays))
+
+        for _ in range(10):
+            await hedger.run(attempt)
+        # Every call was hedged and won by the hedge; the delay must not fall
+        # to the hedge's own latency, or every later call would be hedged
+        assert hedger.hedge_wins == 10
+        assert min(hedger._latencies) >= 2 * FAST
+        assert hedger.delay() >= 2 * FAST
+
+    @pytest.mark.asyncio
+    async def test_failed_attempt_falls_to_the_other(self):
+        hedger = self.warmed(max_rate=1.0)
+        attempts = []
+
+        async def attempt():
+            attempts.append(len(attempts))
+            if len(attempts) == 1:
+                await asyncio.sleep(0.05)
+                raise ConnectionError("upstream reset")
+            await asyncio.sleep(0.1)
+            return "ok"
+
+        assert await hedger.run(attempt) == "ok"
+        assert len(attempts) == 2
+
+    @pytest.mark.asyncio
+    async def test_errors_surface_when_every_attempt_fails(self):
+        hedger = Hedger()
+
+        async def attempt():
+            raise ConnectionError("upstream down")
+
+        with pytest.raises(ConnectionError):
+            await hedger.run(attempt)
+
+    @pytest.mark.asyncio
+    async def test_slow_spike_spends_at_most_the_burst(self):
+        hedger = self.warmed(max_rate=0.1, burst=2)
+
+        async def attempt():
+            await asyncio.sleep(0.03)
+
+        await asyncio.gather(*(hedger.run(attempt) for _ in range(100)))
+        assert hedger.hedged == 2
+
+    def test_from_settings(self):
+        settings = load_settings()['hedging']
+        assert Hedger.from_settings(settings, 'llm') is None  # off by default
+        enabled = dict(settings, enabled=True, stages=['tts'])
+        assert Hedger.from_settings(enabled, 'llm') is None
+        assert Hedger.from_settings(enabled, 'tts').max_rate == settings['max_rate']
+
+class TestHedgedBackends:
+    """Test tail latency against stub backends with injected latency"""
+
+    async def run_llm(self, hedger) -> LatencyHistogram:
+        stub = LatencyStub(one_in(25))
+        url = await stub.start()
+        llm = LLMProcessor(mode="live", pool=pool(url), hedger=hedger)
+        try:
+            return await drive(lambda n: llm.generate("요즘 불안해요", None))
+        finally:
+            await llm.pool.aclose()
+            await stub.stop()
+
+    @pytest.mark.asyncio
+    async def test_llm_hedging_cuts_p99(self):
+        baseline = await self.run_llm(None)
+        hedger = Hedger(max_rate=0.2)
+        hedged = await self.run_llm(hedger)
+        assert baseline.percentile(99) >= SLOW * 1000
+        assert hedged.percentile(99) < SLOW * 1000 / 2
+        assert hedger.hedge_wins > 0
+        assert hedger.hedged <= 0.2 * hedger.calls + hedger.burst
+
+    @pytest.mark.asyncio
+    async def test_tts_hedging_cuts_p99(self):
+        stub = LatencyStub(one_in(25))
+        url = await stub.start()
+        hedger = Hedger(max_rate=0.2)
+        tts = TTSProcessor(mode="live", pool=pool(url), hedger=hedger,
+                           cache=AudioCache(max_items=1))
+        try:
+            latency = await drive(
+                lambda n: tts.synthesize(f"문장 {n}번이에요.", {'primary': 'neutral'})
+            )
+        finally:
+            await tts.pool.aclose()
+            await stub.stop()
+        assert latency.percentile(99) < SLOW * 1000 / 2
+        # A hedge can lose before the stub has read its request
+        assert hedger.calls <= stub.requests <= hedger.calls + hedger.hedged
+
+    def test_pipeline_builds_hedgers_from_settings(self):
+        settings = load_settings()
+        settings['hedging'] = dict(settings['hedging'], enabled=True)
+        pipeline = VoicePipeline(settings, mode="live")
+        assert isinstance(pipeline.llm.hedger, Hedger)
+        assert isinstance(pipeline.tts.hedger, Hedger)
+        assert pipeline.llm.hedger is not pipeline.tts.hedger
@@ -0,0 +1,144 @@
+"""
+Tests for pooled keep-alive provider clients
+"""
+import pytest
+import asyncio
+import contextlib
+import json
+import time
+from src.pipeline import VoicePipeline
+from src.pipeline.http_pool import ClientPool
+from src.config.settings import load_settings
+
+HANDSHAKE_DELAY = 0.03  # seconds, simulated TCP/TLS setup per new connection
+
+class ProviderStub:
+    """Local HTTP/1.1 keep-alive server standing in for Deepgram, OpenAI and ElevenLabs"""
+    
+    def __init__(self):
+        self.connections = 0
+        self.requests = 0
+    
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, '127.0.0.1', 0)
+        return f"http://127.0.0.1:{self.server.sockets[0].getsockname()[1]}/v1"
+    
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+    
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        await asyncio.sleep(HANDSHAKE_DELAY)
+        try:
+            while True:
+                request_line = await reader.readuntil(b"\r\n")
+                method, path, _ = request_line.decode().split(" ", 2)
+                headers = {}
+                while (line := await reader.readuntil(b"\r\n")) != b"\r\n":
+                    name, value = line.decode().split(":", 1)
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get('content-length', 0)))
+                self.requests += 1
+                content_type, payload = self._respond(method, path, body)
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: %s\r\nContent-Length: %d\r\n"
+                    b"Connection: keep-alive\r\n\r\n" % (content_type, len(payload)) + payload
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+    
+    def _respond(self, method, path, body):
+        if method == 'HEAD':
+            return b"text/plain", b""
+        if path.startswith('/v1/listen'):
+            result = {'results': {'channels': [{'alternatives': [{'transcript': '요즘 너무 불안해요'}]}]}}
+            return b"application/json", json.dumps(result).encode()
+        if path.startswith('/v1/chat/completions'):
+            if json.loads(body).get('stream'):
+                events = [{'choices': [{'delta': {'content': token}}]}
+                          for token in ["불안한 마음이 ", "크신 것 같아요."]]
+                payload = "".join(f"data: {json.dumps(e)}\n\n" for e in events) + "data: [DONE]\n\n"
+                return b"text/event-stream", payload.encode()
+            result = {'choices': [{'message': {'content': '불안한 마음이 크신 것 같아요.'}}]}
+            return b"application/json", json.dumps(result).encode()
+        if path.startswith('/v1/text-to-speech'):
+            return b"audio/mpeg", b"ID3" + body[:32]
+        return b"text/plain", b""
+
+@contextlib.asynccontextmanager
+async def provider_stubs():
+    servers = {name: ProviderStub() for name in ('deepgram', 'openai', 'elevenlabs')}
+    urls = {name: await stub.start() for name, stub in servers.items()}
+    try:
+        yield servers, urls
+    finally:
+        for stub in servers.values():
+            await stub.stop()
+
+def live_settings(urls):
+    settings = load_settings()
+    settings['http_pool'] = dict(settings['http_pool'], http2=False, providers={
+        name: {'base_url': url} for name, url in urls.items()
+    })
+    return settings
+
+class TestClientPool:
+    """Test connection reuse across live turns"""
+    
+    @pytest.mark.asyncio
+    async def test_turns_reuse_prewarmed_connections(self):
+        async with provider_stubs() as (servers, urls):
+            await self._turns_reuse_prewarmed_connections(servers, urls)
+    
+    async def _turns_reuse_prewarmed_connections(self, servers, urls):
+        pipeline = VoicePipeline(live_settings(urls), mode="live")
+        try:
+            await pipeline.warmup()
+            assert all(stub.connections == 1 for stub in servers.values())
+            
+            for _ in range(5):
+                result = await pipeline.run_turn(b"RIFF-audio")
+                assert result['transcript'] == '요즘 너무 불안해요'
+                assert result['response'].startswith('불안한 마음이')
+            streamed = await pipeline.stream_turn(b"RIFF-audio").collect()
+            assert streamed['response'] == '불안한 마음이 크신 것 같아요.'
+            
+            assert servers['deepgram'].requests > 5
+            assert all(stub.connections == 1 for stub in servers.values())
+        finally:
+            await pipeline.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_latency_saved_per_turn(self):
+        async with provider_stubs() as (servers, urls):
+            await self._latency_saved_per_turn(urls)
+    
+    async def _latency_saved_per_turn(self, urls):
+        pipeline = VoicePipeline(live_settings(urls), mode="live")
+        try:
+            await pipeline.warmup()
+            
+            async def turn_ms(reconnect: bool) -> float:
+                if reconnect:
+                    await pipeline.http.aclose()  # what a fresh client per turn costs
+                start = time.perf_counter()
+                await pipeline.run_turn(b"RIFF-audio")
+                return (time.perf_counter() - start) * 1000
+            
+            cold = [await turn_ms(reconnect=True) for _ in range(3)]
+            pooled = [await turn_ms(reconnect=False) for _ in range(3)]
+            saved = min(cold) - max(pooled)
+            # ASR and LLM each skip one handshake; TTS is served from cache
+            assert saved > HANDSHAKE_DELAY * 1000
+        finally:
+            await pipeline.aclose()
+    
+    def test_provider_settings_override_defaults(self):
+        pool = ClientPool({'providers': {'openai': {'base_url': 'http://localhost:9/v1',
+                                                    'max_connections': 3}}})
+        assert pool.providers['openai']['base_url'] == 'http://localhost:9/v1'
+        assert pool.providers['deepgram']['base_url'].startswith('https://api.deepgram.com')
+        client = pool.client('openai')
+        assert pool.client('openai') is client
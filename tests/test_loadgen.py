@@ -0,0 +1,43 @@
+"""
+Tests for the open-loop load generator
+"""
+import pytest
+import json
+import subprocess
+from pathlib import Path
+
+BENCHMARKS = Path(__file__).parent / "benchmarks"
+
+class TestLoadGenerator:
+    """Smoke test the load generator against the local stub service"""
+    
+    def test_open_loop_against_stub(self, tmp_path):
+        output = tmp_path / "analysis.json"
+        result = subprocess.run(
+            ["python3", "loadgen.py", "--target", "stub", "--schedule", "constant",
+             "--rps", "20", "--duration", "1", "--json", str(output)],
+            cwd=BENCHMARKS,
+            capture_output=True,
+            text=True
+        )
+        assert result.returncode == 0, result.stderr
+        assert "# Latency Benchmark Report" in result.stdout
+        assert "## Load Profile" in result.stdout
+        
+        analysis = json.loads(output.read_text())
+        assert analysis['total_requests'] == 20
+        assert analysis['failed_requests'] == 0
+        assert analysis['latency_stats']['p99'] >= analysis['service_time_stats']['p99'] * 0.98
+    
+    def test_concurrency_sweep(self, tmp_path):
+        output = tmp_path / "analysis.json"
+        result = subprocess.run(
+            ["python3", "loadgen.py", "--sweep", "1,4", "--duration", "1", "--json", str(output)],
+            cwd=BENCHMARKS,
+            capture_output=True,
+            text=True
+        )
+        assert result.returncode == 0, result.stderr
+        assert "## Concurrency Sweep" in result.stdout
+        analysis = json.loads(output.read_text())
+        assert analysis['4']['throughput_rps'] > analysis['1']['throughput_rps']
@@ -0,0 +1,87 @@
+"""
+Tests for Prometheus pipeline metrics
+"""
+import pytest
+from prometheus_client import CollectorRegistry
+from src.pipeline import AudioCache, SafetyGuard, VoicePipeline
+from src.pipeline.metrics import PipelineMetrics, audio_cache_counts
+from src.config.settings import load_settings
+
+def sample(registry, name, **labels):
+    return registry.get_sample_value(name, labels) or 0
+
+class TestPipelineMetrics:
+    """Test per-stage histograms and counters"""
+    
+    @pytest.fixture
+    def registry(self):
+        return CollectorRegistry()
+    
+    @pytest.fixture
+    def pipeline(self, registry):
+        return VoicePipeline(load_settings(), mode="mock",
+                             metrics=PipelineMetrics(registry=registry))
+    
+    @pytest.mark.asyncio
+    async def test_turn_observes_every_stage(self, registry, pipeline):
+        result = await pipeline.run_turn("요즘 너무 우울해요")
+        risk = result['safety']['risk_level']
+        for stage in ('asr', 'safety', 'safety_keyword', 'safety_context',
+                      'safety_pattern', 'llm', 'postprocess', 'tts', 'total'):
+            assert sample(registry, 'intune_stage_latency_seconds_count',
+                          stage=stage, mode='mock', risk_level=risk) == 1, stage
+        total = sample(registry, 'intune_stage_latency_seconds_sum',
+                       stage='total', mode='mock', risk_level=risk)
+        assert int(total * 1000) == result['timings']['total']
+    
+    @pytest.mark.asyncio
+    async def test_crisis_turn_counts_escalation(self, registry, pipeline):
+        await pipeline.run_turn("죽고 싶어요")
+        await pipeline.run_turn("안녕하세요")
+        assert sample(registry, 'intune_escalations_total', mode='mock') == 1
+        assert sample(registry, 'intune_stage_latency_seconds_count',
+                      stage='llm', mode='mock', risk_level='critical') == 0
+    
+    @pytest.mark.asyncio
+    async def test_streamed_turn_observed(self, registry, pipeline):
+        result = await pipeline.stream_turn("요즘 불안해요").collect()
+        risk = result['safety']['risk_level']
+        assert sample(registry, 'intune_stage_latency_seconds_count',
+                      stage='llm', mode='mock', risk_level=risk) == 1
+    
+    @pytest.mark.asyncio
+    async def test_tts_cache_lookups_exported(self, registry, pipeline):
+        await pipeline.run_turn("안녕하세요")
+        misses = sample(registry, 'intune_cache_lookups_total', cache='tts', result='miss')
+        assert misses >= 1
+        assert misses == pipeline.tts.cache.stats['misses']
+    
+    def test_collected_caches_are_not_kept_alive(self, registry):
+        metrics = PipelineMetrics(registry=registry)
+        cache = AudioCache()
+        cache.get("missing")
+        metrics.track_cache('tts', cache, audio_cache_counts)
+        assert sample(registry, 'intune_cache_lookups_total', cache='tts', result='miss') == 1
+        del cache
+        assert sample(registry, 'intune_cache_lookups_total', cache='tts', result='miss') == 0
+    
+    def test_disabled_metrics_are_noops(self):
+        metrics = PipelineMetrics(enabled=False)
+        metrics.record_turn('mock', 'low', {'total': 0.1})
+        metrics.track_cache('tts', AudioCache(), audio_cache_counts)
+
+class TestSafetyLayerTimings:
+    """Test the safety check reports per-layer durations"""
+    
+    @pytest.mark.asyncio
+    async def test_cascade_times_only_layers_run(self):
+        seconds = {}
+        await SafetyGuard(cascade=True).check("죽고 싶어요", seconds)
+        assert list(seconds) == ['safety_keyword']
+    
+    @pytest.mark.asyncio
+    async def test_result_unchanged_by_timing(self):
+        guard = SafetyGuard()
+        seconds = {}
+        assert await guard.check("불안해요", seconds) == await guard.check("불안해요")
+        assert seconds['safety_pattern'] >= 0.02
@@ -0,0 +1,63 @@
+"""
+Tests for the single-pass PostProcessor rewriter
+"""
+import pytest
+import re
+import time
+from src.pipeline.postprocess import PostProcessor
+
+SAMPLES = [
+    "제 번호는 010-1234-5678이에요.",
+    "주민번호 900101-1234567 알려드려요.",
+    "메일은 user.name+tag@example.co.kr 로 보내주세요.",
+    "계좌 12345678901 입니다.",
+    "010-1234-5678 그리고 01012345678",
+    "절대 포기하지 마세요. 반드시 나아질 거예요.",
+    "그건 틀렸어. 그러면 안돼.",
+    "123-45 짧은 번호는 그대로 둬요",
+    "abc12345 def",
+    "",
+]
+
+def legacy_process(text):
+    """Reference implementation of the original per-pattern passes"""
+    for pattern, replacement in [
+        (r'\d{3}-\d{4}-\d{4}', '[전화번호]'),
+        (r'\d{6}-\d{7}', '[주민번호]'),
+        (r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', '[이메일]'),
+        (r'\d{5,}', '[번호]'),
+    ]:
+        text = re.sub(pattern, replacement, text)
+    for harsh, gentle in {'절대': '가능하면', '반드시': '되도록',
+                          '틀렸': '다르게 생각해볼 수 있', '안돼': '어려울 수 있어'}.items():
+        text = text.replace(harsh, gentle)
+    if not text.endswith(('요', '요.', '요?', '요!', '까요?', '네요', '어요')):
+        if text.endswith('.'):
+            text = text[:-1] + '요.'
+    if len(text) > 500:
+        text = text[:497] + "..."
+    return text
+
+class TestPostProcessor:
+    """Test PII scrubbing and tone rewriting in one scan"""
+    
+    @pytest.mark.parametrize("text", SAMPLES)
+    def test_matches_legacy_passes(self, text):
+        assert PostProcessor().process_many([text]) == [legacy_process(text)]
+    
+    def test_phone_wins_over_long_number(self):
+        post = PostProcessor()
+        assert post._rewrite("12010-1234-5678") == "12[전화번호]"
+        assert post._rewrite("010-1234-567890") == "[전화번호]90"
+    
+    @pytest.mark.asyncio
+    async def test_process_many_matches_process(self):
+        post = PostProcessor()
+        assert post.process_many(SAMPLES) == [await post.process(t) for t in SAMPLES]
+    
+    def test_scan_is_linear_on_address_characters(self):
+        post = PostProcessor()
+        text = "a" * 200_000
+        start = time.perf_counter()
+        assert post._rewrite(text) == text
+        assert time.perf_counter() - start < 0.5
@@ -0,0 +1,82 @@
+"""
+Tests for token-budgeted prompt assembly
+"""
+import pytest
+from src.pipeline.prompt import (
+    MESSAGE_OVERHEAD, REPLY_OVERHEAD, PromptBuilder, TokenCounter, estimate_tokens
+)
+
+SYSTEM = "You are a compassionate AI therapist."
+
+def exchange(i, length=10):
+    return {"user": f"질문{i} " + "가" * length, "assistant": f"답변{i} " + "나" * length}
+
+class TestTokenCounter:
+    """Test memoized token counts"""
+    
+    def test_each_text_counted_once(self):
+        counter = TokenCounter()
+        text = "요즘 너무 불안해요"
+        assert counter(text) == counter(text)
+        assert (counter.misses, counter.hits) == (1, 1)
+    
+    def test_least_recently_used_counts_dropped(self):
+        counter = TokenCounter(max_items=2)
+        for text in ["가", "나", "가", "다"]:
+            counter(text)
+        counter("가")
+        counter("나")
+        assert counter.misses == 4
+    
+    def test_estimate_weights_hangul_above_ascii(self):
+        assert estimate_tokens("") == 0
+        assert estimate_tokens("hello world!") == 3
+        assert estimate_tokens("안녕하세요") == 5
+
+class TestPromptBuilder:
+    """Test context packing within the token budget"""
+    
+    def test_message_layout(self):
+        context = [exchange(0), exchange(1)]
+        prompt = PromptBuilder(SYSTEM).build("지금은요?", context)
+        assert [m["role"] for m in prompt.messages] == [
+            "system", "user", "assistant", "user", "assistant", "user"
+        ]
+        assert prompt.messages[1]["content"] == context[0]["user"]
+        assert prompt.messages[-1]["content"] == "지금은요?"
+        assert prompt.context == context
+    
+    def test_tokens_include_overheads(self):
+        builder = PromptBuilder(SYSTEM)
+        count = builder.count
+        prompt = builder.build("안녕", [exchange(0)])
+        expected = (REPLY_OVERHEAD + 4 * MESSAGE_OVERHEAD + count(SYSTEM) + count("안녕")
+                    + count(exchange(0)["user"]) + count(exchange(0)["assistant"]))
+        assert prompt.tokens == expected
+    
+    def test_budget_keeps_most_recent_exchanges(self):
+        context = [exchange(i) for i in range(20)]
+        builder = PromptBuilder(SYSTEM, budget=200)
+        prompt = builder.build("안녕", context)
+        assert prompt.tokens <= 200
+        assert 0 < len(prompt.context) < 20
+        assert prompt.context == context[-len(prompt.context):]
+    
+    def test_short_turns_fit_more_context(self):
+        builder = PromptBuilder(SYSTEM, budget=400)
+        short = builder.build("안녕", [exchange(i, 2) for i in range(20)])
+        long = builder.build("안녕", [exchange(i, 60) for i in range(20)])
+        assert len(short.context) > len(long.context)
+    
+    def test_over_budget_utterance_sent_without_context(self):
+        prompt = PromptBuilder(SYSTEM, budget=10).build("가" * 50, [exchange(0)])
+        assert prompt.context == []
+        assert len(prompt.messages) == 2
+    
+    def test_context_counted_once_across_turns(self):
+        builder = PromptBuilder(SYSTEM)
+        context = [exchange(i) for i in range(5)]
+        builder.build("첫번째", context)
+        misses = builder.count.misses
+        builder.build("두번째", context)
+        assert builder.count.misses == misses + 1
@@ -0,0 +1,109 @@
+"""
+Tests for the inference service response cache
+"""
+import pytest
+import asyncio
+import time
+from services.inference.response_cache import MemoryBackend, RedisBackend, ResponseCache
+
+SYSTEM = "You are a compassionate AI therapist."
+CONTEXT = [{"user": "안녕하세요", "assistant": "반가워요"}]
+
+class RespStandIn:
+    """Local Redis-protocol server supporting GET and SET ... PX"""
+    
+    def __init__(self):
+        self.data = {}
+        self.connections = 0
+    
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, '127.0.0.1', 0)
+        return self.server.sockets[0].getsockname()[1]
+    
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+    
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                header = await reader.readuntil(b"\r\n")
+                args = []
+                for _ in range(int(header[1:-2])):
+                    length = int((await reader.readuntil(b"\r\n"))[1:-2])
+                    args.append((await reader.readexactly(length + 2))[:-2].decode())
+                writer.write(self._execute(args))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+    
+    def _execute(self, args):
+        command = args[0].upper()
+        if command == 'GET':
+            entry = self.data.get(args[1])
+            if entry is None or entry[0] <= time.monotonic():
+                return b"$-1\r\n"
+            value = entry[1].encode()
+            return b"$%d\r\n%s\r\n" % (len(value), value)
+        if command == 'SET':
+            ttl = int(args[4]) / 1000 if len(args) > 4 else float('inf')
+            self.data[args[1]] = (time.monotonic() + ttl, args[2])
+            return b"+OK\r\n"
+        if command == 'SELECT':
+            return b"+OK\r\n"
+        return b"-ERR unknown command\r\n"
+
+class TestResponseCache:
+    """Test keys, LRU/TTL and hit-rate counters"""
+    
+    def test_key_normalizes_text_and_trims_context(self):
+        cache = ResponseCache(context_window=1)
+        older = [{"user": "오래된", "assistant": "대화"}] + CONTEXT
+        assert cache.key(SYSTEM, CONTEXT, "안녕하세요 ") == cache.key(SYSTEM, older, " 안녕하세요")
+        assert cache.key(SYSTEM, CONTEXT, "안녕하세요") != cache.key(SYSTEM, [], "안녕하세요")
+        assert cache.key(SYSTEM, CONTEXT, "안녕하세요") != cache.key("other", CONTEXT, "안녕하세요")
+        assert cache.key(SYSTEM, [], "hi", model="a") != cache.key(SYSTEM, [], "hi", model="b")
+    
+    @pytest.mark.asyncio
+    async def test_memory_lru_and_ttl(self):
+        backend = MemoryBackend(max_items=2)
+        cache = ResponseCache(backend, ttl=0.05)
+        await cache.set('a', '1')
+        await cache.set('b', '2')
+        assert await cache.get('a') == '1'
+        await cache.set('c', '3')
+        assert await cache.get('b') is None
+        assert backend.evictions == 1
+        
+        await asyncio.sleep(0.06)
+        assert await cache.get('a') is None
+        assert cache.stats()['hits'] == 1
+        assert cache.stats()['misses'] == 2
+        assert cache.stats()['hit_rate'] == pytest.approx(1 / 3)
+    
+    @pytest.mark.asyncio
+    async def test_redis_backend_against_stand_in(self):
+        server = RespStandIn()
+        port = await server.start()
+        try:
+            cache = ResponseCache(RedisBackend(f"redis://127.0.0.1:{port}/1"), ttl=0.05)
+            key = cache.key(SYSTEM, CONTEXT, "요즘 너무 우울해요")
+            assert await cache.get(key) is None
+            await cache.set(key, "마음이 무거우신가 봐요.")
+            assert await cache.get(key) == "마음이 무거우신가 봐요."
+            assert server.connections == 1
+            
+            await asyncio.sleep(0.06)
+            assert await cache.get(key) is None
+            await cache.backend.close()
+        finally:
+            await server.stop()
+    
+    @pytest.mark.asyncio
+    async def test_unreachable_backend_is_a_miss(self):
+        cache = ResponseCache(RedisBackend("redis://127.0.0.1:1/0"))
+        assert await cache.get('a') is None
+        await cache.set('a', '1')
+        assert cache.stats()['errors'] == 2
+        assert cache.stats()['misses'] == 1
@@ -0,0 +1,231 @@
+"""
+Tests for the compiled SafetyGuard matcher
+"""
+import pytest
+import asyncio
+import json
+import re
+import time
+from pathlib import Path
+from src.pipeline.safety import SafetyGuard, Thresholds
+from src.pipeline.matcher import KeywordMatcher
+
+SAMPLE_DATA = Path(__file__).parent.parent / "data" / "kmh44k_sample.jsonl"
+
+EDGE_CASES = [
+    "죽고 싶어요",
+    "죽 고 싶 어",
+    "죽\n고 싶",
+    "자 살",
+    "목 을 매",
+    "뛰어 내리고 싶어",
+    "더 이상 못 하겠어요",
+    "더 이상\n못 하겠어요",
+    "싶은 건 죽는 거",
+    "죽\n싶",
+    "끝을 내고 싶어",
+    "혼자 아무도 관심없 버림받은 기분",
+    "의미없어요 포기할래요 끝이에요 못하겠어요",
+    "외로 워요, 슬 퍼요",
+    "불 안해요",
+    "오늘 날씨가 좋네요",
+    "",
+]
+
+def legacy_scores(guard, text):
+    """Reference implementation of the original per-keyword/regex layers"""
+    layer1 = 0.0
+    for level, keywords in guard.crisis_keywords.items():
+        for keyword in keywords:
+            if keyword in text:
+                layer1 = max(layer1, {'immediate': 0.9, 'high': 0.7, 'medium': 0.5}[level])
+    legacy_patterns = {
+        'immediate': [r'죽\s*고\s*싶', r'죽\s*을\s*래', r'자\s*살', r'목\s*[을를]\s*매', r'뛰\s*어\s*내\s*리'],
+        'high': [r'우\s*울', r'힘\s*들', r'포\s*기', r'절\s*망'],
+    }
+    for level, patterns in legacy_patterns.items():
+        for pattern in patterns:
+            if re.search(pattern, text):
+                layer1 = max(layer1, {'immediate': 0.95, 'high': 0.75}[level])
+    
+    isolation = sum(1 for w in ['혼자', '아무도', '관심없', '버림받'] if w in text) * 0.2
+    hopeless = sum(1 for w in ['의미없', '포기', '끝', '못하겠'] if w in text) * 0.25
+    layer2 = min(isolation + hopeless, 1.0)
+    
+    layer3 = 0.0
+    for pattern in [r'더\s*이상.*못|안|없', r'죽.*싶|싶.*죽', r'끝.*내|내.*끝']:
+        if re.search(pattern, text):
+            layer3 += 0.3
+    return layer1, layer2, min(layer3, 1.0)
+
+def corpus():
+    texts = []
+    for line in SAMPLE_DATA.read_text().splitlines():
+        try:
+            texts.append(json.loads(line)['text'])
+        except ValueError:
+            continue  # sample file ends with a truncated record
+    return texts + EDGE_CASES
+
+class TestKeywordMatcher:
+    """Test the Aho-Corasick matcher"""
+    
+    def test_overlapping_hits_with_offsets(self):
+        matcher = KeywordMatcher([("he", 1), ("she", 2), ("hers", 3)])
+        hits = [(h.start, h.end, h.keyword, h.payload) for h in matcher.scan("ushers")]
+        assert sorted(hits) == [(1, 4, "she", 2), (2, 4, "he", 1), (2, 6, "hers", 3)]
+    
+    def test_flexible_keywords_skip_whitespace(self):
+        matcher = KeywordMatcher(flexible=[("죽고싶", "immediate")])
+        [hit] = matcher.scan("정말 죽 고  싶어")
+        assert (hit.start, hit.end) == (3, 9)
+        assert matcher.scan("죽고 싫어") == []
+    
+    def test_stream_matches_across_chunks(self):
+        matcher = KeywordMatcher([("자살", "a")], flexible=[("죽고싶", "b")])
+        stream = matcher.stream()
+        hits = stream.feed("저는 죽") + stream.feed(" 고") + stream.feed(" 싶고 자") + stream.feed("살")
+        assert hits == matcher.scan("저는 죽 고 싶고 자살")
+    
+    @pytest.mark.parametrize("text", corpus() + ["더 이상\n못 하겠어 죽\n고 싶어", "ushers 자 살"])
+    def test_substring_scan_matches_automaton(self, text):
+        guard = SafetyGuard()
+        keywords = [(keyword, ('keyword', level))
+                    for level, words in guard.crisis_keywords.items() for keyword in words]
+        flexible = [(token, ('sequence', token)) for token in guard._sequence_index]
+        flexible += [(pattern, 'pattern') for patterns in guard.crisis_patterns.values()
+                     for pattern in patterns]
+        small = KeywordMatcher(keywords, flexible)
+        large = KeywordMatcher(keywords, flexible, substring_limit=0)
+        assert small.scan(text) == large.scan(text)
+
+class TestSafetyGuardMatcher:
+    """Test all three layers consume one compiled scan"""
+    
+    @pytest.mark.parametrize("text", corpus())
+    def test_layers_match_legacy_implementation(self, text):
+        guard = SafetyGuard()
+        tally = guard.scan(text)
+        assert (tally.keyword_score, tally.context_score, tally.pattern_score) == \
+            legacy_scores(guard, text)
+    
+    @pytest.mark.asyncio
+    async def test_check_uses_compiled_scan(self):
+        guard = SafetyGuard()
+        result = await guard.check("죽 고 싶어요")
+        assert result['risk_level'] == 'critical'
+        assert result['layers']['keyword'] == 0.95
+    
+    def test_extra_keywords_are_compiled(self):
+        guard = SafetyGuard(extra_keywords={'immediate': ['삶을 끝내']})
+        assert guard.scan("삶을 끝내고 싶다").keyword_score == 0.9
+    
+    def test_unknown_extra_keyword_level_is_skipped(self, caplog):
+        guard = SafetyGuard(extra_keywords={'severe': ['삶을 마감'], 'medium': ['막막']})
+        assert 'severe' not in guard.crisis_keywords
+        assert guard.scan("삶을 마감하고 싶을 만큼 막막해").keyword_score == 0.5
+        assert "unknown level 'severe'" in caplog.text
+
+class TestSafetyGuardBatch:
+    """Test check_many scores like check"""
+    
+    @pytest.mark.asyncio
+    async def test_check_many_matches_check(self):
+        guard = SafetyGuard()
+        texts = corpus()
+        expected = [await guard.check(text) for text in texts]
+        assert guard.check_many(texts) == expected
+    
+    def test_check_many_keeps_order(self):
+        guard = SafetyGuard()
+        results = guard.check_many(["오늘 날씨가 좋네요", "죽고 싶어요", "불안해요"])
+        assert [r['risk_level'] for r in results] == ['low', 'critical', 'medium']
+        assert guard.check_many([]) == []
+
+class TestSafetyGuardCascade:
+    """Test early exit in cascade mode"""
+    
+    @pytest.mark.asyncio
+    async def test_critical_keyword_skips_later_layers(self):
+        guard = SafetyGuard(cascade=True)
+        result = await guard.check("죽고 싶어요")
+        assert result['risk_level'] == 'critical'
+        assert result['layers_run'] == ['keyword']
+        assert result['layers']['context'] is None
+        assert result['layers']['pattern'] is None
+    
+    @pytest.mark.asyncio
+    async def test_non_critical_runs_every_layer(self):
+        guard = SafetyGuard(cascade=True)
+        text = "요즘 너무 불안해요"
+        result = await guard.check(text)
+        assert result['layers_run'] == ['keyword', 'context', 'pattern']
+        assert result == guard.check_many([text])[0]
+    
+    @pytest.mark.asyncio
+    async def test_layer_order_is_configurable(self):
+        guard = SafetyGuard(cascade=True, layer_order=['pattern', 'context', 'keyword'])
+        result = await guard.check("의미없어요 포기할래요 끝이에요 못하겠어요")
+        assert result['layers_run'] == ['pattern', 'context']
+        assert result['risk_level'] == 'critical'
+        assert result['layers']['keyword'] is None
+    
+    @pytest.mark.asyncio
+    async def test_cascade_is_faster_on_crisis(self):
+        guard = SafetyGuard(cascade=True)
+        start = time.perf_counter()
+        await guard.check("자살")
+        assert (time.perf_counter() - start) * 1000 < guard.target_latency
+    
+    @pytest.mark.asyncio
+    async def test_reload_mid_check_keeps_thresholds_it_started_with(self):
+        guard = SafetyGuard(cascade=True)
+        check = asyncio.create_task(guard.check("우울해요"))
+        await asyncio.sleep(0.001)  # inside the keyword layer
+        guard.thresholds = Thresholds(escalation=0.6, monitoring=0.5)
+        # 우울 scores 0.7: the check ran every layer under 0.8, so it stays high
+        result = await check
+        assert result['layers_run'] == ['keyword', 'context', 'pattern']
+        assert result['risk_level'] == 'high'
+        assert guard.check_many(["우울해요"])[0]['risk_level'] == 'critical'
+    
+    def test_unknown_layer_rejected(self):
+        with pytest.raises(ValueError):
+            SafetyGuard(layer_order=['keyword', 'sentiment'])
+
+class TestSafetySession:
+    """Test incremental checks over streamed transcripts"""
+    
+    def test_pattern_straddling_chunks(self):
+        session = SafetyGuard().session()
+        assert session.append("요즘 죽 ") is None
+        assert session.append("고 싶") is not None
+        assert session.critical['risk_level'] == 'critical'
+    
+    @pytest.mark.parametrize("size", [1, 3, 7])
+    def test_chunked_matches_whole_text(self, size):
+        guard = SafetyGuard()
+        texts = corpus()
+        for text, expected in zip(texts, guard.check_many(texts)):
+            session = guard.session()
+            for i in range(0, len(text), size):
+                session.append(text[i:i + size])
+            assert session.assessment() == expected
+    
+    def test_critical_event_fires_once(self):
+        events = []
+        session = SafetyGuard().session(on_critical=events.append)
+        session.append("자살")
+        session.append(" 생각이 나요 죽고 싶어요")
+        assert len(events) == 1
+        assert events[0] is session.critical
+    
+    @pytest.mark.asyncio
+    async def test_update_from_asr_partials(self):
+        from src.pipeline.asr import ASRProcessor
+        session = SafetyGuard().session()
+        async for event in ASRProcessor(words_per_second=1000).process_stream("너무 힘들어서 죽고 싶어요"):
+            if session.update(event.text) is not None:
+                break
+        assert session.critical is not None
+        assert not event.is_final
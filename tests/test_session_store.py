@@ -0,0 +1,76 @@
+"""
+Tests for the inference service session store
+"""
+import pytest
+from services.inference.session_store import SessionStore
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+class TestSessionStore:
+    """Test per-session context windows and eviction"""
+    
+    def test_context_keeps_last_exchanges_in_order(self):
+        store = SessionStore(window=2)
+        for i in range(4):
+            store.append("s1", f"질문 {i}", f"답변 {i}")
+        assert store.context("s1") == [
+            {"user": "질문 2", "assistant": "답변 2"},
+            {"user": "질문 3", "assistant": "답변 3"}
+        ]
+        assert store.context("unknown") == []
+    
+    def test_sent_context_replaces_stored_history(self):
+        store = SessionStore(window=2)
+        store.append("s1", "예전 질문", "예전 답변")
+        store.replace("s1", [{"user": "질문 1", "assistant": "답변 1"},
+                             {"user": "질문 2", "assistant": "답변 2"},
+                             {"user": "질문 3", "assistant": "답변 3"}])
+        store.append("s1", "질문 4", "답변 4")
+        assert store.context("s1") == [
+            {"user": "질문 3", "assistant": "답변 3"},
+            {"user": "질문 4", "assistant": "답변 4"}
+        ]
+        store.replace("s1", [])
+        assert store.context("s1") == []
+    
+    def test_sessions_are_isolated(self):
+        store = SessionStore()
+        store.append("a", "안녕하세요", "반가워요")
+        store.append("b", "불안해요", "괜찮아요")
+        assert store.context("a") == [{"user": "안녕하세요", "assistant": "반가워요"}]
+        assert store.drop("a")
+        assert not store.drop("a")
+        assert len(store) == 1
+    
+    def test_idle_sessions_expire(self):
+        clock = FakeClock()
+        store = SessionStore(idle_ttl=60, clock=clock)
+        store.append("old", "안녕", "안녕하세요")
+        clock.now = 30
+        store.append("active", "안녕", "안녕하세요")
+        clock.now = 70
+        assert store.context("old") == []
+        assert len(store.context("active")) == 1
+        assert store.stats()['evictions'] == 1
+    
+    def test_memory_cap_evicts_least_recently_used(self):
+        store = SessionStore(max_bytes=4096)
+        for i in range(100):
+            store.append(f"s{i}", "오늘 하루가 너무 길었어요", "많이 지치셨겠어요")
+        assert store.bytes <= 4096
+        assert 0 < len(store) < 100
+        assert store.context("s99") != []
+        assert store.context("s0") == []
+    
+    def test_byte_accounting_returns_to_zero(self):
+        store = SessionStore(window=3)
+        for i in range(10):
+            store.append(f"s{i % 3}", "말" * i, "답" * i)
+        for i in range(3):
+            store.drop(f"s{i}")
+        assert store.bytes == 0
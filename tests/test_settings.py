@@ -0,0 +1,172 @@
+"""
+Tests for the cached settings service and hot reload
+"""
+import pytest
+import os
+import time
+from src.config.settings import Settings, deep_merge, env_overrides, load_settings
+from src.pipeline import VoicePipeline
+from src.pipeline.deadline import TurnBudget
+
+BASE = """
+mode: mock
+latency_budget:
+  llm: 280
+  tts: 180
+  total_target: 700
+safety:
+  escalation_threshold: 0.8
+  monitoring_threshold: 0.6
+"""
+
+def write(path, text: str, bump: float = 0.0):
+    """Write the settings file; ``bump`` moves its mtime forward"""
+    path.write_text(text, encoding='utf-8')
+    if bump:
+        stat = os.stat(path)
+        os.utime(path, (stat.st_atime, stat.st_mtime + bump))
+
+@pytest.fixture
+def settings_file(tmp_path):
+    path = tmp_path / "settings.yaml"
+    write(path, BASE)
+    return path
+
+class TestMerge:
+    """Test defaults, file and environment layering"""
+
+    def test_deep_merge_keeps_sibling_keys(self):
+        base = {'latency_budget': {'llm': 280, 'tts': 180}, 'mode': 'mock'}
+        merged = deep_merge(base, {'latency_budget': {'llm': 300}})
+        assert merged == {'latency_budget': {'llm': 300, 'tts': 180}, 'mode': 'mock'}
+        assert base['latency_budget']['llm'] == 280
+
+    def test_partial_file_section_keeps_defaults(self, tmp_path):
+        path = tmp_path / "settings.yaml"
+        write(path, "latency_budget:\n  llm: 300\n")
+        budget = Settings(path, environ={})['latency_budget']
+        assert budget['llm'] == 300
+        assert budget['asr'] == 90 and budget['total_target'] == 700
+
+    def test_env_overrides_are_nested_and_typed(self, settings_file):
+        environ = {'INTUNE__LATENCY_BUDGET__LLM': '250', 'INTUNE__HEDGING__ENABLED': 'true',
+                   'INTUNE_MODE': 'live', 'HOME': '/root'}
+        assert env_overrides(environ) == {
+            'latency_budget': {'llm': 250}, 'hedging': {'enabled': True}, 'mode': 'live'
+        }
+        settings = Settings(settings_file, environ=environ)
+        assert settings['latency_budget'] == {
+            'asr': 90, 'safety': 50, 'llm': 250, 'postprocess': 30, 'tts': 180,
+            'total_target': 700
+        }
+        assert settings['mode'] == 'live'
+
+    def test_load_settings_returns_private_copies(self):
+        first = load_settings()
+        first['latency_budget']['llm'] = 1
+        assert load_settings()['latency_budget']['llm'] == 280
+
+class TestReload:
+    """Test mtime-driven reloads and change notifications"""
+
+    def test_lookups_do_not_reparse(self, settings_file):
+        settings = Settings(settings_file, environ={})
+        budget = settings['latency_budget']
+        assert not settings.reload()
+        assert settings['latency_budget'] is budget
+
+    def test_changed_file_is_swapped_in(self, settings_file):
+        settings = Settings(settings_file, environ={})
+        write(settings_file, BASE.replace("llm: 280", "llm: 300"), bump=1)
+        assert settings.reload()
+        assert settings['latency_budget']['llm'] == 300
+        assert settings.reloads == 1
+
+    def test_only_changed_sections_notify(self, settings_file):
+        settings = Settings(settings_file, environ={})
+        budgets, safeties = [], []
+        settings.subscribe('latency_budget', budgets.append)
+        unsubscribe = settings.subscribe('safety', safeties.append)
+        write(settings_file, BASE.replace("llm: 280", "llm: 300"), bump=1)
+        settings.reload()
+        assert [budget['llm'] for budget in budgets] == [300]
+        assert safeties == []
+
+        unsubscribe()
+        write(settings_file, BASE.replace("0.8", "0.7"), bump=2)
+        settings.reload()
+        assert safeties == []
+        assert budgets[-1]['llm'] == 280
+
+    def test_invalid_file_keeps_previous_settings(self, settings_file):
+        settings = Settings(settings_file, environ={})
+        write(settings_file, "latency_budget: [unclosed", bump=1)
+        assert not settings.reload()
+        assert settings['latency_budget']['llm'] == 280
+        write(settings_file, BASE.replace("llm: 280", "llm: 310"), bump=2)
+        assert settings.reload()
+        assert settings['latency_budget']['llm'] == 310
+
+    def test_failing_subscriber_does_not_block_others(self, settings_file):
+        settings = Settings(settings_file, environ={})
+        seen = []
+        def broken(value):
+            raise ValueError("bad budget")
+        settings.subscribe('latency_budget', broken)
+        settings.subscribe('latency_budget', seen.append)
+        write(settings_file, BASE.replace("llm: 280", "llm: 300"), bump=1)
+        assert settings.reload()
+        assert len(seen) == 1
+
+    def test_watcher_picks_up_edits(self, settings_file):
+        settings = Settings(settings_file, environ={})
+        settings.watch(interval=0.01)
+        try:
+            write(settings_file, BASE.replace("tts: 180", "tts: 150"), bump=1)
+            for _ in range(200):
+                if settings['latency_budget']['tts'] == 150:
+                    break
+                time.sleep(0.01)
+            assert settings['latency_budget']['tts'] == 150
+        finally:
+            settings.stop()
+
+class TestPipelineWatch:
+    """Test that a watching pipeline follows budget and threshold reloads"""
+
+    def test_budget_and_thresholds_follow_reloads(self, settings_file):
+        settings = Settings(settings_file, environ={})
+        pipeline = VoicePipeline(settings.copy(), mode="mock")
+        unwatch = pipeline.watch(settings)
+        write(settings_file, BASE.replace("llm: 280", "llm: 320")
+              .replace("escalation_threshold: 0.8", "escalation_threshold: 0.6"), bump=1)
+        settings.reload()
+        assert pipeline.budget['llm'] == 320
+        assert pipeline.safety.escalation_threshold == 0.6
+        # 우울 scores 0.7: high before, critical under the lowered threshold
+        assert pipeline.safety.check_many(["우울해요"])[0]['risk_level'] == 'critical'
+
+        unwatch()
+        write(settings_file, BASE, bump=2)
+        settings.reload()
+        assert pipeline.budget['llm'] == 320
+
+    def test_budget_and_enforcement_swap_together(self):
+        pipeline = VoicePipeline({'latency_budget': {}}, mode="mock")
+        before = pipeline.turn_budget
+        assert pipeline._deadline() is None
+        pipeline.set_latency_budget({'llm': 280, 'tts': 180, 'total_target': 700})
+        # A turn holding the old value never sees the new flag with the old budget
+        assert before == TurnBudget({}, False)
+        assert pipeline.turn_budget == TurnBudget({'llm': 280, 'tts': 180, 'total_target': 700}, True)
+        assert pipeline._deadline().remaining('llm') > 0
+
+    def test_disabling_enforcement_stops_deadlines(self, settings_file):
+        settings = Settings(settings_file, environ={})
+        pipeline = VoicePipeline(settings.copy(), mode="mock")
+        pipeline.watch(settings)
+        assert pipeline.enforce_deadlines
+        write(settings_file, BASE.replace("total_target: 700", "total_target: 700\n  enforce: false"),
+              bump=1)
+        settings.reload()
+        assert not pipeline.enforce_deadlines
@@ -0,0 +1,103 @@
+"""
+Tests for lazy loading and the startup profile
+"""
+import pytest
+import json
+import os
+import subprocess
+import sys
+import src.pipeline
+from src.pipeline.startup import StartupProfile, import_profile, loaded_since
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+def fresh(code: str) -> str:
+    """Run ``code`` in a fresh interpreter with src/ on the path; returns stdout"""
+    result = subprocess.run(
+        [sys.executable, '-c', f"import sys; sys.path.insert(0, {SRC!r})\n{code}"],
+        capture_output=True, text=True, check=True
+    )
+    return result.stdout
+
+def loaded(code: str, modules) -> dict:
+    """Which of ``modules`` are imported after ``code`` runs in a fresh interpreter"""
+    probe = f"{code}\nimport json\nprint(json.dumps({{m: m in sys.modules for m in {list(modules)!r}}}))"
+    return json.loads(fresh(probe).splitlines()[-1])
+
+class TestStartupProfile:
+    """Test phase marks and the import profile"""
+
+    def test_marks_charge_time_since_previous_mark(self):
+        now = [10.0]
+        profile = StartupProfile(clock=lambda: now[0])
+        now[0] = 10.05
+        assert profile.mark('settings') == pytest.approx(50)
+        now[0] = 10.25
+        profile.mark('build')
+        assert profile.report() == {'phases_ms': {'settings': 50.0, 'build': 200.0},
+                                    'total_ms': 250.0}
+
+    def test_import_profile_reports_requested_modules_only(self):
+        imports = import_profile(['json'])
+        names = [entry.module for entry in imports]
+        assert 'json' in names and 'json.decoder' in names
+        assert 'site' not in names and 'encodings' not in names
+        top = [entry for entry in imports if entry.depth == 0]
+        assert [entry.module for entry in top] == ['json']
+        assert top[0].cumulative_ms >= top[0].self_ms > 0
+
+    def test_loaded_since_lists_modules_before_their_imports(self):
+        before = set(sys.modules)
+        import xml.dom.minidom  # noqa: F401
+        new = loaded_since(before)
+        assert new.index('xml.dom.minidom') < new.index('xml.dom.minicompat')
+
+class TestLazyLoading:
+    """Test that heavy modules load only when used"""
+
+    HEAVY = ['httpx', 'opentelemetry.trace', 'prometheus_client', 'pipeline.engine', 'pipeline.asr']
+
+    def test_package_import_loads_no_stage(self):
+        assert loaded("import pipeline", self.HEAVY) == dict.fromkeys(self.HEAVY, False)
+
+    def test_single_stage_loads_only_its_dependencies(self):
+        result = loaded("from pipeline import SafetyGuard", self.HEAVY)
+        assert result == dict.fromkeys(self.HEAVY, False)
+
+    def test_mock_turn_never_loads_provider_sdks(self):
+        code = ("import asyncio\nfrom pipeline import VoicePipeline\n"
+                "asyncio.run(VoicePipeline(mode='mock').run_turn('요즘 불안해요'))")
+        result = loaded(code, ['httpx', 'opentelemetry.trace'])
+        assert result == {'httpx': False, 'opentelemetry.trace': False}
+
+    def test_lazy_exports_resolve(self):
+        from src.pipeline.engine import VoicePipeline
+        assert src.pipeline.VoicePipeline is VoicePipeline
+        assert 'Hedger' in dir(src.pipeline)
+        with pytest.raises(AttributeError):
+            src.pipeline.NotAStage
+
+    def test_cli_help_loads_no_stage(self):
+        code = ("sys.argv = ['main.py', '--help']\nimport runpy\n"
+                "try:\n    runpy.run_path(sys.path[0] + '/main.py', run_name='__main__')\n"
+                "except SystemExit:\n    pass")
+        result = loaded(code, ['pipeline', 'yaml'])
+        assert result == {'pipeline': False, 'yaml': False}
+
+    def test_one_shot_cli_starts_no_settings_watcher(self):
+        code = ("sys.argv = ['main.py', '--text', '안녕하세요', '--json']\nimport runpy, threading\n"
+                "runpy.run_path(sys.path[0] + '/main.py', run_name='__main__')\n"
+                "print([thread.name for thread in threading.enumerate()])")
+        assert 'settings-watch' not in fresh(code).splitlines()[-1]
+
+    def test_cli_profile_startup_reports_phases_and_imports(self):
+        result = subprocess.run(
+            [sys.executable, os.path.join(SRC, 'main.py'), '--profile-startup', '--json'],
+            capture_output=True, text=True, check=True
+        )
+        report = json.loads(result.stdout)
+        assert list(report['phases_ms']) == [
+            'settings', 'tracing', 'import stages', 'build pipeline', 'warmup', 'first turn'
+        ]
+        assert 'pipeline.engine' in report['imports_ms']
+        assert report['total_ms'] > 0
@@ -0,0 +1,85 @@
+"""
+Tests for sentence-level streaming from LLM into TTS
+"""
+import pytest
+from src.pipeline import VoicePipeline, SentenceSegmenter
+from src.config.settings import load_settings
+
+class TestSentenceSegmenter:
+    """Test Korean sentence boundary detection"""
+    
+    def feed_all(self, text, chunk_size=3):
+        segmenter = SentenceSegmenter()
+        sentences = []
+        for i in range(0, len(text), chunk_size):
+            sentences.extend(segmenter.feed(text[i:i + chunk_size]))
+        tail = segmenter.flush()
+        if tail:
+            sentences.append(tail)
+        return sentences
+    
+    def test_korean_sentence_endings(self):
+        """Test 요. / 까요? / 네요 boundaries"""
+        text = "많이 힘드셨겠네요 그 마음 이해해요. 오늘은 어떠셨어요? 천천히 이야기해 볼까요?"
+        assert self.feed_all(text) == [
+            "많이 힘드셨겠네요",
+            "그 마음 이해해요.",
+            "오늘은 어떠셨어요?",
+            "천천히 이야기해 볼까요?"
+        ]
+    
+    def test_boundary_waits_for_next_token(self):
+        """Test punctuation at the end of a chunk is not cut early"""
+        segmenter = SentenceSegmenter()
+        assert segmenter.feed("호흡을 3.") == []
+        assert segmenter.feed("5초 동안 참아보세요. ") == ["호흡을 3.5초 동안 참아보세요."]
+    
+    def test_short_fragments_are_merged(self):
+        """Test fragments below min_chars join the next sentence"""
+        assert self.feed_all("네. 지금 많이 힘드신 것 같아요.") == ["네. 지금 많이 힘드신 것 같아요."]
+
+class TestStreamingPipeline:
+    """Test time-to-first-audio streaming mode"""
+    
+    @pytest.fixture
+    def pipeline(self):
+        return VoicePipeline(load_settings(), mode="mock")
+    
+    @pytest.mark.asyncio
+    async def test_first_audio_before_total(self, pipeline):
+        """Test audio starts before the full response is generated"""
+        stream = pipeline.stream_turn("요즘 너무 우울해요")
+        segments = [segment async for segment in stream]
+        timings = stream.result['timings']
+        
+        assert len(segments) > 1
+        assert [s['index'] for s in segments] == list(range(len(segments)))
+        assert timings['first_audio'] == segments[0]['at_ms']
+        assert timings['first_audio'] < timings['llm'] + timings['asr'] + timings['safety']
+        assert timings['first_audio'] < timings['total']
+        assert stream.result['audio_url'] == segments[0]['audio_url']
+    
+    @pytest.mark.asyncio
+    async def test_segments_are_postprocessed(self, pipeline):
+        """Test every streamed sentence goes through the PostProcessor"""
+        async def tokens():
+            for token in ["제 번호는 ", "010-1234-5678이에요. ", "절대 ", "혼자가 아니에요."]:
+                yield token
+        
+        async def generate_stream(text, safety_result):
+            return tokens(), {'primary': 'neutral', 'confidence': 0.5}
+        pipeline.llm.generate_stream = generate_stream
+        
+        result = await pipeline.stream_turn("안녕하세요").collect()
+        texts = [s['text'] for s in result['audio_segments']]
+        assert texts == ["제 번호는 [전화번호]이에요.", "가능하면 혼자가 아니에요."]
+    
+    @pytest.mark.asyncio
+    async def test_critical_turn_streams_emergency_response(self, pipeline):
+        """Test a crisis turn voices only the emergency response"""
+        result = await pipeline.stream_turn("죽고 싶어요").collect()
+        assert result['safety']['risk_level'] == 'critical'
+        assert len(result['audio_segments']) == 1
+        assert result['response'] == result['safety']['emergency_response']
+        assert 'urgent_care' in result['audio_url']
+        assert 'llm' not in result['timings']
@@ -0,0 +1,175 @@
+"""
+Tests for pipeline tracing and tail-based sampling
+"""
+import pytest
+from opentelemetry import propagate, trace
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from src.pipeline import VoicePipeline
+from src.pipeline.tracing import RISK_ATTRIBUTE, TailSampler, configure_tracing
+from src.config.settings import load_settings
+
+# The global tracer provider can only be installed once per process
+exporter = InMemorySpanExporter()
+global_sampler = configure_tracing(processor=SimpleSpanProcessor(exporter))
+
+DROP = lambda: 1.0
+KEEP = lambda: 0.0
+
+def names(spans):
+    return sorted(span.name for span in spans)
+
+class TestPipelineTracing:
+    """Test spans emitted by the pipeline and which traces are kept"""
+
+    @pytest.fixture
+    def sampler(self):
+        saved = (global_sampler.rng, global_sampler.budget_ns)
+        global_sampler.rng = DROP
+        global_sampler.budget_ns = 60_000 * 1_000_000
+        yield global_sampler
+        global_sampler.rng, global_sampler.budget_ns = saved
+
+    @pytest.fixture
+    def pipeline(self):
+        return VoicePipeline(load_settings(), mode="mock")
+
+    async def warm(self, pipeline):
+        await pipeline.warmup()
+        exporter.clear()
+
+    @pytest.mark.asyncio
+    async def test_sampled_turn_has_stage_and_layer_spans(self, sampler, pipeline):
+        await self.warm(pipeline)
+        sampler.rng = KEEP
+        result = await pipeline.run_turn("요즘 너무 우울해요", speculative=False)
+        spans = exporter.get_finished_spans()
+        assert names(spans) == [
+            'asr', 'llm', 'postprocess', 'safety', 'safety.context',
+            'safety.keyword', 'safety.pattern', 'tts', 'voice.turn'
+        ]
+        assert len({span.context.trace_id for span in spans}) == 1
+
+        by_name = {span.name: span for span in spans}
+        root = by_name['voice.turn']
+        assert root.parent is None
+        assert root.attributes[RISK_ATTRIBUTE] == result['safety']['risk_level']
+        assert root.attributes['intune.total_ms'] == result['timings']['total']
+        for stage in ('asr', 'safety', 'llm', 'postprocess', 'tts'):
+            assert by_name[stage].parent.span_id == root.context.span_id
+        for layer in ('keyword', 'context', 'pattern'):
+            assert by_name[f'safety.{layer}'].parent.span_id == by_name['safety'].context.span_id
+
+    @pytest.mark.asyncio
+    async def test_normal_turn_dropped(self, sampler, pipeline):
+        await self.warm(pipeline)
+        await pipeline.run_turn("안녕하세요")
+        assert exporter.get_finished_spans() == ()
+
+    @pytest.mark.asyncio
+    async def test_critical_turn_always_kept(self, sampler, pipeline):
+        await self.warm(pipeline)
+        await pipeline.run_turn("죽고 싶어요")
+        spans = exporter.get_finished_spans()
+        root = [span for span in spans if span.name == 'voice.turn'][0]
+        assert root.attributes[RISK_ATTRIBUTE] == 'critical'
+        assert 'llm' not in names(spans)
+
+    @pytest.mark.asyncio
+    async def test_over_budget_turn_always_kept(self, sampler, pipeline):
+        await self.warm(pipeline)
+        sampler.budget_ns = 1_000_000
+        await pipeline.run_turn("안녕하세요")
+        assert 'voice.turn' in names(exporter.get_finished_spans())
+
+    @pytest.mark.asyncio
+    async def test_speculative_turn_parents_llm_under_turn(self, sampler, pipeline):
+        await self.warm(pipeline)
+        sampler.rng = KEEP
+        await pipeline.run_turn("요즘 불안해요", speculative=True)
+        by_name = {span.name: span for span in exporter.get_finished_spans()}
+        assert by_name['llm'].attributes['intune.speculative'] is True
+        assert by_name['llm'].parent.span_id == by_name['voice.turn'].context.span_id
+
+    @pytest.mark.asyncio
+    async def test_streamed_turn_spans(self, sampler, pipeline):
+        await self.warm(pipeline)
+        sampler.rng = KEEP
+        result = await pipeline.stream_turn("요즘 너무 힘들어요").collect()
+        spans = exporter.get_finished_spans()
+        root = [span for span in spans if span.name == 'voice.turn'][0]
+        assert root.attributes['intune.streaming'] is True
+        assert root.attributes[RISK_ATTRIBUTE] == result['safety']['risk_level']
+        children = [span for span in spans if span is not root]
+        assert all(span.context.trace_id == root.context.trace_id for span in children)
+        tts = [span for span in children if span.name == 'tts']
+        assert len(tts) == len(result['audio_segments'])
+        assert {'asr', 'safety', 'llm', 'postprocess'} <= set(names(children))
+
+    @pytest.mark.asyncio
+    async def test_incoming_traceparent_continued(self, sampler, pipeline):
+        await self.warm(pipeline)
+        sampler.rng = KEEP
+        trace_id = 0x4bf92f3577b34da6a3ce929d0e0e4736
+        context = propagate.extract({
+            'traceparent': f"00-{trace_id:032x}-00f067aa0ba902b7-01"
+        })
+        with trace.get_tracer(__name__).start_as_current_span('gateway', context=context):
+            await pipeline.run_turn("안녕하세요")
+        spans = exporter.get_finished_spans()
+        assert spans and all(span.context.trace_id == trace_id for span in spans)
+        # The gateway span, with a remote parent, decides for the whole trace
+        assert 'gateway' in names(spans)
+
+class TestTailSampler:
+    """Test per-trace keep decisions and bounded buffering"""
+
+    @pytest.fixture
+    def setup(self):
+        exported = InMemorySpanExporter()
+        sampler = TailSampler(SimpleSpanProcessor(exported), budget_ms=1000,
+                              ratio=0.5, max_traces=4, rng=DROP)
+        provider = TracerProvider()
+        provider.add_span_processor(sampler)
+        return sampler, exported, provider.get_tracer(__name__)
+
+    def test_children_follow_root_decision(self, setup):
+        sampler, exported, tracer = setup
+        with tracer.start_as_current_span('root') as root:
+            with tracer.start_as_current_span('child'):
+                pass
+            assert exported.get_finished_spans() == ()
+            root.set_attribute(RISK_ATTRIBUTE, 'critical')
+        assert names(exported.get_finished_spans()) == ['child', 'root']
+        assert (sampler.kept, sampler.dropped) == (1, 0)
+
+    def test_ratio_draw(self, setup):
+        sampler, exported, tracer = setup
+        with tracer.start_as_current_span('dropped'):
+            pass
+        sampler.rng = lambda: 0.49
+        with tracer.start_as_current_span('kept'):
+            pass
+        assert names(exported.get_finished_spans()) == ['kept']
+        assert (sampler.kept, sampler.dropped) == (1, 1)
+
+    def test_late_span_follows_decision(self, setup):
+        sampler, exported, tracer = setup
+        root = tracer.start_span('root', attributes={RISK_ATTRIBUTE: 'critical'})
+        late = tracer.start_span('late', context=trace.set_span_in_context(root))
+        root.end()
+        late.end()
+        assert names(exported.get_finished_spans()) == ['late', 'root']
+
+    def test_pending_traces_bounded(self, setup):
+        sampler, exported, tracer = setup
+        roots = [tracer.start_span(f'root{n}') for n in range(10)]
+        for root in roots:
+            tracer.start_span('child', context=trace.set_span_in_context(root)).end()
+        assert len(sampler._pending) == 4
+
+        # The oldest abandoned trace lost its buffered children
+        roots[0].set_attribute(RISK_ATTRIBUTE, 'critical')
+        roots[0].end()
+        assert names(exported.get_finished_spans()) == ['root0']
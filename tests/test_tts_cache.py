@@ -0,0 +1,81 @@
+"""
+Tests for the content-addressed TTS audio cache
+"""
+import pytest
+import mmap
+import time
+from src.pipeline.audio_cache import AudioCache, cache_key
+from src.pipeline.tts import TTSProcessor
+from src.pipeline import VoicePipeline
+from src.config.settings import load_settings
+
+PROSODY = {'speed': 1.0, 'pitch': 1.0, 'emphasis': 0.5}
+
+class TestAudioCache:
+    """Test the memory LRU and disk tiers"""
+    
+    def test_key_normalizes_text(self):
+        assert cache_key("안녕하세요,  오늘\n어때요?", 'calm', PROSODY) == \
+            cache_key(" 안녕하세요, 오늘 어때요? ", 'calm', PROSODY)
+        assert cache_key("안녕하세요", 'calm', PROSODY) != \
+            cache_key("안녕하세요", 'soothing', PROSODY)
+        assert cache_key("안녕하세요", 'calm', PROSODY) != \
+            cache_key("안녕하세요", 'calm', dict(PROSODY, speed=0.9))
+    
+    def test_lru_eviction_and_counters(self):
+        cache = AudioCache(max_items=2)
+        cache.put('a', b'1')
+        cache.put('b', b'2')
+        assert cache.get('a') == b'1'
+        cache.put('c', b'3')
+        assert cache.get('b') is None
+        assert cache.get('a') == b'1'
+        assert cache.stats == {'memory_hits': 2, 'disk_hits': 0, 'misses': 1,
+                               'evictions': 1, 'stores': 3}
+    
+    def test_memory_bound_in_bytes(self):
+        cache = AudioCache(max_items=10, max_bytes=10)
+        cache.put('a', b'x' * 6)
+        cache.put('b', b'x' * 6)
+        assert len(cache) == 1
+        assert cache.stats['evictions'] == 1
+    
+    def test_disk_tier_shared_between_workers(self, tmp_path):
+        writer = AudioCache(disk_dir=tmp_path)
+        reader = AudioCache(disk_dir=tmp_path)
+        writer.put('k' * 64, b'audio-bytes')
+        
+        audio = reader.get('k' * 64)
+        assert isinstance(audio, mmap.mmap)
+        assert audio[:] == b'audio-bytes'
+        assert reader.get('k' * 64) is audio
+        assert reader.stats['disk_hits'] == 1
+        assert reader.stats['memory_hits'] == 1
+
+class TestTTSCache:
+    """Test TTSProcessor reuses rendered audio"""
+    
+    @pytest.mark.asyncio
+    async def test_repeat_phrase_skips_synthesis(self):
+        tts = TTSProcessor()
+        emotion = {'primary': 'sadness'}
+        first = await tts.synthesize("지금 많이 힘드신 것 같네요.", emotion)
+        start = time.perf_counter()
+        second = await tts.synthesize("지금  많이 힘드신 것 같네요.", emotion)
+        assert (time.perf_counter() - start) * 1000 < tts.target_latency / 2
+        assert first == second
+        assert 'empathetic' in second
+        assert tts.cache.stats['memory_hits'] == 1
+    
+    @pytest.mark.asyncio
+    async def test_prewarm_from_settings(self, tmp_path):
+        settings = load_settings()
+        settings['tts_cache'] = dict(settings['tts_cache'], disk_dir=str(tmp_path))
+        
+        summary = await VoicePipeline(settings, mode="mock").prewarm_tts()
+        assert summary['rendered'] == summary['phrases'] > 0
+        
+        # A second worker sharing the directory finds everything on disk
+        summary = await VoicePipeline(settings, mode="mock").prewarm_tts()
+        assert summary['rendered'] == 0
+        assert summary['cache']['disk_hits'] == summary['phrases']